@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import crud, models, schemas
+from .schedule import BLOCKING_STATUSES
+
+# Streaming anomaly checks on stored telemetry. Ingest hands every committed batch to a
+# pool of worker threads, sharded by asset so each series' state has a single owner and
+# needs no locking. Per (asset, tag) a ring buffer keeps the last ANOMALY_WINDOW values
+# with their running mean and variance (Welford's update, O(1) per point); a point more
+# than ANOMALY_Z_THRESHOLD standard deviations from its window is a breach, as is any
+# rule in RULES. Breaches raise work orders through ``crud.create_work_order``.
+#
+# Alerts are deduplicated by title: every detector and tag has a fixed title, so while
+# its work order exists the uq_work_order_title constraint rejects the repeat and no
+# per-point query is needed. Only when that happens is the holder looked up; if it has
+# been closed, the new occurrence gets a numbered title. A per-series cooldown keeps a
+# sustained breach from retrying on every point.
+#
+# State is per process and starts empty: a series is checked once it has
+# ANOMALY_MIN_SAMPLES points in this worker. ANOMALY_WORKERS=0 runs the checks inline
+# after the ingest commit (the test suite does this). A full queue drops the batch
+# rather than slowing ingest; /health/anomalies counts the drops.
+
+log = logging.getLogger(__name__)
+
+WINDOW = int(os.getenv("ANOMALY_WINDOW", "120"))
+MIN_SAMPLES = int(os.getenv("ANOMALY_MIN_SAMPLES", "30"))
+Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "4.0"))
+WORKERS = int(os.getenv("ANOMALY_WORKERS", "2"))
+QUEUE_SIZE = int(os.getenv("ANOMALY_QUEUE_SIZE", "1000"))
+COOLDOWN_SECONDS = float(os.getenv("ANOMALY_COOLDOWN_SECONDS", "300"))
+
+_PRIORITY_RANK = {priority: rank for rank, priority in enumerate(schemas.WorkOrderPriority)}
+
+
+class RollingWindow:
+    """Mean and variance of the last ``size`` values, kept in O(1) per value."""
+
+    __slots__ = ("values", "size", "count", "head", "mean", "m2")
+
+    def __init__(self, size: int = WINDOW) -> None:
+        self.values = array("d", bytes(8 * size))
+        self.size = size
+        self.count = 0
+        self.head = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+
+    def push(self, value: float) -> None:
+        if self.count < self.size:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            # Replace the oldest value: remove and add in one step.
+            old = self.values[self.head]
+            delta = value - old
+            mean = self.mean + delta / self.size
+            self.m2 = max(0.0, self.m2 + delta * (value - mean + old - self.mean))
+            self.mean = mean
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.size
+
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def zscore(self, value: float) -> Optional[float]:
+        """Deviation of ``value`` from the window, or None until it can be judged."""
+        if self.count < MIN_SAMPLES:
+            return None
+        std = self.std()
+        if std <= 1e-9 * max(1.0, abs(self.mean)):
+            return None
+        return (value - self.mean) / std
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Breach when ``tag`` exceeds ``above`` while ``load_tag`` is below a capacity share."""
+
+    name: str
+    tag: str
+    above: float
+    load_tag: str
+    load_below: float  # fraction of the asset's capacity_mw
+    priority: schemas.WorkOrderPriority
+
+    def breached(self, value: float, load: Optional[float], capacity: Optional[float]) -> bool:
+        return (
+            value > self.above
+            and load is not None
+            and bool(capacity)
+            and load / capacity < self.load_below
+        )
+
+
+RULES: tuple[Rule, ...] = (
+    Rule(
+        name="High exhaust temperature at low load",
+        tag="exhaust_temp_c",
+        above=600.0,
+        load_tag="active_power_mw",
+        load_below=0.3,
+        priority=schemas.WorkOrderPriority.high,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class Alert:
+    asset_id: int
+    tag: str
+    title: str
+    priority: schemas.WorkOrderPriority
+    description: str
+
+
+def _z_priority(z: float) -> schemas.WorkOrderPriority:
+    magnitude = abs(z)
+    if magnitude >= 2 * Z_THRESHOLD:
+        return schemas.WorkOrderPriority.critical
+    if magnitude >= 1.5 * Z_THRESHOLD:
+        return schemas.WorkOrderPriority.high
+    return schemas.WorkOrderPriority.medium
+
+
+class Shard:
+    """Detector state for the assets one worker owns."""
+
+    def __init__(self) -> None:
+        self.windows: dict[tuple[int, str], RollingWindow] = {}
+        self.latest: dict[int, dict[str, float]] = {}
+        self.capacities: dict[int, float] = {}
+        self.cooldown: dict[tuple[int, str], float] = {}
+
+    def check(
+        self, points: Sequence[tuple[int, str, int, float]], rules: Iterable[Rule]
+    ) -> list[Alert]:
+        """Update the series with ``points`` (ordered by time) and return new breaches."""
+        rules_by_tag: dict[str, list[Rule]] = {}
+        for rule in rules:
+            rules_by_tag.setdefault(rule.tag, []).append(rule)
+        alerts: dict[tuple[int, str], Alert] = {}
+        for asset_id, tag, ts, value in points:
+            window = self.windows.get((asset_id, tag))
+            if window is None:
+                window = self.windows[(asset_id, tag)] = RollingWindow()
+            z = window.zscore(value)
+            if z is not None and abs(z) >= Z_THRESHOLD:
+                self._add(
+                    alerts,
+                    Alert(
+                        asset_id,
+                        tag,
+                        f"Anomaly: {tag} outside rolling range",
+                        _z_priority(z),
+                        f"{tag}={value:g} at ts={ts} is {z:+.1f} standard deviations from "
+                        f"the mean {window.mean:g} of the last {window.count} samples.",
+                    ),
+                )
+            window.push(value)
+            latest = self.latest.setdefault(asset_id, {})
+            latest[tag] = value
+            for rule in rules_by_tag.get(tag, ()):
+                load = latest.get(rule.load_tag)
+                if rule.breached(value, load, self.capacities.get(asset_id)):
+                    self._add(
+                        alerts,
+                        Alert(
+                            asset_id,
+                            tag,
+                            f"Anomaly: {rule.name}",
+                            rule.priority,
+                            f"{tag}={value:g} above {rule.above:g} at ts={ts} while "
+                            f"{rule.load_tag}={load:g} is below {rule.load_below:.0%} of "
+                            f"capacity.",
+                        ),
+                    )
+        return self._off_cooldown(alerts.values())
+
+    @staticmethod
+    def _add(alerts: dict[tuple[int, str], Alert], alert: Alert) -> None:
+        # One alert per title and batch: the most severe breach.
+        key = (alert.asset_id, alert.title)
+        current = alerts.get(key)
+        if current is None or _PRIORITY_RANK[alert.priority] > _PRIORITY_RANK[current.priority]:
+            alerts[key] = alert
+
+    def _off_cooldown(self, alerts: Iterable[Alert]) -> list[Alert]:
+        now = time.monotonic()
+        ready = []
+        for alert in alerts:
+            key = (alert.asset_id, alert.title)
+            if self.cooldown.get(key, 0.0) <= now:
+                self.cooldown[key] = now + COOLDOWN_SECONDS
+                ready.append(alert)
+        return ready
+
+
+def raise_work_order(db: Session, alert: Alert) -> bool:
+    """Create the alert's work order; False when an open one already covers it."""
+    payload = schemas.WorkOrderCreate(
+        asset_id=alert.asset_id,
+        title=alert.title,
+        description=alert.description,
+        priority=alert.priority,
+    )
+    try:
+        crud.create_work_order(db, payload)
+        return True
+    except HTTPException as exc:
+        if exc.status_code != status.HTTP_409_CONFLICT:
+            raise
+    # The title is taken. Numbered repeats start once every earlier one is closed.
+    wo = models.WorkOrder
+    holders = db.execute(
+        select(wo.status).where(
+            wo.asset_id == alert.asset_id, wo.title.startswith(alert.title, autoescape=True)
+        )
+    ).scalars().all()
+    if any(holder in BLOCKING_STATUSES for holder in holders):
+        return False
+    payload.title = f"{alert.title} #{len(holders) + 1}"
+    try:
+        crud.create_work_order(db, payload)
+        return True
+    except HTTPException as exc:
+        if exc.status_code != status.HTTP_409_CONFLICT:
+            raise
+        return False
+
+
+class Detector:
+    def __init__(self, workers: int = WORKERS, queue_size: int = QUEUE_SIZE) -> None:
+        self.workers = workers
+        self.rules = RULES
+        self._shards = [Shard() for _ in range(max(workers, 1))]
+        self._queues: list[queue.Queue] = [queue.Queue(queue_size) for _ in range(workers)]
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.points = 0
+        self.alerts = 0
+        self.raised = 0
+        self.suppressed = 0
+        self.dropped_batches = 0
+        self.errors = 0
+
+    def submit(
+        self,
+        bind: Engine,
+        points: Sequence[tuple[int, str, int, float]],
+        capacities: dict[int, float],
+    ) -> None:
+        """Queue committed ``points`` for checking; never blocks the caller."""
+        if not points:
+            return
+        shards: dict[int, list[tuple[int, str, int, float]]] = {}
+        for point in points:
+            shards.setdefault(point[0] % len(self._shards), []).append(tuple(point))
+        if not self.workers:
+            for index, shard_points in shards.items():
+                self._process(index, bind, shard_points, capacities)
+            return
+        self._start()
+        for index, shard_points in shards.items():
+            try:
+                self._queues[index].put_nowait((bind, shard_points, capacities))
+            except queue.Full:
+                with self._lock:
+                    self.dropped_batches += 1
+
+    def drain(self) -> None:
+        """Wait until every queued batch has been checked."""
+        for pending in self._queues:
+            pending.join()
+
+    def clear(self) -> None:
+        self.drain()
+        with self._lock:
+            self._shards = [Shard() for _ in self._shards]
+            self.points = self.alerts = self.raised = self.suppressed = 0
+            self.dropped_batches = self.errors = 0
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "series": sum(len(shard.windows) for shard in self._shards),
+                "queued_batches": sum(pending.qsize() for pending in self._queues),
+                "points": self.points,
+                "alerts": self.alerts,
+                "work_orders_raised": self.raised,
+                "duplicates_suppressed": self.suppressed,
+                "dropped_batches": self.dropped_batches,
+                "errors": self.errors,
+            }
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, args=(index,), name=f"anomaly-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self, index: int) -> None:
+        pending = self._queues[index]
+        while True:
+            bind, points, capacities = pending.get()
+            try:
+                self._process(index, bind, points, capacities)
+            finally:
+                pending.task_done()
+
+    def _process(
+        self,
+        index: int,
+        bind: Engine,
+        points: list[tuple[int, str, int, float]],
+        capacities: dict[int, float],
+    ) -> None:
+        shard = self._shards[index]
+        alert: Optional[Alert] = None
+        try:
+            shard.capacities.update(capacities)
+            points.sort(key=lambda point: point[2])
+            alerts = shard.check(points, self.rules)
+            raised = 0
+            if alerts:
+                with Session(bind=bind, autoflush=False) as db:
+                    for alert in alerts:
+                        raised += raise_work_order(db, alert)
+        except Exception:
+            # Telemetry is already stored; a failed check must not take the worker down.
+            if alert is None:
+                log.exception(
+                    "Anomaly check of %d points for assets %s failed",
+                    len(points),
+                    sorted({point[0] for point in points}),
+                )
+            else:
+                log.exception(
+                    "Raising an anomaly work order for asset %s, tag %s failed",
+                    alert.asset_id,
+                    alert.tag,
+                )
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.points += len(points)
+            self.alerts += len(alerts)
+            self.raised += raised
+            self.suppressed += len(alerts) - raised
+
+
+detector = Detector()
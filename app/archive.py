@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from . import changes, crud, models, schemas, stats
+from .database import session_scope
+
+# Retention for closed work orders. Rows completed or cancelled longer than
+# WORK_ORDER_ARCHIVE_AFTER_DAYS ago (by updated_at, their last write) move to
+# ``work_orders_archive``, so the hot table and its indexes only carry live work. Each
+# batch of up to WORK_ORDER_ARCHIVE_BATCH_SIZE rows moves in its own short transaction:
+# on SQLite that bounds how long the write lock is held, and a stopped run leaves every
+# row in exactly one of the two tables. Run it from cron or any scheduler:
+#
+#     python -m app.archive --older-than-days 90
+#
+# Archived rows keep their id and columns, drop out of /stats and the asset views, and
+# reach change feed subscribers as "archived" events. Their audit history stays where
+# it is, so as_of reads still work. List and get requests see them with
+# include_archived=true.
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("WORK_ORDER_ARCHIVE_AFTER_DAYS", "90"))
+BATCH_SIZE = int(os.getenv("WORK_ORDER_ARCHIVE_BATCH_SIZE", "500"))
+
+CLOSED_STATUSES = (schemas.WorkOrderStatus.completed, schemas.WorkOrderStatus.cancelled)
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Move up to ``batch_size`` work orders closed before ``cutoff`` into the archive and
+    return how many moved; the caller commits.
+
+    The DELETE repeats the selection's conditions and returns the rows it removed, so a
+    work order reopened since it was selected stays put and the archive, stats and
+    change feed all see exactly the rows that left.
+
+    A work order whose id is already in the archive is skipped: a SQLite table created
+    without AUTOINCREMENT hands an archived id out again, and moving the newer row
+    would collide with the archived one.
+    """
+    wo = models.WorkOrder.__table__
+    archive = models.ArchivedWorkOrder.__table__
+    closed = (wo.c.status.in_(CLOSED_STATUSES), wo.c.updated_at < cutoff)
+    ids = db.execute(
+        select(wo.c.id)
+        .where(*closed, ~select(archive.c.id).where(archive.c.id == wo.c.id).exists())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        return 0
+    moved = db.execute(delete(wo).where(wo.c.id.in_(ids), *closed).returning(*wo.columns)).all()
+    if not moved:
+        return 0
+    archived_at = datetime.now(UTC)
+    db.execute(
+        insert(archive),
+        [{**row._asdict(), "archived_at": archived_at} for row in moved],
+    )
+    db.execute(crud.asset_touch_query({row.asset_id for row in moved}))
+    delta = stats.StatsDelta()
+    for row in moved:
+        delta.work_order(row, -1)
+    stats.apply(db, delta)
+    changes.record(db, *(changes.work_order_change("archived", row) for row in moved))
+    return len(moved)
+
+
+def archive_closed_work_orders(
+    older_than: timedelta = timedelta(days=ARCHIVE_AFTER_DAYS),
+    *,
+    batch_size: int = BATCH_SIZE,
+    max_batches: Optional[int] = None,
+    session: Optional[Session] = None,
+) -> int:
+    """Archive every work order closed for longer than ``older_than``; returns the count."""
+    cutoff = datetime.now(UTC) - older_than
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        with session_scope(session) as db:
+            moved = archive_batch(db, cutoff, batch_size)
+        total += moved
+        batches += 1
+        if moved < batch_size:
+            break
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Archive closed work orders.")
+    parser.add_argument("--older-than-days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    total = archive_closed_work_orders(
+        timedelta(days=args.older_than_days),
+        batch_size=args.batch_size,
+        max_batches=args.max_batches,
+    )
+    print(f"archived {total} work orders")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Iterable, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from . import changes, models
+
+
+@dataclass(frozen=True)
+class CachedAsset:
+    asset_id: int
+    name: str
+    version: int
+    body: bytes  # AssetRead, JSON-encoded exactly as the route would send it
+    expires_at: float
+
+
+class AssetCache:
+    """
+    Bounded LRU cache of serialized ``AssetRead`` payloads with a TTL.
+
+    Entries are keyed by id and reachable by lower-cased name. Writers invalidate
+    through ``app.changes`` once their transaction commits; the TTL bounds staleness
+    for anything that bypasses the crud helpers.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, CachedAsset] = OrderedDict()
+        self._ids_by_name: dict[str, int] = {}
+        # Bumped on every invalidation so a fill that raced with a write is discarded.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, asset_id: int) -> Optional[CachedAsset]:
+        with self._lock:
+            return self._lookup(asset_id)
+
+    def get_by_name(self, name: str) -> Optional[CachedAsset]:
+        with self._lock:
+            asset_id = self._ids_by_name.get(name.lower())
+            if asset_id is None:
+                self.misses += 1
+                return None
+            return self._lookup(asset_id)
+
+    def put(
+        self, asset_id: int, name: str, version: int, body: bytes, *, generation: int
+    ) -> CachedAsset:
+        """Store a payload read at ``generation``; stale fills are returned but not kept."""
+        entry = CachedAsset(asset_id, name, version, body, self._clock() + self.ttl_seconds)
+        with self._lock:
+            if generation != self._generation:
+                return entry
+            self._drop(asset_id)
+            self._entries[asset_id] = entry
+            self._ids_by_name[name.lower()] = asset_id
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._drop_name(evicted)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, asset_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for asset_id in asset_ids:
+                if self._drop(asset_id):
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._ids_by_name.clear()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _lookup(self, asset_id: int) -> Optional[CachedAsset]:
+        entry = self._entries.get(asset_id)
+        if entry is not None and entry.expires_at <= self._clock():
+            self._drop(asset_id)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(asset_id)
+        self.hits += 1
+        return entry
+
+    def _drop(self, asset_id: int) -> bool:
+        entry = self._entries.pop(asset_id, None)
+        if entry is None:
+            return False
+        self._drop_name(entry)
+        return True
+
+    def _drop_name(self, entry: CachedAsset) -> None:
+        # The name may have moved to another cached asset since ``entry`` was stored.
+        key = entry.name.lower()
+        if self._ids_by_name.get(key) == entry.asset_id:
+            del self._ids_by_name[key]
+
+
+class InvalidationChannel:
+    """
+    Cross-worker invalidation through the ``cache_invalidations`` table.
+
+    Writers append the affected asset ids in their own transaction; every worker polls
+    for rows newer than the last one it saw, at most once per ``poll_interval``, so
+    another worker's write is visible here within that interval.
+    """
+
+    def __init__(
+        self,
+        cache: AssetCache,
+        poll_interval: float = 1.0,
+        retention: timedelta = timedelta(minutes=10),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_seen: Optional[int] = None
+        self._next_poll = 0.0
+
+    def publish(self, db: Session, asset_ids: Iterable[int]) -> None:
+        rows = [{"asset_id": asset_id} for asset_id in asset_ids]
+        if rows:
+            db.execute(insert(models.CacheInvalidation), rows)
+
+    def poll(self, db: Session) -> None:
+        with self._lock:
+            now = self._clock()
+            if now < self._next_poll:
+                return
+            self._next_poll = now + self.poll_interval
+            last_seen = self._last_seen
+        table = models.CacheInvalidation
+        # A connection of its own, so the pruning commit never commits (or flushes) the
+        # caller's request session.
+        with db.get_bind().begin() as connection:
+            if last_seen is None:
+                # Nothing is cached before the first poll, so older rows are irrelevant.
+                latest = connection.scalar(select(func.max(table.id)))
+                self.cache.clear()
+                self._last_seen = latest or 0
+                return
+            rows = connection.execute(
+                select(table.id, table.asset_id).where(table.id > last_seen).order_by(table.id)
+            ).all()
+            if rows:
+                self.cache.invalidate(row.asset_id for row in rows)
+                self._last_seen = rows[-1].id
+                connection.execute(
+                    delete(table).where(table.created_at < datetime.now(UTC) - self.retention)
+                )
+
+
+# Only these change the AssetRead payload; telemetry does not.
+_CACHED_ENTITIES = {"asset", "work_order"}
+
+
+def _affected_assets(pending: Sequence[changes.Change]) -> set[int]:
+    return {
+        change.asset_id
+        for change in pending
+        if change.asset_id is not None and change.entity in _CACHED_ENTITIES
+    }
+
+
+asset_cache = AssetCache(
+    maxsize=int(os.getenv("ASSET_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("ASSET_CACHE_TTL", "30")),
+)
+# Set ASSET_CACHE_CHANNEL=table when running several uvicorn workers.
+invalidation_channel: Optional[InvalidationChannel] = (
+    InvalidationChannel(asset_cache)
+    if os.getenv("ASSET_CACHE_CHANNEL", "local") == "table"
+    else None
+)
+
+
+def sync(db: Session) -> None:
+    """Apply invalidations published by other workers, if the channel is enabled."""
+    if invalidation_channel is not None:
+        invalidation_channel.poll(db)
+
+
+@changes.on_before_commit
+def _publish_invalidations(db: Session, pending: Sequence[changes.Change]) -> None:
+    if invalidation_channel is not None:
+        invalidation_channel.publish(db, _affected_assets(pending))
+
+
+@changes.on_commit
+def _invalidate_committed(pending: Sequence[changes.Change]) -> None:
+    asset_cache.invalidate(_affected_assets(pending))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Write helpers in ``crud`` record what they changed on the session; subscribers see the
+# changes only once the transaction has committed, and never for rolled back work.
+# Listeners are attached to the Session class, so AsyncSession (whose writes run on a
+# sync Session underneath) is covered too.
+
+_PENDING_KEY = "pending_changes"
+
+
+class State(NamedTuple):
+    status: Optional[str] = None
+    priority: Optional[str] = None  # work orders only
+
+
+def state(obj: Any) -> State:
+    """The filterable state of ``obj`` (a model, row or schema)."""
+    values = (getattr(obj, "status", None), getattr(obj, "priority", None))
+    return State(*(value.value if isinstance(value, Enum) else value for value in values))
+
+
+@dataclass(frozen=True)
+class Change:
+    entity: str  # "asset", "work_order" or "telemetry"
+    action: str  # "created", "updated", "deleted" or "archived" (work orders)
+    entity_id: int
+    asset_id: Optional[int] = None  # owning asset; equals entity_id for assets
+    # Carried so subscribers can filter without reading rows back: the state after the
+    # change (before it, for deletes) and, for updates, the state before it.
+    state: State = State()
+    previous: Optional[State] = None
+
+
+def asset_change(
+    action: str, asset: Any, *, asset_id: Optional[int] = None, previous: Optional[State] = None
+) -> Change:
+    asset_id = asset.id if asset_id is None else asset_id
+    return Change("asset", action, asset_id, asset_id, state(asset), previous)
+
+
+def work_order_change(
+    action: str,
+    work_order: Any,
+    *,
+    work_order_id: Optional[int] = None,
+    previous: Optional[State] = None,
+) -> Change:
+    return Change(
+        "work_order",
+        action,
+        work_order.id if work_order_id is None else work_order_id,
+        work_order.asset_id,
+        state(work_order),
+        previous,
+    )
+
+
+Listener = Callable[[Session, Sequence[Change]], None]
+CommitListener = Callable[[Sequence[Change]], None]
+
+_before_commit: list[Listener] = []
+_after_commit: list[CommitListener] = []
+
+
+def record(db: Session, *changes: Change) -> None:
+    db.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+def on_before_commit(listener: Listener) -> Listener:
+    """Run ``listener`` inside the transaction, e.g. to write derived rows with it."""
+    _before_commit.append(listener)
+    return listener
+
+
+def on_commit(listener: CommitListener) -> CommitListener:
+    """Run ``listener`` after a successful commit, e.g. to invalidate caches."""
+    _after_commit.append(listener)
+    return listener
+
+
+@event.listens_for(Session, "before_commit")
+def _dispatch_before_commit(session: Session) -> None:
+    pending = session.info.get(_PENDING_KEY)
+    if pending:
+        for listener in _before_commit:
+            listener(session, pending)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        for listener in _after_commit:
+            listener(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
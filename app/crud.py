@@ -1,14 +1,44 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Optional, Sequence, Union
 
 from fastapi import HTTPException, status
-from sqlalchemy import Select, func, select
+from sqlalchemy import (
+    Delete,
+    Row,
+    Select,
+    Update,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+    union_all,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 
-from . import models, schemas
+from . import (
+    cache,
+    changes,
+    history,
+    models,
+    responses,
+    schedule,
+    schemas,
+    search as asset_search,
+    stats,
+)
+from .changes import Change
+from .pagination import Cursor
 
 
 # Asset CRUD helpers -----------------------------------------------------------------
@@ -19,33 +49,305 @@ def get_asset_or_404(db: Session, asset_id: int) -> models.Asset:
     return asset
 
 
+def get_asset_payload(db: Session, asset_id: int) -> cache.CachedAsset:
+    """Return the serialized ``AssetRead`` for ``asset_id``, from the cache when possible."""
+    cache.sync(db)
+    cached = cache.asset_cache.get(asset_id)
+    if cached is not None:
+        return cached
+    generation = cache.asset_cache.generation
+    asset = get_asset_or_404(db, asset_id)
+    body = encode_json(schemas.AssetRead.model_validate(asset).model_dump(mode="json"))
+    return cache.asset_cache.put(
+        asset.id, asset.name, asset.version, body, generation=generation
+    )
+
+
+def encode_json(content: object) -> bytes:
+    # Same encoding as fastapi.responses.JSONResponse, so cached bodies are byte-identical.
+    return responses.dumps(content)
+
+
 def get_asset_by_name(db: Session, name: str) -> Optional[models.Asset]:
     stmt = select(models.Asset).where(func.lower(models.Asset.name) == name.lower())
     return db.execute(stmt).scalar_one_or_none()
 
 
-def list_assets(
-    db: Session,
+# List endpoints select plain columns, named and ordered like the response models'
+# fields, and serialize the rows without building ORM objects (see ``app.responses``).
+# A ``fields=`` parameter narrows both the SELECT and the response to a subset.
+ASSET_ROW_FIELDS = tuple(
+    field for field in schemas.AssetRead.model_fields if field != "work_orders"
+)
+ASSET_NESTED_FIELDS = {
+    schemas.AssetListView.summary: ("work_order_counts", "open_work_orders"),
+    schemas.AssetListView.full: ("work_orders",),
+}
+WORK_ORDER_ROW_FIELDS = tuple(schemas.WorkOrderRead.model_fields)
+# Always selected, after the requested fields: nested lookups, cursors and ETags use them.
+_LIST_KEYS = ("id", "created_at", "version")
+
+
+def parse_fields(value: Optional[str], allowed: Sequence[str]) -> tuple[str, ...]:
+    """Fields named by a comma-separated ``fields=`` value, in response order; all if None."""
+    if value is None:
+        return tuple(allowed)
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Unknown fields: {', '.join(sorted(unknown))}. " if unknown else ""
+            )
+            + f"Choose from: {', '.join(allowed)}",
+        )
+    return tuple(field for field in allowed if field in requested)
+
+
+def parse_asset_fields(
+    value: Optional[str], view: schemas.AssetListView
+) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Split a ``fields=`` value for the asset list into column and nested fields."""
+    selected = parse_fields(value, ASSET_ROW_FIELDS + ASSET_NESTED_FIELDS[view])
+    return (
+        tuple(field for field in selected if field in ASSET_ROW_FIELDS),
+        tuple(field for field in selected if field not in ASSET_ROW_FIELDS),
+    )
+
+
+def _row_columns(model: type[models.Base], fields: Sequence[str]) -> list:
+    return [getattr(model, field) for field in fields] + [
+        getattr(model, key) for key in _LIST_KEYS if key not in fields
+    ]
+
+
+def asset_list_query(
+    dialect: str,
     *,
+    fields: Sequence[str] = ASSET_ROW_FIELDS,
     skip: int = 0,
     limit: int = 50,
     status_filter: Optional[schemas.AssetStatus] = None,
     search: Optional[str] = None,
-) -> Iterable[models.Asset]:
-    stmt: Select[tuple[models.Asset]] = select(models.Asset).options(
-        joinedload(models.Asset.work_orders)
-    )
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    """Build the asset list statement; shared by the sync and async helpers."""
+    stmt = select(*_row_columns(models.Asset, fields))
     if status_filter:
         stmt = stmt.where(models.Asset.status == status_filter)
     if search:
-        search_like = f"%{search.lower()}%"
-        stmt = stmt.where(func.lower(models.Asset.name).like(search_like))
-    stmt = stmt.order_by(models.Asset.created_at.desc())
-    stmt = stmt.offset(skip).limit(limit)
-    return db.execute(stmt).unique().scalars().all()
+        stmt = _apply_asset_search(stmt, dialect, search)
+    if cursor:
+        stmt = stmt.where(tuple_(models.Asset.created_at, models.Asset.id) < cursor)
+    # ``id`` breaks ties so the ordering matches ix_assets_created_at_id exactly.
+    stmt = stmt.order_by(models.Asset.created_at.desc(), models.Asset.id.desc())
+    return stmt.offset(skip).limit(limit)
+
+
+def list_assets(
+    db: Session,
+    *,
+    fields: Sequence[str] = ASSET_ROW_FIELDS,
+    skip: int = 0,
+    limit: int = 50,
+    status_filter: Optional[schemas.AssetStatus] = None,
+    search: Optional[str] = None,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    stmt = asset_list_query(
+        db.get_bind().dialect.name,
+        fields=fields,
+        skip=skip,
+        limit=limit,
+        status_filter=status_filter,
+        search=search,
+        cursor=cursor,
+    )
+    return db.execute(stmt).all()
+
+
+def _apply_asset_search(stmt: Select, dialect: str, term: str) -> Select:
+    """Filter ``stmt`` to assets matching ``term`` and order them by relevance."""
+    if dialect == "sqlite" and len(term) >= asset_search.MIN_TRIGRAM_LENGTH:
+        fts_table = table(asset_search.SQLITE_FTS_TABLE, column("rowid"))
+        fts = literal_column(asset_search.SQLITE_FTS_TABLE)
+        stmt = stmt.join(fts_table, fts_table.c.rowid == models.Asset.id).where(
+            fts.match(asset_search.fts_phrase(term))
+        )
+        # Lower bm25 is better; a hit on the name outweighs category and location.
+        return stmt.order_by(func.bm25(fts, 10.0, 2.0, 1.0))
+    if dialect == "postgresql":
+        document = literal_column(asset_search.POSTGRES_SEARCH_DOCUMENT)
+        stmt = stmt.where(document.contains(term.lower(), autoescape=True))
+        return stmt.order_by(func.similarity(document, term.lower()).desc())
+    return stmt.where(
+        or_(
+            *(
+                func.lower(getattr(models.Asset, column)).contains(term.lower(), autoescape=True)
+                for column in asset_search.SEARCH_COLUMNS
+            )
+        )
+    )
+
+
+WorkOrderCounts = dict[int, dict[str, dict[str, int]]]
+RecentWorkOrders = dict[int, list[dict[str, object]]]
+
+
+def work_order_count_query(asset_ids: list[int]) -> Select:
+    return (
+        select(
+            models.WorkOrder.asset_id,
+            models.WorkOrder.status,
+            models.WorkOrder.priority,
+            func.count(),
+        )
+        .where(models.WorkOrder.asset_id.in_(asset_ids))
+        .group_by(
+            models.WorkOrder.asset_id, models.WorkOrder.status, models.WorkOrder.priority
+        )
+    )
+
+
+def recent_open_work_order_query(asset_ids: list[int], open_limit: int) -> Select:
+    row_number = (
+        func.row_number()
+        .over(
+            partition_by=models.WorkOrder.asset_id,
+            order_by=(models.WorkOrder.created_at.desc(), models.WorkOrder.id.desc()),
+        )
+        .label("row_number")
+    )
+    ranked = (
+        select(
+            models.WorkOrder.id,
+            models.WorkOrder.asset_id,
+            models.WorkOrder.title,
+            models.WorkOrder.status,
+            models.WorkOrder.priority,
+            row_number,
+        )
+        .where(
+            models.WorkOrder.asset_id.in_(asset_ids),
+            models.WorkOrder.status == schemas.WorkOrderStatus.open,
+        )
+        .subquery()
+    )
+    return (
+        select(ranked.c.id, ranked.c.asset_id, ranked.c.title, ranked.c.status, ranked.c.priority)
+        .where(ranked.c.row_number <= open_limit)
+        .order_by(ranked.c.asset_id, ranked.c.row_number)
+    )
+
+
+def asset_work_order_query(asset_ids: list[int]) -> Select:
+    """Work order summaries of ``asset_ids`` for the full list view."""
+    wo = models.WorkOrder
+    return (
+        select(wo.asset_id, wo.id, wo.title, wo.status, wo.priority)
+        .where(wo.asset_id.in_(asset_ids))
+        .order_by(wo.asset_id, wo.id)
+    )
+
+
+def fold_asset_work_orders(asset_ids: list[int], rows: Iterable) -> RecentWorkOrders:
+    work_orders: RecentWorkOrders = {asset_id: [] for asset_id in asset_ids}
+    for asset_id, work_order_id, title, wo_status, priority in rows:
+        work_orders[asset_id].append(
+            {"id": work_order_id, "title": title, "status": wo_status, "priority": priority}
+        )
+    return work_orders
+
+
+def list_asset_work_orders(db: Session, asset_ids: list[int]) -> RecentWorkOrders:
+    if not asset_ids:
+        return {}
+    return fold_asset_work_orders(asset_ids, db.execute(asset_work_order_query(asset_ids)))
+
+
+def fold_work_order_summary(
+    asset_ids: list[int], count_rows: Iterable, open_rows: Iterable
+) -> tuple[WorkOrderCounts, RecentWorkOrders]:
+    counts: WorkOrderCounts = {asset_id: {} for asset_id in asset_ids}
+    recent_open: RecentWorkOrders = {asset_id: [] for asset_id in asset_ids}
+    for asset_id, wo_status, priority, total in count_rows:
+        counts[asset_id].setdefault(wo_status.value, {})[priority.value] = total
+    for row in open_rows:
+        recent_open[row.asset_id].append(
+            {"id": row.id, "title": row.title, "status": row.status, "priority": row.priority}
+        )
+    return counts, recent_open
+
+
+def summarize_work_orders(
+    db: Session, asset_ids: list[int], *, open_limit: int = 5, with_counts: bool = True
+) -> tuple[WorkOrderCounts, RecentWorkOrders]:
+    """
+    Return per-asset work order counts and the most recent open work orders.
+
+    Counts come from one grouped query and the open work orders from one windowed
+    query, so the cost does not grow with the number of historical work orders.
+    """
+    if not asset_ids:
+        return {}, {}
+    count_rows = db.execute(work_order_count_query(asset_ids)).all() if with_counts else []
+    open_rows = (
+        db.execute(recent_open_work_order_query(asset_ids, open_limit)).all()
+        if open_limit > 0
+        else []
+    )
+    return fold_work_order_summary(asset_ids, count_rows, open_rows)
+
+
+AssetNested = dict[str, Union[WorkOrderCounts, RecentWorkOrders]]
+
+
+def list_asset_nested(
+    db: Session, fields: Sequence[str], asset_ids: list[int], *, open_limit: int = 5
+) -> AssetNested:
+    """Load only the nested work order data that ``fields`` asks for."""
+    nested: AssetNested = {}
+    if "work_orders" in fields:
+        nested["work_orders"] = list_asset_work_orders(db, asset_ids)
+    want_counts, want_open = "work_order_counts" in fields, "open_work_orders" in fields
+    if want_counts or want_open:
+        counts, recent_open = summarize_work_orders(
+            db, asset_ids, open_limit=open_limit if want_open else 0, with_counts=want_counts
+        )
+        if want_counts:
+            nested["work_order_counts"] = counts
+        if want_open:
+            nested["open_work_orders"] = recent_open
+    return nested
+
+
+def build_asset_rows(
+    assets: Iterable[Row], fields: Sequence[str], nested: AssetNested
+) -> list[dict[str, object]]:
+    """
+    Shape asset rows as ``schemas.AssetListItem``: the selected ``fields`` (the leading
+    columns of each row) followed by the nested work order data, keyed by asset id.
+    """
+    return [
+        {
+            **dict(zip(fields, asset)),
+            **{field: values[asset.id] for field, values in nested.items()},
+        }
+        for asset in assets
+    ]
+
+
+def build_work_order_rows(
+    work_orders: Iterable[Row], fields: Sequence[str] = WORK_ORDER_ROW_FIELDS
+) -> list[dict[str, object]]:
+    """Shape work order rows as ``schemas.WorkOrderRead``, limited to ``fields``."""
+    return [dict(zip(fields, work_order)) for work_order in work_orders]
 
 
 def create_asset(db: Session, payload: schemas.AssetCreate) -> models.Asset:
+    # The database decides: a cached name may be stale once another worker renames or
+    # deletes the asset.
     if get_asset_by_name(db, payload.name):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -53,68 +355,324 @@ def create_asset(db: Session, payload: schemas.AssetCreate) -> models.Asset:
         )
     asset = models.Asset(**payload.model_dump())
     db.add(asset)
+    db.flush()
+    changes.record(db, changes.asset_change("created", asset))
+    stats.apply(db, stats.StatsDelta().asset(asset))
     db.commit()
     db.refresh(asset)
     return asset
 
 
 def update_asset(db: Session, asset: models.Asset, payload: schemas.AssetUpdate) -> models.Asset:
+    delta = stats.StatsDelta().asset(asset, -1)
+    previous = changes.state(asset)
     update_data = payload.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(asset, field, value)
     asset.updated_at = datetime.now(UTC)
     db.add(asset)
-    db.commit()
+    changes.record(db, changes.asset_change("updated", asset, previous=previous))
+    stats.apply(db, delta.asset(asset))
+    try:
+        db.commit()
+    except StaleDataError as exc:
+        db.rollback()
+        raise concurrent_update_error("Asset") from exc
     db.refresh(asset)
     return asset
 
 
 def delete_asset(db: Session, asset: models.Asset) -> None:
+    changes.record(db, changes.asset_change("deleted", asset))
+    stats.apply(db, stats.StatsDelta().asset(asset, -1))
+    stats.forget_asset(db, asset.id)
     db.delete(asset)
+    # Flushed first so the history listener still sees the work orders it records.
+    db.flush()
+    for stmt in asset_work_orders_delete(asset.id):
+        db.execute(stmt)
     db.commit()
 
 
+def asset_work_orders_delete(asset_id: int) -> tuple[Delete, ...]:
+    """
+    Remove an asset's work orders, live and archived. Their foreign keys cascade, but
+    SQLite enforces foreign keys only when asked to and the ORM cascade only reaches
+    loaded rows, so the deletes are explicit.
+    """
+    return tuple(
+        delete(table).where(table.c.asset_id == asset_id)
+        for table in (models.WorkOrder.__table__, models.ArchivedWorkOrder.__table__)
+    )
+
+
+def bulk_create_assets(
+    db: Session, payload: schemas.AssetBulkCreate, *, upsert: bool = False
+) -> list[dict[str, object]]:
+    """
+    Insert (or upsert by name) a batch of assets in a single transaction.
+
+    Existing names are resolved with one query up front, then new rows and updates
+    are each sent as one executemany, so the cost is a fixed number of round trips
+    and one commit regardless of batch size.
+    """
+    items = payload.items
+    existing = {
+        row.key: row
+        for row in db.execute(
+            select(
+                func.lower(models.Asset.name).label("key"),
+                models.Asset.id,
+                models.Asset.status,
+                models.Asset.category,
+                models.Asset.capacity_mw,
+                models.Asset.created_at,
+                models.Asset.version,
+            ).where(func.lower(models.Asset.name).in_([item.name.lower() for item in items]))
+        )
+    }
+
+    results: list[dict[str, object]] = [{} for _ in items]
+    new_rows: list[tuple[int, dict[str, object]]] = []
+    updates: list[dict[str, object]] = []
+    previous: dict[int, changes.State] = {}
+    current_rows: dict[int, Row] = {}
+    delta = stats.StatsDelta()
+    now = datetime.now(UTC)
+    for index, item in enumerate(items):
+        current = existing.get(item.name.lower())
+        if current is None:
+            new_rows.append((index, {**item.model_dump(), "created_at": now, "updated_at": now}))
+            delta.asset(item)
+        elif upsert:
+            updates.append({"id": current.id, **item.model_dump(), "updated_at": now})
+            current_rows[current.id] = current
+            results[index] = {"index": index, "id": current.id, "result": "updated"}
+            previous[index] = changes.state(current)
+            delta.asset(current, -1).asset(item)
+        else:
+            results[index] = {
+                "index": index,
+                "id": current.id,
+                "result": "conflict",
+                "detail": "Asset with this name already exists",
+            }
+
+    stats.apply(db, delta)
+    _bulk_write(
+        db,
+        models.Asset,
+        new_rows,
+        updates,
+        current_rows,
+        results,
+        lambda action, index, row_id: changes.asset_change(
+            action, items[index], asset_id=row_id, previous=previous.get(index)
+        ),
+    )
+    return results
+
+
+# Builds the Change for batch item ``index`` given its action and row id.
+BulkChange = Callable[[str, int, int], Change]
+
+
+def _record_bulk(db: Session, results: list[dict[str, object]], changed: BulkChange) -> None:
+    """Record the rows a bulk write created or updated."""
+    changes.record(
+        db,
+        *(
+            changed(str(result["result"]), index, int(result["id"]))
+            for index, result in enumerate(results)
+            if result.get("result") in ("created", "updated")
+        ),
+    )
+
+
+def concurrent_update_error(entity: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{entity} was modified concurrently; retry the update",
+    )
+
+
+def asset_touch_query(asset_ids: Iterable[int]) -> Update:
+    """Advance the version of assets whose embedded work orders changed."""
+    assets = models.Asset.__table__
+    return (
+        update(assets)
+        .where(assets.c.id.in_(set(asset_ids)))
+        # Keep updated_at: only the nested work orders changed, not the asset itself.
+        .values(version=assets.c.version + 1, updated_at=assets.c.updated_at)
+    )
+
+
+def _touch_assets(db: Session, asset_ids: Iterable[int]) -> int:
+    """Bump asset versions and return how many assets exist among ``asset_ids``."""
+    return db.execute(asset_touch_query(asset_ids)).rowcount
+
+
+def related_asset_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Related asset not found",
+    )
+
+
+def _bulk_write(
+    db: Session,
+    model: type[models.Base],
+    new_rows: list[tuple[int, dict[str, object]]],
+    updates: list[dict[str, object]],
+    current_rows: dict[int, Row],
+    results: list[dict[str, object]],
+    changed: BulkChange,
+) -> None:
+    # Core writes bypass the ORM flush that records history, so rows are recorded here.
+    entries = []
+    if new_rows:
+        inserted_ids = db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [row for _, row in new_rows],
+        ).all()
+        for (index, row), row_id in zip(new_rows, inserted_ids):
+            results[index] = {"index": index, "id": row_id, "result": "created"}
+            entries.append(history.entry(model, "created", {"id": row_id, "version": 1, **row}))
+    for row in updates:
+        current = current_rows[row["id"]]
+        state = {**row, "created_at": current.created_at, "version": current.version + 1}
+        set_columns = {key: value for key, value in row.items() if key != "id"}
+        entries.append(history.entry(model, "updated", state, set_columns))
+    history.record(db, entries)
+    if updates:
+        # Core executemany: the ORM would fall back to one versioned UPDATE per row.
+        table = model.__table__
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(version=table.c.version + 1),
+            [{"row_id": row.pop("id"), **row} for row in updates],
+        )
+    _record_bulk(db, results, changed)
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch conflicts with rows written concurrently; retry the batch",
+        ) from exc
+
+
 # Work order CRUD helpers -------------------------------------------------------------
+def _work_order_branch(
+    model: type[models.Base],
+    fields: Sequence[str],
+    status_filter: Optional[schemas.WorkOrderStatus],
+    priority_filter: Optional[schemas.WorkOrderPriority],
+    asset_id: Optional[int],
+    cursor: Optional[Cursor],
+) -> Select:
+    stmt = select(*_row_columns(model, fields))
+    if status_filter:
+        stmt = stmt.where(model.status == status_filter)
+    if priority_filter:
+        stmt = stmt.where(model.priority == priority_filter)
+    if asset_id:
+        stmt = stmt.where(model.asset_id == asset_id)
+    if cursor:
+        stmt = stmt.where(tuple_(model.created_at, model.id) < cursor)
+    return stmt.order_by(model.created_at.desc(), model.id.desc())
+
+
+def work_order_list_query(
+    *,
+    fields: Sequence[str] = WORK_ORDER_ROW_FIELDS,
+    skip: int = 0,
+    limit: int = 50,
+    status_filter: Optional[schemas.WorkOrderStatus] = None,
+    priority_filter: Optional[schemas.WorkOrderPriority] = None,
+    asset_id: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
+    include_archived: bool = False,
+) -> Select:
+    """
+    Build the work order list statement; shared by the sync and async helpers.
+
+    With ``include_archived`` each table reads at most ``skip + limit`` rows from its own
+    (filter, created_at, id) index, and only those are merged and paged.
+    """
+    filters = (fields, status_filter, priority_filter, asset_id, cursor)
+    stmt = _work_order_branch(models.WorkOrder, *filters)
+    if not include_archived:
+        return stmt.offset(skip).limit(limit)
+    merged = union_all(
+        *(
+            select(_work_order_branch(model, *filters).limit(skip + limit).subquery())
+            for model in (models.WorkOrder, models.ArchivedWorkOrder)
+        )
+    ).subquery()
+    return (
+        select(merged)
+        .order_by(merged.c.created_at.desc(), merged.c.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+
 def list_work_orders(
     db: Session,
     *,
+    fields: Sequence[str] = WORK_ORDER_ROW_FIELDS,
     skip: int = 0,
     limit: int = 50,
     status_filter: Optional[schemas.WorkOrderStatus] = None,
     priority_filter: Optional[schemas.WorkOrderPriority] = None,
     asset_id: Optional[int] = None,
-) -> Iterable[models.WorkOrder]:
-    stmt: Select[tuple[models.WorkOrder]] = select(models.WorkOrder).options(
-        joinedload(models.WorkOrder.asset)
+    cursor: Optional[Cursor] = None,
+    include_archived: bool = False,
+) -> Sequence[Row]:
+    stmt = work_order_list_query(
+        fields=fields,
+        skip=skip,
+        limit=limit,
+        status_filter=status_filter,
+        priority_filter=priority_filter,
+        asset_id=asset_id,
+        cursor=cursor,
+        include_archived=include_archived,
     )
-    if status_filter:
-        stmt = stmt.where(models.WorkOrder.status == status_filter)
-    if priority_filter:
-        stmt = stmt.where(models.WorkOrder.priority == priority_filter)
-    if asset_id:
-        stmt = stmt.where(models.WorkOrder.asset_id == asset_id)
-    stmt = stmt.order_by(models.WorkOrder.created_at.desc())
-    stmt = stmt.offset(skip).limit(limit)
-    return db.execute(stmt).unique().scalars().all()
+    return db.execute(stmt).all()
 
 
-def get_work_order_or_404(db: Session, work_order_id: int) -> models.WorkOrder:
+def get_work_order_or_404(
+    db: Session, work_order_id: int, *, include_archived: bool = False
+) -> Union[models.WorkOrder, models.ArchivedWorkOrder]:
+    """The work order, falling back to its archived copy when ``include_archived``."""
     work_order = db.get(models.WorkOrder, work_order_id)
+    if work_order is None and include_archived:
+        work_order = db.get(models.ArchivedWorkOrder, work_order_id)
     if work_order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Work order not found")
     return work_order
 
 
+# Updates that touch none of these cannot create or resolve a schedule conflict.
+SCHEDULE_FIELDS = {"scheduled_start", "scheduled_end", "status"}
+
+
 def create_work_order(db: Session, payload: schemas.WorkOrderCreate) -> models.WorkOrder:
-    asset = db.get(models.Asset, payload.asset_id)
-    if asset is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Related asset not found",
-        )
+    # The version bump doubles as the existence check, saving a SELECT of the asset.
+    if not _touch_assets(db, [payload.asset_id]):
+        db.rollback()
+        raise related_asset_not_found()
     work_order = models.WorkOrder(**payload.model_dump())
+    work_order.schedule_conflicts = schedule.check(db, work_order)
     db.add(work_order)
+    stats.apply(db, stats.StatsDelta().work_order(payload))
     try:
+        db.flush()
+        changes.record(db, changes.work_order_change("created", work_order))
         db.commit()
     except IntegrityError as exc:
         db.rollback()
@@ -129,11 +687,18 @@ def create_work_order(db: Session, payload: schemas.WorkOrderCreate) -> models.W
 def update_work_order(
     db: Session, work_order: models.WorkOrder, payload: schemas.WorkOrderUpdate
 ) -> models.WorkOrder:
+    delta = stats.StatsDelta().work_order(work_order, -1)
+    previous = changes.state(work_order)
     update_data = payload.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(work_order, field, value)
     work_order.updated_at = datetime.now(UTC)
     db.add(work_order)
+    _touch_assets(db, [work_order.asset_id])
+    if update_data.keys() & SCHEDULE_FIELDS:
+        work_order.schedule_conflicts = schedule.check(db, work_order)
+    changes.record(db, changes.work_order_change("updated", work_order, previous=previous))
+    stats.apply(db, delta.work_order(work_order))
     try:
         db.commit()
     except IntegrityError as exc:
@@ -142,10 +707,256 @@ def update_work_order(
             status_code=status.HTTP_409_CONFLICT,
             detail="Work order with this title already exists for the asset",
         ) from exc
+    except StaleDataError as exc:
+        db.rollback()
+        raise concurrent_update_error("Work order") from exc
     db.refresh(work_order)
     return work_order
 
 
 def delete_work_order(db: Session, work_order: models.WorkOrder) -> None:
+    _touch_assets(db, [work_order.asset_id])
+    changes.record(db, changes.work_order_change("deleted", work_order))
+    stats.apply(db, stats.StatsDelta().work_order(work_order, -1))
     db.delete(work_order)
     db.commit()
+
+
+def bulk_create_work_orders(
+    db: Session, payload: schemas.WorkOrderBulkCreate, *, upsert: bool = False
+) -> list[dict[str, object]]:
+    """Insert (or upsert by ``(asset_id, title)``) a batch of work orders in one transaction."""
+    items = payload.items
+    asset_ids = {item.asset_id for item in items}
+    known_assets = set(
+        db.scalars(select(models.Asset.id).where(models.Asset.id.in_(asset_ids))).all()
+    )
+    # Superset lookup on both columns; exact (asset_id, title) pairs are matched below.
+    existing = {
+        (row.asset_id, row.title): row
+        for row in db.execute(
+            select(
+                models.WorkOrder.id,
+                models.WorkOrder.asset_id,
+                models.WorkOrder.title,
+                models.WorkOrder.status,
+                models.WorkOrder.priority,
+                models.WorkOrder.created_at,
+                models.WorkOrder.version,
+            ).where(
+                models.WorkOrder.asset_id.in_(known_assets),
+                models.WorkOrder.title.in_({item.title for item in items}),
+            )
+        )
+    }
+
+    results: list[dict[str, object]] = [{} for _ in items]
+    # Index -> the stored row an upsert rewrites, or None for an insert.
+    writes: dict[int, Optional[Row]] = {}
+    for index, item in enumerate(items):
+        if item.asset_id not in known_assets:
+            results[index] = {
+                "index": index,
+                "result": "not_found",
+                "detail": "Related asset not found",
+            }
+            continue
+        current = existing.get((item.asset_id, item.title))
+        if current is None or upsert:
+            writes[index] = current
+        else:
+            results[index] = {
+                "index": index,
+                "id": current.id,
+                "result": "conflict",
+                "detail": "Work order with this title already exists for the asset",
+            }
+
+    touched = {items[index].asset_id for index in writes}
+    if touched:
+        _touch_assets(db, touched)
+    # After the version bump has locked the assets, as for single writes.
+    overlaps = schedule.batch_conflicts(
+        db,
+        [
+            (
+                index,
+                items[index].asset_id,
+                items[index].scheduled_start,
+                items[index].scheduled_end or items[index].scheduled_start,
+                None if current is None else current.id,
+            )
+            for index, current in writes.items()
+            if items[index].scheduled_start is not None
+            and items[index].status in schedule.BLOCKING_STATUSES
+        ],
+    )
+    reject = schedule.CONFLICT_POLICY == "reject"
+
+    new_rows: list[tuple[int, dict[str, object]]] = []
+    updates: list[dict[str, object]] = []
+    previous: dict[int, changes.State] = {}
+    current_rows: dict[int, Row] = {}
+    delta = stats.StatsDelta()
+    now = datetime.now(UTC)
+    for index, current in writes.items():
+        item = items[index]
+        if reject and index in overlaps:
+            results[index] = {
+                "index": index,
+                "result": "conflict",
+                "detail": schedule.conflict_detail(*overlaps[index]),
+            }
+            if current is not None:
+                results[index]["id"] = current.id
+        elif current is None:
+            new_rows.append((index, {**item.model_dump(), "created_at": now, "updated_at": now}))
+            delta.work_order(item)
+        else:
+            updates.append({"id": current.id, **item.model_dump(), "updated_at": now})
+            current_rows[current.id] = current
+            results[index] = {"index": index, "id": current.id, "result": "updated"}
+            previous[index] = changes.state(current)
+            delta.work_order(current, -1).work_order(item)
+
+    stats.apply(db, delta)
+    _bulk_write(
+        db,
+        models.WorkOrder,
+        new_rows,
+        updates,
+        current_rows,
+        results,
+        lambda action, index, row_id: changes.work_order_change(
+            action, items[index], work_order_id=row_id, previous=previous.get(index)
+        ),
+    )
+    if not reject:
+        # Written under the warn policy; the detail carries what the header would.
+        for index, found in overlaps.items():
+            results[index]["detail"] = schedule.conflict_detail(*found)
+    return results
+
+
+# Most work orders one transition may select; the same cap as a bulk write.
+TRANSITION_MAX_ROWS = 5000
+
+
+def transition_work_orders(
+    db: Session, payload: schemas.WorkOrderTransition
+) -> dict[str, list[int]]:
+    """
+    Set status, priority and/or completed_at on every work order the filter selects.
+
+    The selected rows are read once, as the bulk writes do, for their stats and change
+    feed states. One UPDATE then writes them all, guarded by the version each was read
+    at and by WorkOrderBase's completed_at rule, and returns the rows it changed. Asset
+    versions, stats and history follow from those rows with one statement each.
+    """
+    wo = models.WorkOrder.__table__
+    where = payload.filter
+    stmt = select(wo.c.id, wo.c.asset_id, wo.c.status, wo.c.priority, wo.c.version)
+    if where.ids is not None:
+        stmt = stmt.where(wo.c.id.in_(where.ids))
+    if where.asset_id is not None:
+        stmt = stmt.where(wo.c.asset_id == where.asset_id)
+    if where.status is not None:
+        stmt = stmt.where(wo.c.status == where.status)
+    if where.priority is not None:
+        stmt = stmt.where(wo.c.priority == where.priority)
+    selected = db.execute(stmt.limit(TRANSITION_MAX_ROWS + 1).with_for_update()).all()
+    if len(selected) > TRANSITION_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Filter selects more than {TRANSITION_MAX_ROWS} work orders; narrow it",
+        )
+    if not selected:
+        return {"updated": [], "skipped": []}
+
+    values = payload.model_dump(exclude_unset=True, exclude={"filter"})
+    values["updated_at"] = datetime.now(UTC)
+    transition = (
+        update(wo)
+        .where(
+            wo.c.id.in_([row.id for row in selected]),
+            # Skips rows written since they were read, whose stats and feed states changed.
+            tuple_(wo.c.id, wo.c.version).in_([(row.id, row.version) for row in selected]),
+        )
+        .values(version=wo.c.version + 1, **values)
+        .returning(*wo.columns)
+    )
+    if payload.completed_at is not None:
+        # completed_at cannot be before scheduled_start, checked against each row.
+        transition = transition.where(
+            or_(
+                wo.c.scheduled_start.is_(None),
+                wo.c.scheduled_start <= payload.completed_at.date(),
+            )
+        )
+    updated = db.execute(transition).all()
+    previous = {row.id: row for row in selected}
+
+    if updated:
+        _touch_assets(db, {row.asset_id for row in updated})
+        delta = stats.StatsDelta()
+        for row in updated:
+            delta.work_order(previous[row.id], -1).work_order(row)
+        stats.apply(db, delta)
+        history.record(
+            db,
+            [history.entry(models.WorkOrder, "updated", row._asdict(), values) for row in updated],
+        )
+        changes.record(
+            db,
+            *(
+                changes.work_order_change(
+                    "updated", row, previous=changes.state(previous[row.id])
+                )
+                for row in updated
+            ),
+        )
+    db.commit()
+    updated_ids = sorted(row.id for row in updated)
+    return {
+        "updated": updated_ids,
+        "skipped": sorted(previous.keys() - set(updated_ids)),
+    }
+
+
+# History ----------------------------------------------------------------------------
+def list_history(
+    db: Session, entity: str, entity_id: int, *, limit: int = 50, cursor: Optional[Cursor] = None
+) -> list[Row]:
+    """History entries of an asset or work order; outlives the row itself."""
+    rows = history.list_entries(db, entity, entity_id, limit=limit, cursor=cursor)
+    if not rows and cursor is None:
+        label = "Asset" if entity == "asset" else "Work order"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{label} not found")
+    return rows
+
+
+def _fields(state: dict[str, object], model: type) -> dict[str, object]:
+    return {field: state[field] for field in model.model_fields}
+
+
+def get_asset_as_of(db: Session, asset_id: int, as_of: datetime) -> dict[str, object]:
+    """``schemas.AssetRead`` fields of the asset as it was at ``as_of``."""
+    asset = history.asset_at(db, asset_id, as_of)
+    if asset is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found at as_of"
+        )
+    asset["work_orders"] = [
+        _fields(work_order, schemas.WorkOrderSummary) for work_order in asset["work_orders"]
+    ]
+    return _fields(asset, schemas.AssetRead)
+
+
+def get_work_order_as_of(db: Session, work_order_id: int, as_of: datetime) -> dict[str, object]:
+    """``schemas.WorkOrderRead`` fields of the work order as it was at ``as_of``."""
+    work_order = history.state_at(db, "work_order", work_order_id, as_of)
+    if work_order is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Work order not found at as_of"
+        )
+    return _fields(work_order, schemas.WorkOrderRead)
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Optional, Sequence, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import Row, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
+
+from . import cache, changes, crud, models, schedule, schemas, stats
+from .pagination import Cursor
+
+# Async counterparts of the helpers in ``crud``. Statements are built by the shared
+# ``crud.*_query`` functions so both paths issue identical SQL. Relationships that
+# responses serialize are loaded eagerly, because lazy loads cannot run on AsyncSession.
+
+# Column attributes plus the relationship that AssetRead embeds.
+_ASSET_REFRESH = [column.key for column in models.Asset.__table__.columns] + ["work_orders"]
+
+
+# Asset CRUD helpers -----------------------------------------------------------------
+async def get_asset_or_404(db: AsyncSession, asset_id: int) -> models.Asset:
+    asset = await db.get(
+        models.Asset, asset_id, options=[selectinload(models.Asset.work_orders)]
+    )
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found")
+    return asset
+
+
+async def get_asset_payload(db: AsyncSession, asset_id: int) -> cache.CachedAsset:
+    if cache.invalidation_channel is not None:
+        await db.run_sync(cache.sync)
+    cached = cache.asset_cache.get(asset_id)
+    if cached is not None:
+        return cached
+    generation = cache.asset_cache.generation
+    asset = await get_asset_or_404(db, asset_id)
+    body = crud.encode_json(schemas.AssetRead.model_validate(asset).model_dump(mode="json"))
+    return cache.asset_cache.put(
+        asset.id, asset.name, asset.version, body, generation=generation
+    )
+
+
+async def get_asset_by_name(db: AsyncSession, name: str) -> Optional[models.Asset]:
+    stmt = select(models.Asset).where(func.lower(models.Asset.name) == name.lower())
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def list_assets(
+    db: AsyncSession,
+    *,
+    fields: Sequence[str] = crud.ASSET_ROW_FIELDS,
+    skip: int = 0,
+    limit: int = 50,
+    status_filter: Optional[schemas.AssetStatus] = None,
+    search: Optional[str] = None,
+    cursor: Optional[Cursor] = None,
+) -> Sequence[Row]:
+    stmt = crud.asset_list_query(
+        db.get_bind().dialect.name,
+        fields=fields,
+        skip=skip,
+        limit=limit,
+        status_filter=status_filter,
+        search=search,
+        cursor=cursor,
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def list_asset_work_orders(
+    db: AsyncSession, asset_ids: list[int]
+) -> crud.RecentWorkOrders:
+    if not asset_ids:
+        return {}
+    rows = await db.execute(crud.asset_work_order_query(asset_ids))
+    return crud.fold_asset_work_orders(asset_ids, rows)
+
+
+async def summarize_work_orders(
+    db: AsyncSession, asset_ids: list[int], *, open_limit: int = 5, with_counts: bool = True
+) -> tuple[crud.WorkOrderCounts, crud.RecentWorkOrders]:
+    if not asset_ids:
+        return {}, {}
+    count_rows = (
+        (await db.execute(crud.work_order_count_query(asset_ids))).all() if with_counts else []
+    )
+    open_rows = (
+        (await db.execute(crud.recent_open_work_order_query(asset_ids, open_limit))).all()
+        if open_limit > 0
+        else []
+    )
+    return crud.fold_work_order_summary(asset_ids, count_rows, open_rows)
+
+
+async def list_asset_nested(
+    db: AsyncSession, fields: Sequence[str], asset_ids: list[int], *, open_limit: int = 5
+) -> crud.AssetNested:
+    nested: crud.AssetNested = {}
+    if "work_orders" in fields:
+        nested["work_orders"] = await list_asset_work_orders(db, asset_ids)
+    want_counts, want_open = "work_order_counts" in fields, "open_work_orders" in fields
+    if want_counts or want_open:
+        counts, recent_open = await summarize_work_orders(
+            db, asset_ids, open_limit=open_limit if want_open else 0, with_counts=want_counts
+        )
+        if want_counts:
+            nested["work_order_counts"] = counts
+        if want_open:
+            nested["open_work_orders"] = recent_open
+    return nested
+
+
+async def create_asset(db: AsyncSession, payload: schemas.AssetCreate) -> models.Asset:
+    # The database decides: a cached name may be stale once another worker renames or
+    # deletes the asset.
+    if await get_asset_by_name(db, payload.name):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Asset with this name already exists",
+        )
+    asset = models.Asset(**payload.model_dump())
+    db.add(asset)
+    await db.flush()
+    changes.record(db.sync_session, changes.asset_change("created", asset))
+    await db.run_sync(stats.apply, stats.StatsDelta().asset(asset))
+    await db.commit()
+    await db.refresh(asset, attribute_names=_ASSET_REFRESH)
+    return asset
+
+
+async def update_asset(
+    db: AsyncSession, asset: models.Asset, payload: schemas.AssetUpdate
+) -> models.Asset:
+    delta = stats.StatsDelta().asset(asset, -1)
+    previous = changes.state(asset)
+    update_data = payload.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(asset, field, value)
+    asset.updated_at = datetime.now(UTC)
+    db.add(asset)
+    changes.record(db.sync_session, changes.asset_change("updated", asset, previous=previous))
+    await db.run_sync(stats.apply, delta.asset(asset))
+    try:
+        await db.commit()
+    except StaleDataError as exc:
+        await db.rollback()
+        raise crud.concurrent_update_error("Asset") from exc
+    await db.refresh(asset, attribute_names=_ASSET_REFRESH)
+    return asset
+
+
+async def delete_asset(db: AsyncSession, asset: models.Asset) -> None:
+    changes.record(db.sync_session, changes.asset_change("deleted", asset))
+    await db.run_sync(stats.apply, stats.StatsDelta().asset(asset, -1))
+    await db.run_sync(stats.forget_asset, asset.id)
+    await db.delete(asset)
+    await db.flush()
+    for stmt in crud.asset_work_orders_delete(asset.id):
+        await db.execute(stmt)
+    await db.commit()
+
+
+# Work order CRUD helpers -------------------------------------------------------------
+async def list_work_orders(
+    db: AsyncSession,
+    *,
+    fields: Sequence[str] = crud.WORK_ORDER_ROW_FIELDS,
+    skip: int = 0,
+    limit: int = 50,
+    status_filter: Optional[schemas.WorkOrderStatus] = None,
+    priority_filter: Optional[schemas.WorkOrderPriority] = None,
+    asset_id: Optional[int] = None,
+    cursor: Optional[Cursor] = None,
+    include_archived: bool = False,
+) -> Sequence[Row]:
+    stmt = crud.work_order_list_query(
+        fields=fields,
+        skip=skip,
+        limit=limit,
+        status_filter=status_filter,
+        priority_filter=priority_filter,
+        asset_id=asset_id,
+        cursor=cursor,
+        include_archived=include_archived,
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def get_work_order_or_404(
+    db: AsyncSession, work_order_id: int, *, include_archived: bool = False
+) -> Union[models.WorkOrder, models.ArchivedWorkOrder]:
+    work_order = await db.get(models.WorkOrder, work_order_id)
+    if work_order is None and include_archived:
+        work_order = await db.get(models.ArchivedWorkOrder, work_order_id)
+    if work_order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Work order not found")
+    return work_order
+
+
+async def create_work_order(
+    db: AsyncSession, payload: schemas.WorkOrderCreate
+) -> models.WorkOrder:
+    if not (await db.execute(crud.asset_touch_query([payload.asset_id]))).rowcount:
+        await db.rollback()
+        raise crud.related_asset_not_found()
+    work_order = models.WorkOrder(**payload.model_dump())
+    work_order.schedule_conflicts = await db.run_sync(schedule.check, work_order)
+    db.add(work_order)
+    await db.run_sync(stats.apply, stats.StatsDelta().work_order(payload))
+    await _commit_work_order(db, work_order, "created")
+    await db.refresh(work_order)
+    return work_order
+
+
+async def update_work_order(
+    db: AsyncSession, work_order: models.WorkOrder, payload: schemas.WorkOrderUpdate
+) -> models.WorkOrder:
+    delta = stats.StatsDelta().work_order(work_order, -1)
+    previous = changes.state(work_order)
+    update_data = payload.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(work_order, field, value)
+    work_order.updated_at = datetime.now(UTC)
+    db.add(work_order)
+    await db.execute(crud.asset_touch_query([work_order.asset_id]))
+    if update_data.keys() & crud.SCHEDULE_FIELDS:
+        work_order.schedule_conflicts = await db.run_sync(schedule.check, work_order)
+    await db.run_sync(stats.apply, delta.work_order(work_order))
+    await _commit_work_order(db, work_order, "updated", previous)
+    await db.refresh(work_order)
+    return work_order
+
+
+async def delete_work_order(db: AsyncSession, work_order: models.WorkOrder) -> None:
+    await db.execute(crud.asset_touch_query([work_order.asset_id]))
+    changes.record(db.sync_session, changes.work_order_change("deleted", work_order))
+    await db.run_sync(stats.apply, stats.StatsDelta().work_order(work_order, -1))
+    await db.delete(work_order)
+    await db.commit()
+
+
+async def _commit_work_order(
+    db: AsyncSession,
+    work_order: models.WorkOrder,
+    action: str,
+    previous: Optional[changes.State] = None,
+) -> None:
+    try:
+        await db.flush()
+        changes.record(
+            db.sync_session, changes.work_order_change(action, work_order, previous=previous)
+        )
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Work order with this title already exists for the asset",
+        ) from exc
+    except StaleDataError as exc:
+        await db.rollback()
+        raise crud.concurrent_update_error("Work order") from exc
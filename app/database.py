@@ -1,11 +1,23 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import Any, AsyncGenerator, Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from . import metrics as request_metrics
 
 
 def _get_database_url() -> str:
@@ -13,20 +25,229 @@ def _get_database_url() -> str:
     return os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
 
+# Async drivers for the sync URLs we support: aiosqlite locally, asyncpg on Postgres.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def _get_async_database_url(url: str) -> str:
+    """Return ``ASYNC_DATABASE_URL`` or derive it from the sync URL's backend."""
+    explicit = os.getenv("ASYNC_DATABASE_URL")
+    if explicit:
+        return explicit
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend!r}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def async_db_enabled() -> bool:
+    """Whether ``create_app`` should mount the async routers (``ASYNC_DB=1``)."""
+    return os.getenv("ASYNC_DB", "").lower() in {"1", "true", "yes"}
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in {"1", "true", "yes"}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def sqlite_pragmas() -> dict[str, str]:
+    """
+    PRAGMAs applied to every new SQLite connection.
+
+    WAL lets readers proceed while a writer commits, NORMAL synchronous is durable in
+    WAL mode except across power loss, and busy_timeout makes writers queue instead of
+    failing with "database is locked".
+    """
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": str(_env_int("SQLITE_BUSY_TIMEOUT_MS", 5_000)),
+        "mmap_size": str(_env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+        # Negative values are KiB, so this is a 64 MiB page cache per connection.
+        "cache_size": str(_env_int("SQLITE_CACHE_SIZE", -64 * 1024)),
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
+
 # SQLite needs check_same_thread disabled for multi-threaded FastAPI usage.
 def _engine_options(url: str) -> dict[str, object]:
     if url.startswith("sqlite"):
         return {"connect_args": {"check_same_thread": False}}
-    return {}
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1_800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+
+class PoolMetrics:
+    """Connection pool counters used to size workers and pools."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hold_seconds_total = 0.0
+        self.hold_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
 
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
 
-DATABASE_URL = _get_database_url()
-engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def record_hold(self, seconds: float) -> None:
+        with self._lock:
+            self.hold_seconds_total += seconds
+            self.hold_seconds_max = max(self.hold_seconds_max, seconds)
+
+    def snapshot(self, pool: Pool) -> dict[str, object]:
+        with self._lock:
+            stats: dict[str, object] = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "hold_seconds_total": round(self.hold_seconds_total, 6),
+                "hold_seconds_max": round(self.hold_seconds_max, 6),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+
+def _timed_pool_class(base: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    """Subclass ``base`` so the time spent waiting for a connection is recorded."""
+
+    class TimedPool(base):  # type: ignore[misc, valid-type]
+        def _do_get(self):  # noqa: ANN202 - mirrors the SQLAlchemy signature
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except Exception:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+
+    TimedPool.__name__ = base.__name__
+    return TimedPool
+
+
+def _install_engine_events(sync_engine: Engine, metrics: PoolMetrics) -> None:
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
+    request_metrics.instrument_engine(sync_engine)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        metrics.record_checkout()
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            metrics.record_hold(time.perf_counter() - started)
+
+
+def build_engine(url: str, metrics: Optional[PoolMetrics] = None) -> Engine:
+    """Create a tuned, instrumented sync engine for ``url``."""
+    metrics = metrics or PoolMetrics()
+    options = _engine_options(url)
+    if not _is_memory_sqlite(url):
+        options["poolclass"] = _timed_pool_class(QueuePool, metrics)
+    new_engine = create_engine(url, **options)
+    _install_engine_events(new_engine, metrics)
+    return new_engine
+
+
+# Engines are built on first use, normally in the app lifespan, so importing the app
+# neither reads DATABASE_URL nor connects. ``from app.database import engine`` still
+# works and builds the sync engine at that point.
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+pool_metrics = PoolMetrics()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# Building the async engine lazily also means sync-only deployments and scripts never
+# need the async driver installed.
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+async_pool_metrics = PoolMetrics()
+
+
+def get_engine() -> Engine:
+    """The sync engine for ``DATABASE_URL``, built on the first call."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                new_engine = build_engine(_get_database_url(), pool_metrics)
+                SessionLocal.configure(bind=new_engine)
+                _engine = new_engine
+    return _engine
+
+
+def __getattr__(name: str) -> Any:
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = _get_async_database_url(_get_database_url())
+        options = _engine_options(url)
+        if not _is_memory_sqlite(url):
+            options["poolclass"] = _timed_pool_class(AsyncAdaptedQueuePool, async_pool_metrics)
+        _async_engine = create_async_engine(url, **options)
+        _install_engine_events(_async_engine.sync_engine, async_pool_metrics)
+        # Objects stay loaded after commit; lazy loads are not possible outside a greenlet.
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
 
 
 def get_db() -> Generator[Session, None, None]:
     """Yield a database session per request."""
+    get_engine()
     db = SessionLocal()
     try:
         yield db
@@ -34,6 +255,21 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def pool_stats() -> dict[str, object]:
+    """Pool checkout/wait statistics for the sync and (if started) async engines."""
+    stats: dict[str, object] = {"sync": pool_metrics.snapshot(get_engine().pool)}
+    if _async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot(_async_engine.pool)
+    return stats
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async database session per request."""
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
 @contextmanager
 def session_scope(session: Optional[Session] = None) -> Generator[Session, None, None]:
     """
@@ -41,6 +277,8 @@ def session_scope(session: Optional[Session] = None) -> Generator[Session, None,
 
     Primarily useful in scripts or background jobs.
     """
+    if session is None:
+        get_engine()
     managed_session = session or SessionLocal()
     try:
         yield managed_session
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets: indices of ``threshold`` points that keep the
+    visual shape of the series (Steinarsson, 2013). ``xs`` must be ascending.
+
+    The first and last points are always kept; every bucket in between contributes the
+    point forming the largest triangle with the previous pick and the next bucket's mean.
+    """
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+
+    picked = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, n)
+        if end >= next_end:  # last bucket: the average is the final point
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        else:
+            span = next_end - end
+            avg_x = sum(xs[end:next_end]) / span
+            avg_y = sum(ys[end:next_end]) / span
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs((ax - avg_x) * (ys[index] - ay) - (ax - xs[index]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = index, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, Response, status
+
+
+def entity_etag(kind: str, entity_id: int, version: int) -> str:
+    """Strong ETag for a single row; changes whenever the row's version does."""
+    return f'"{kind}-{entity_id}-v{version}"'
+
+
+def collection_etag(kind: str, rows: Iterable[tuple[int, int]], variant: str = "") -> str:
+    """
+    Strong ETag for a page of ``(id, version)`` pairs, in response order. ``variant``
+    names the representation (e.g. the selected fields) so each one gets its own tag.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{variant}|".encode())
+    for row_id, version in rows:
+        digest.update(f"{row_id}:{version};".encode())
+    return f'"{kind}-{digest.hexdigest()}"'
+
+
+def _tags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def none_match(if_none_match: Optional[str], etag: str) -> bool:
+    """True when ``If-None-Match`` names ``etag`` (weak comparison, RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    tags = _tags(if_none_match)
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def require_match(if_match: Optional[str], etag: str) -> None:
+    """Raise 412 unless ``If-Match`` is absent or names ``etag`` (strong comparison)."""
+    if not if_match:
+        return
+    tags = _tags(if_match)
+    if "*" not in tags and etag not in tags:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has changed; fetch it again before updating",
+        )
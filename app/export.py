@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Column, Select, select
+from sqlalchemy.engine import Engine, Row
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import crud, models, schemas
+
+# Rows are fetched and encoded this many at a time, so memory stays flat however large
+# the table is. Each chunk becomes one write to the client.
+EXPORT_CHUNK_SIZE = 1000
+
+MEDIA_TYPES = {
+    schemas.ExportFormat.ndjson: "application/x-ndjson",
+    schemas.ExportFormat.csv: "text/csv",
+    schemas.ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+_EXTENSIONS = {
+    schemas.ExportFormat.ndjson: "ndjson",
+    schemas.ExportFormat.csv: "csv",
+    schemas.ExportFormat.arrow: "arrows",
+}
+
+
+def asset_export_query(
+    dialect: str,
+    *,
+    status_filter: Optional[schemas.AssetStatus] = None,
+    search: Optional[str] = None,
+) -> Select:
+    """Every matching asset as plain columns; no ORM objects, no work orders."""
+    stmt = select(*models.Asset.__table__.columns)
+    if status_filter:
+        stmt = stmt.where(models.Asset.status == status_filter)
+    if search:
+        stmt = crud._apply_asset_search(stmt, dialect, search)
+    return stmt.order_by(models.Asset.id)
+
+
+def work_order_export_query(
+    *,
+    status_filter: Optional[schemas.WorkOrderStatus] = None,
+    priority_filter: Optional[schemas.WorkOrderPriority] = None,
+    asset_id: Optional[int] = None,
+) -> Select:
+    stmt = select(*models.WorkOrder.__table__.columns)
+    if status_filter:
+        stmt = stmt.where(models.WorkOrder.status == status_filter)
+    if priority_filter:
+        stmt = stmt.where(models.WorkOrder.priority == priority_filter)
+    if asset_id:
+        stmt = stmt.where(models.WorkOrder.asset_id == asset_id)
+    return stmt.order_by(models.WorkOrder.id)
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class _NdjsonEncoder:
+    def __init__(self, columns: Sequence[Column]) -> None:
+        self.names = [column.name for column in columns]
+
+    def chunk(self, rows: Sequence[Row]) -> bytes:
+        return "".join(
+            json.dumps(dict(zip(self.names, map(_plain, row))), separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _CsvEncoder:
+    def __init__(self, columns: Sequence[Column]) -> None:
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow([column.name for column in columns])
+
+    def chunk(self, rows: Sequence[Row]) -> bytes:
+        self.writer.writerows([_plain(value) for value in row] for row in rows)
+        data = self.buffer.getvalue().encode("utf-8")
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def finish(self) -> bytes:
+        return self.chunk([])
+
+
+class _ArrowEncoder:
+    """Arrow IPC stream: one schema message, then one record batch per chunk."""
+
+    def __init__(self, columns: Sequence[Column]) -> None:
+        import pyarrow as pa
+
+        self.pa = pa
+        self.schema = pa.schema(
+            [pa.field(column.name, _arrow_type(pa, column), column.nullable) for column in columns]
+        )
+        self.buffer = io.BytesIO()
+        self.writer = pa.ipc.new_stream(self.buffer, self.schema)
+
+    def chunk(self, rows: Sequence[Row]) -> bytes:
+        if rows:
+            arrays = [
+                [_plain(value) if isinstance(value, Enum) else value for value in values]
+                for values in zip(*rows)
+            ]
+            self.writer.write_batch(self.pa.record_batch(arrays, schema=self.schema))
+        return self._drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self._drain()
+
+    def _drain(self) -> bytes:
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def _arrow_type(pa: Any, column: Column) -> Any:
+    python_type = column.type.python_type
+    if issubclass(python_type, Enum):
+        return pa.string()
+    return {
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us"),
+        date: pa.date32(),
+    }[python_type]
+
+
+_ENCODERS = {
+    schemas.ExportFormat.ndjson: _NdjsonEncoder,
+    schemas.ExportFormat.csv: _CsvEncoder,
+    schemas.ExportFormat.arrow: _ArrowEncoder,
+}
+
+
+def _encoder(export_format: schemas.ExportFormat, stmt: Select):
+    if export_format == schemas.ExportFormat.arrow:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="Arrow export requires pyarrow, which is not installed",
+            ) from exc
+    return _ENCODERS[export_format](list(stmt.selected_columns))
+
+
+def _stream_rows(bind: Engine, stmt: Select, encoder) -> Iterator[bytes]:
+    # The request's session is closed before the body is sent, so the stream owns its
+    # connection; yield_per keeps a server-side cursor open where the driver has one.
+    with bind.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_CHUNK_SIZE).execute(stmt)
+        for rows in result.partitions():
+            yield encoder.chunk(rows)
+    yield encoder.finish()
+
+
+async def _stream_rows_async(bind: AsyncEngine, stmt: Select, encoder) -> AsyncIterator[bytes]:
+    async with bind.connect() as connection:
+        result = await connection.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for rows in result.partitions():
+            yield encoder.chunk(rows)
+    yield encoder.finish()
+
+
+def _response(body, kind: str, export_format: schemas.ExportFormat) -> StreamingResponse:
+    filename = f"{kind}.{_EXTENSIONS[export_format]}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def stream_export(
+    bind: Engine, stmt: Select, kind: str, export_format: schemas.ExportFormat
+) -> StreamingResponse:
+    encoder = _encoder(export_format, stmt)
+    return _response(_stream_rows(bind, stmt, encoder), kind, export_format)
+
+
+def stream_export_async(
+    bind: AsyncEngine, stmt: Select, kind: str, export_format: schemas.ExportFormat
+) -> StreamingResponse:
+    encoder = _encoder(export_format, stmt)
+    return _response(_stream_rows_async(bind, stmt, encoder), kind, export_format)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Sequence
+
+from . import changes
+from .changes import Change
+
+# Live feed of committed asset and work order changes. Each commit is turned into events
+# once, encoded once, and handed to every matching subscriber's queue, so fan-out costs
+# no database work and no per-client encoding.
+#
+# Sequence numbers are per process and prefixed with a random epoch in resume cursors
+# ("<epoch>:<seq>"). A cursor from another process, or one older than the retained
+# history, gets a reset event: the client should refetch and continue from there. With
+# several workers each feed carries the writes made through its own worker.
+
+FEED_ENTITIES = ("asset", "work_order")
+HISTORY_SIZE = int(os.getenv("CHANGE_FEED_HISTORY", "10000"))
+QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "1000"))
+HEARTBEAT_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class FeedEvent:
+    seq: int
+    change: Change
+    data: str  # JSON payload, shared by every subscriber
+    frame: bytes  # the same payload as one SSE message
+
+
+def _encode(epoch: str, seq: int, change: Change) -> FeedEvent:
+    cursor = f"{epoch}:{seq}"
+    payload = {
+        "type": "change",
+        "seq": seq,
+        "cursor": cursor,
+        "entity": change.entity,
+        "action": change.action,
+        "id": change.entity_id,
+        "asset_id": change.asset_id,
+        "status": change.state.status,
+        "priority": change.state.priority,
+    }
+    if change.previous is not None:
+        payload["previous_status"] = change.previous.status
+        payload["previous_priority"] = change.previous.priority
+    data = json.dumps(payload, separators=(",", ":"))
+    frame = f"id: {cursor}\nevent: change\ndata: {data}\n\n".encode()
+    return FeedEvent(seq, change, data, frame)
+
+
+@dataclass(frozen=True)
+class FeedFilter:
+    entity: Optional[str] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    asset_id: Optional[int] = None
+
+    def matches(self, change: Change) -> bool:
+        if self.entity is not None and change.entity != self.entity:
+            return False
+        if self.asset_id is not None and change.asset_id != self.asset_id:
+            return False
+        # An update that moves a row out of the filter is still delivered, so screens
+        # showing e.g. open work orders learn that one was completed.
+        return self._state_matches(change.state) or (
+            change.previous is not None and self._state_matches(change.previous)
+        )
+
+    def _state_matches(self, state: changes.State) -> bool:
+        return (self.status is None or state.status == self.status) and (
+            self.priority is None or state.priority == self.priority
+        )
+
+
+class Subscription:
+    """
+    One client's bounded queue. Events for a row that is already queued replace the
+    queued one (the client only needs the latest state); past ``maxsize`` the oldest
+    event is dropped, which the client sees as a gap in ``seq``.
+    """
+
+    def __init__(
+        self, filters: FeedFilter, loop: asyncio.AbstractEventLoop, maxsize: int = QUEUE_SIZE
+    ) -> None:
+        self.filters = filters
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.coalesced = 0
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._events: OrderedDict[tuple[str, int], FeedEvent] = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._notified = False
+
+    def offer(self, event: FeedEvent) -> None:
+        """Queue ``event``; safe to call from any thread."""
+        key = (event.change.entity, event.change.entity_id)
+        with self._lock:
+            if self._events.pop(key, None) is not None:
+                self.coalesced += 1
+            self._events[key] = event
+            if len(self._events) > self.maxsize:
+                self._events.popitem(last=False)
+                self.dropped += 1
+            notify, self._notified = not self._notified, True
+        if notify:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # the client's event loop is gone; it unsubscribes on the way out
+
+    async def next_batch(self, timeout: float) -> list[FeedEvent]:
+        """Everything queued, in ``seq`` order, waiting up to ``timeout`` for the first."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        with self._lock:
+            # set() only ever runs as a loop callback, so clearing here cannot lose one.
+            self._wakeup.clear()
+            self._notified = False
+            events = list(self._events.values())
+            self._events.clear()
+        return events
+
+
+class ChangeFeed:
+    def __init__(self, history: int = HISTORY_SIZE) -> None:
+        self.epoch = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: deque[FeedEvent] = deque(maxlen=history)
+        # Subscribers by asset filter (None: all assets), so an event only visits the
+        # clients that can match it.
+        self._subscribers: dict[Optional[int], set[Subscription]] = {}
+        self.published = 0
+
+    def publish(self, pending: Sequence[Change]) -> None:
+        with self._lock:
+            # Fan-out happens under the lock so every subscriber sees events in order.
+            for change in pending:
+                if change.entity not in FEED_ENTITIES:
+                    continue
+                self._seq += 1
+                event = _encode(self.epoch, self._seq, change)
+                self._history.append(event)
+                self.published += 1
+                for key in {None, change.asset_id}:
+                    for subscription in self._subscribers.get(key, ()):
+                        if subscription.filters.matches(change):
+                            subscription.offer(event)
+
+    def subscribe(
+        self, filters: FeedFilter, cursor: Optional[str] = None
+    ) -> tuple[Subscription, Optional[list[FeedEvent]]]:
+        """
+        Register a subscriber and return it with the retained events after ``cursor``,
+        or None for the replay when the cursor cannot be honoured and a reset is due.
+        """
+        subscription = Subscription(filters, asyncio.get_running_loop())
+        with self._lock:
+            replay: Optional[list[FeedEvent]] = []
+            if cursor is not None:
+                after = self._parse_cursor(cursor)
+                oldest = self._history[0].seq if self._history else self._seq + 1
+                if after is None or after > self._seq or after < oldest - 1:
+                    replay = None
+                else:
+                    replay = [
+                        event
+                        for event in self._history
+                        if event.seq > after and filters.matches(event.change)
+                    ]
+            self._subscribers.setdefault(filters.asset_id, set()).add(subscription)
+        return subscription, replay
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.filters.asset_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.filters.asset_id]
+
+    def cursor(self) -> str:
+        with self._lock:
+            return f"{self.epoch}:{self._seq}"
+
+    def reset_message(self) -> str:
+        return json.dumps({"type": "reset", "cursor": self.cursor()}, separators=(",", ":"))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            subscriptions = [sub for subs in self._subscribers.values() for sub in subs]
+            return {
+                "cursor": f"{self.epoch}:{self._seq}",
+                "published": self.published,
+                "history": len(self._history),
+                "subscribers": len(subscriptions),
+                "dropped": sum(sub.dropped for sub in subscriptions),
+                "coalesced": sum(sub.coalesced for sub in subscriptions),
+            }
+
+    def _parse_cursor(self, cursor: str) -> Optional[int]:
+        epoch, _, seq = cursor.partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+
+feed = ChangeFeed()
+changes.on_commit(feed.publish)
+
+
+async def sse_stream(
+    subscription: Subscription, replay: Optional[list[FeedEvent]]
+) -> AsyncIterator[bytes]:
+    """SSE messages for ``subscription``, with comment lines as keep-alives."""
+    try:
+        if replay is None:
+            yield f"event: reset\ndata: {feed.reset_message()}\n\n".encode()
+        else:
+            for event in replay:
+                yield event.frame
+        while True:
+            batch = await subscription.next_batch(HEARTBEAT_SECONDS)
+            yield b"".join(event.frame for event in batch) if batch else b": keepalive\n\n"
+    finally:
+        feed.unsubscribe(subscription)
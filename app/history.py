@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import os
+from datetime import UTC, datetime
+from itertools import groupby
+from typing import Any, Iterable, Optional, Sequence
+
+import orjson
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Insert,
+    Integer,
+    Row,
+    String,
+    Text,
+    bindparam,
+    case,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    null,
+    select,
+    tuple_,
+)
+from sqlalchemy.orm import Session
+
+from . import models
+from .pagination import Cursor, encode_cursor
+
+# Audit history of assets and work orders in ``audit_history``. Flush listeners on the
+# Session class see every ORM insert, update and delete (sync and async alike) and add
+# their entries with one executemany in the same flush, so history commits or rolls back
+# with the write itself. Core bulk writes pass their rows to ``record`` instead.
+#
+# An entry stores the columns its write set. Creations and every SNAPSHOT_INTERVAL-th
+# entry of a row also store the whole row, so rebuilding a row as of some time reads
+# at most SNAPSHOT_INTERVAL entries: the latest snapshot before then and the changes
+# after it. The entry's position since the last snapshot (``seq``) is computed by the
+# INSERT from the row's previous entry, an index seek, not by a separate query.
+
+SNAPSHOT_INTERVAL = int(os.getenv("HISTORY_SNAPSHOT_INTERVAL", "20"))
+
+ENTITIES: dict[type, str] = {models.Asset: "asset", models.WorkOrder: "work_order"}
+_COLUMNS = {model: [column.key for column in model.__table__.columns] for model in ENTITIES}
+# Carried by their own history columns rather than in ``changes``.
+_KEYS = {"id", "version"}
+
+
+def utc_naive(value: datetime) -> datetime:
+    """``value`` as naive UTC, the way DateTime columns store it."""
+    if value.tzinfo is not None:
+        value = value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return utc_naive(value)
+    return value
+
+
+def _encode(values: Optional[dict[str, Any]]) -> Optional[str]:
+    if values is None:
+        return None
+    return orjson.dumps({key: _jsonable(value) for key, value in values.items()}).decode()
+
+
+def _insert_statement() -> Insert:
+    history = models.AuditHistory.__table__
+    previous = (
+        select(history.c.seq)
+        .where(
+            history.c.entity == bindparam("entity"),
+            history.c.entity_id == bindparam("entity_id"),
+        )
+        .order_by(history.c.changed_at.desc(), history.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    seq = case(
+        (bindparam("force_snapshot", type_=Boolean), literal(0)),
+        else_=func.coalesce(previous + 1, 0) % SNAPSHOT_INTERVAL,
+    )
+    return insert(history).from_select(
+        ["entity", "entity_id", "asset_id", "version", "action", "changed_at", "seq"]
+        + ["changes", "snapshot"],
+        select(
+            bindparam("entity", type_=String),
+            bindparam("entity_id", type_=Integer),
+            bindparam("asset_id", type_=Integer),
+            bindparam("version", type_=Integer),
+            bindparam("action", type_=String),
+            bindparam("changed_at", type_=DateTime),
+            seq,
+            bindparam("changes", type_=Text),
+            case((seq == 0, bindparam("snapshot", type_=Text)), else_=null()),
+        ),
+    )
+
+
+_INSERT = _insert_statement()
+
+
+def entry(
+    model: type,
+    action: str,
+    row: dict[str, Any],
+    changes: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """
+    History parameters for ``row``, the full state of a ``model`` row after ``action``
+    (before it, for deletions). ``changes`` defaults to every column.
+    """
+    entity = ENTITIES[model]
+    deleted = action == "deleted"
+    if changes is None and not deleted:
+        changes = {key: value for key, value in row.items() if key not in _KEYS}
+    return {
+        "entity": entity,
+        "entity_id": row["id"],
+        "asset_id": row["id"] if entity == "asset" else row["asset_id"],
+        "version": row.get("version"),
+        "action": action,
+        "changed_at": utc_naive(datetime.now(UTC) if deleted else row["updated_at"]),
+        "force_snapshot": action != "updated",
+        "changes": _encode(changes),
+        "snapshot": None if deleted else _encode(row),
+    }
+
+
+def record(db: Session, entries: Sequence[dict[str, Any]]) -> None:
+    """Add ``entries`` (see ``entry``) to the session's current transaction."""
+    if entries:
+        db.connection().execute(_INSERT, list(entries))
+
+
+def _row(obj: Any) -> dict[str, Any]:
+    return {key: getattr(obj, key) for key in _COLUMNS[type(obj)]}
+
+
+def _changes(obj: Any) -> dict[str, Any]:
+    changes = {}
+    state = inspect(obj)
+    for key in _COLUMNS[type(obj)]:
+        if key in _KEYS:
+            continue
+        added, _, deleted = state.attrs[key].history
+        if added and (not deleted or added[0] != deleted[0]):
+            changes[key] = added[0]
+    return changes
+
+
+@event.listens_for(Session, "before_flush")
+def _record_deletes(session: Session, flush_context, instances) -> None:
+    # Before the rows are gone, including work orders removed along with their assets,
+    # archived ones too: their history stays, so as_of reads must see them end.
+    deleted_assets = {obj.id for obj in session.deleted if isinstance(obj, models.Asset)}
+    entries = [
+        entry(type(obj), "deleted", _row(obj))
+        for obj in session.deleted
+        if type(obj) in ENTITIES
+        and not (isinstance(obj, models.WorkOrder) and obj.asset_id in deleted_assets)
+    ]
+    for wo in (models.WorkOrder, models.ArchivedWorkOrder) if deleted_assets else ():
+        entries.extend(
+            entry(models.WorkOrder, "deleted", row._asdict())
+            for row in session.connection().execute(
+                select(wo.id, wo.asset_id, wo.version).where(wo.asset_id.in_(deleted_assets))
+            )
+        )
+    record(session, entries)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_writes(session: Session, flush_context) -> None:
+    entries = [
+        entry(type(obj), "created", _row(obj)) for obj in session.new if type(obj) in ENTITIES
+    ]
+    for obj in session.dirty:
+        if type(obj) in ENTITIES and session.is_modified(obj, include_collections=False):
+            entries.append(entry(type(obj), "updated", _row(obj), _changes(obj)))
+    record(session, entries)
+
+
+def _decode(value: Optional[str]) -> Optional[dict[str, Any]]:
+    return None if value is None else orjson.loads(value)
+
+
+def list_entries(
+    db: Session, entity: str, entity_id: int, *, limit: int = 50, cursor: Optional[Cursor] = None
+) -> list[Row]:
+    """Entries of one row, newest first, after the ``(changed_at, id)`` cursor if given."""
+    history = models.AuditHistory
+    stmt = select(
+        history.id, history.version, history.action, history.changed_at, history.changes
+    ).where(history.entity == entity, history.entity_id == entity_id)
+    if cursor:
+        stmt = stmt.where(tuple_(history.changed_at, history.id) < cursor)
+    stmt = stmt.order_by(history.changed_at.desc(), history.id.desc()).limit(limit)
+    return db.execute(stmt).all()
+
+
+def next_cursor(rows: Sequence[Row], limit: int) -> Optional[str]:
+    """The cursor for the entries after ``rows``, or None on the last page."""
+    if len(rows) < limit:
+        return None
+    return encode_cursor(rows[-1].changed_at, rows[-1].id)
+
+
+def build_entries(rows: Iterable[Row]) -> list[dict[str, Any]]:
+    """Shape ``list_entries`` rows as ``schemas.HistoryEntry``."""
+    return [
+        {
+            "version": row.version,
+            "action": row.action,
+            "changed_at": row.changed_at,
+            "changes": _decode(row.changes),
+        }
+        for row in rows
+    ]
+
+
+def _replay(rows: Iterable[Row]) -> Optional[dict[str, Any]]:
+    """Rebuild a row from its entries, newest first; None if it did not exist then."""
+    changes = []
+    version = None
+    for row in rows:
+        version = row.version if version is None else version
+        if row.seq == 0:
+            state = _decode(row.snapshot)
+            if state is not None:
+                for columns in reversed(changes):
+                    state.update(columns)
+                state["version"] = version
+            return state
+        changes.append(_decode(row.changes))
+    return None  # written before the row had history
+
+
+def state_at(db: Session, entity: str, entity_id: int, as_of: datetime) -> Optional[dict]:
+    """The columns of one row as they were at ``as_of``, read from at most
+    SNAPSHOT_INTERVAL entries; None if the row did not exist then."""
+    history = models.AuditHistory
+    rows = db.execute(
+        select(history.version, history.seq, history.changes, history.snapshot)
+        .where(
+            history.entity == entity,
+            history.entity_id == entity_id,
+            history.changed_at <= utc_naive(as_of),
+        )
+        .order_by(history.changed_at.desc(), history.id.desc())
+        .limit(SNAPSHOT_INTERVAL)
+    ).all()
+    return _replay(rows)
+
+
+def work_orders_at(db: Session, asset_id: int, as_of: datetime) -> list[dict[str, Any]]:
+    """Every work order of ``asset_id`` as it was at ``as_of``, ordered by id."""
+    history = models.AuditHistory
+    ranked = (
+        select(
+            history.entity_id,
+            history.version,
+            history.seq,
+            history.changes,
+            history.snapshot,
+            func.row_number()
+            .over(
+                partition_by=history.entity_id,
+                order_by=(history.changed_at.desc(), history.id.desc()),
+            )
+            .label("position"),
+        )
+        .where(
+            history.asset_id == asset_id,
+            history.entity == "work_order",
+            history.changed_at <= utc_naive(as_of),
+        )
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked)
+        .where(ranked.c.position <= SNAPSHOT_INTERVAL)
+        .order_by(ranked.c.entity_id, ranked.c.position)
+    )
+    states = (_replay(entries) for _, entries in groupby(rows, key=lambda row: row.entity_id))
+    return [state for state in states if state is not None]
+
+
+def asset_at(db: Session, asset_id: int, as_of: datetime) -> Optional[dict[str, Any]]:
+    """``schemas.AssetRead`` fields of an asset as it was at ``as_of``."""
+    asset = state_at(db, "asset", asset_id, as_of)
+    if asset is not None:
+        asset["work_orders"] = work_orders_at(db, asset_id, as_of)
+    return asset
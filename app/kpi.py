@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import UTC, datetime, time, timedelta
+from typing import Callable, Hashable, Sequence
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+
+from . import changes, models, schemas
+
+# Fleet KPIs over many (asset, period) pairs at once. Each KPI loads its inputs with one
+# query per table into flat NumPy arrays and evaluates every pair with array operations;
+# nothing loops per asset or per period in Python.
+
+HOUR = 3600.0
+
+
+def _seconds(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.timestamp()
+
+
+def _day_start(value) -> float:
+    return _seconds(datetime.combine(value, time.min))
+
+
+def _period_bounds(periods: Sequence[schemas.KpiPeriod]) -> tuple[np.ndarray, np.ndarray]:
+    starts = np.array([_seconds(period.start) for period in periods])
+    ends = np.array([_seconds(period.end) for period in periods])
+    return starts, ends
+
+
+def require_assets(db: Session, asset_ids: Sequence[int]) -> None:
+    found = set(db.scalars(select(models.Asset.id).where(models.Asset.id.in_(asset_ids))))
+    if missing := sorted(set(asset_ids) - found):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Asset not found: {', '.join(map(str, missing))}",
+        )
+
+
+def _capacities(db: Session, asset_ids: Sequence[int]) -> np.ndarray:
+    rows = dict(
+        db.execute(
+            select(models.Asset.id, models.Asset.capacity_mw).where(
+                models.Asset.id.in_(asset_ids)
+            )
+        ).all()
+    )
+    return np.array([rows.get(asset_id, np.nan) for asset_id in asset_ids])
+
+
+def downtime_hours(
+    db: Session, asset_ids: Sequence[int], periods: Sequence[schemas.KpiPeriod]
+) -> np.ndarray:
+    """
+    Hours each asset spent under maintenance in each period, shape (assets, periods).
+
+    A work order that is not cancelled and has a ``scheduled_start`` covers the time from
+    the start of that day until ``completed_at``, or else the end of ``scheduled_end``
+    (or of the start day). Overlapping work orders are counted once. Archived work orders
+    count too, so past periods keep their downtime after ``app.archive`` runs.
+    """
+    rows = db.execute(
+        union_all(
+            *(
+                select(wo.asset_id, wo.scheduled_start, wo.scheduled_end, wo.completed_at).where(
+                    wo.asset_id.in_(asset_ids),
+                    wo.scheduled_start.is_not(None),
+                    wo.status != schemas.WorkOrderStatus.cancelled,
+                )
+                for wo in (models.WorkOrder, models.ArchivedWorkOrder)
+            )
+        )
+    ).all()
+    result = np.zeros((len(asset_ids), len(periods)))
+    if not rows:
+        return result
+
+    position = {asset_id: index for index, asset_id in enumerate(asset_ids)}
+    group = np.array([position[row.asset_id] for row in rows])
+    starts = np.array([_day_start(row.scheduled_start) for row in rows])
+    ends = np.array(
+        [
+            _seconds(row.completed_at)
+            if row.completed_at
+            else _day_start((row.scheduled_end or row.scheduled_start) + timedelta(days=1))
+            for row in rows
+        ]
+    )
+    period_starts, period_ends = _period_bounds(periods)
+
+    # Sort by (asset, start), clip every interval to every period: (intervals, periods).
+    order = np.lexsort((starts, group))
+    group, starts, ends = group[order], starts[order], ends[order]
+    clipped_starts = np.clip(starts[:, None], period_starts, period_ends)
+    clipped_ends = np.clip(ends[:, None], period_starts, period_ends)
+    clipped_ends = np.maximum(clipped_ends, clipped_starts)
+
+    # Union of sorted intervals: each one only adds what lies beyond the furthest end seen
+    # so far. Offsetting each asset by more than the whole time span lets a single running
+    # maximum per column run across all assets without leaking between them.
+    offset = (group * (period_ends.max() - period_starts.min() + 1.0))[:, None]
+    shifted_starts = clipped_starts + offset
+    shifted_ends = clipped_ends + offset
+    reach = np.maximum.accumulate(shifted_ends, axis=0)
+    previous = np.vstack([np.full((1, len(periods)), -np.inf), reach[:-1]])
+    added = np.clip(shifted_ends - np.maximum(shifted_starts, previous), 0.0, None)
+    np.add.at(result, group, added)
+    return result / HOUR
+
+
+def hourly_energy(
+    db: Session,
+    asset_ids: Sequence[int],
+    periods: Sequence[schemas.KpiPeriod],
+    tags: Sequence[str],
+) -> dict[str, np.ndarray]:
+    """
+    MWh per (asset, period) for each tag, integrated from the 1-hour telemetry rollups
+    (bucket mean in MW x 1 h). Buckets are attributed by their start time.
+    """
+    period_starts, period_ends = _period_bounds(periods)
+    rollup = models.TelemetryRollup
+    rows = db.execute(
+        select(
+            rollup.asset_id,
+            rollup.tag,
+            rollup.bucket_start,
+            rollup.value_sum / rollup.value_count,
+        ).where(
+            rollup.asset_id.in_(asset_ids),
+            rollup.tag.in_(tags),
+            rollup.resolution_s == 3600,
+            rollup.bucket_start >= int(period_starts.min() * 1000) - 3_600_000,
+            rollup.bucket_start < int(period_ends.max() * 1000),
+        )
+    ).all()
+    position = {asset_id: index for index, asset_id in enumerate(asset_ids)}
+    energy: dict[str, np.ndarray] = {}
+    for tag in tags:
+        selected = [row for row in rows if row[1] == tag]
+        group = np.array([position[row[0]] for row in selected], dtype=np.int64)
+        bucket = np.array([row[2] / 1000 for row in selected], dtype=np.float64)
+        mwh = np.array([row[3] for row in selected], dtype=np.float64)
+        energy[tag] = _windowed_sums(
+            group, bucket, mwh, len(asset_ids), period_starts, period_ends
+        )
+    return energy
+
+
+def _windowed_sums(
+    group: np.ndarray,
+    ts: np.ndarray,
+    values: np.ndarray,
+    asset_count: int,
+    period_starts: np.ndarray,
+    period_ends: np.ndarray,
+) -> np.ndarray:
+    """Sum ``values`` with ``period_start <= ts < period_end`` for every (asset, period)."""
+    if not len(values):
+        return np.zeros((asset_count, len(period_starts)))
+    # One sorted key per (asset, time) and a cumulative sum turn every window sum into
+    # the difference of two binary searches, evaluated for the whole grid at once.
+    span = max(period_ends.max(), ts.max()) - min(period_starts.min(), ts.min()) + 1.0
+    base = min(period_starts.min(), ts.min())
+    keys = group * span + (ts - base)
+    order = np.argsort(keys, kind="stable")
+    keys, cumulative = keys[order], np.concatenate([[0.0], np.cumsum(values[order])])
+    assets = np.arange(asset_count)[:, None] * span
+    lo = np.searchsorted(keys, assets + (period_starts - base), side="left")
+    hi = np.searchsorted(keys, assets + (period_ends - base), side="left")
+    return cumulative[hi] - cumulative[lo]
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = numerator / denominator
+    return np.where(np.isfinite(ratio), ratio, np.nan)
+
+
+def _rows(
+    asset_ids: Sequence[int], periods: Sequence[schemas.KpiPeriod], **columns: np.ndarray
+) -> list[dict[str, object]]:
+    results = []
+    for a, asset_id in enumerate(asset_ids):
+        for p, period in enumerate(periods):
+            row: dict[str, object] = {
+                "asset_id": asset_id,
+                "start": period.start,
+                "end": period.end,
+            }
+            for name, values in columns.items():
+                value = float(values[a, p])
+                row[name] = None if np.isnan(value) else round(value, 6)
+            results.append(row)
+    return results
+
+
+def availability(db: Session, request: schemas.KpiRequest) -> list[dict[str, object]]:
+    period_starts, period_ends = _period_bounds(request.periods)
+    period_hours = np.broadcast_to(
+        (period_ends - period_starts) / HOUR, (len(request.asset_ids), len(request.periods))
+    )
+    down = downtime_hours(db, request.asset_ids, request.periods)
+    return _rows(
+        request.asset_ids,
+        request.periods,
+        period_hours=period_hours,
+        downtime_hours=down,
+        availability=1.0 - down / period_hours,
+    )
+
+
+def capacity_factor(db: Session, request: schemas.EnergyKpiRequest) -> list[dict[str, object]]:
+    period_starts, period_ends = _period_bounds(request.periods)
+    energy = hourly_energy(db, request.asset_ids, request.periods, [request.power_tag])
+    capacity = _capacities(db, request.asset_ids)[:, None]
+    possible = capacity * ((period_ends - period_starts) / HOUR)
+    generated = energy[request.power_tag]
+    return _rows(
+        request.asset_ids,
+        request.periods,
+        energy_mwh=generated,
+        capacity_mw=np.broadcast_to(capacity, generated.shape),
+        capacity_factor=_safe_ratio(generated, possible),
+    )
+
+
+def efficiency(db: Session, request: schemas.EnergyKpiRequest) -> list[dict[str, object]]:
+    tags = [request.power_tag, request.fuel_tag]
+    energy = hourly_energy(db, request.asset_ids, request.periods, tags)
+    generated, fuel = energy[request.power_tag], energy[request.fuel_tag]
+    return _rows(
+        request.asset_ids,
+        request.periods,
+        energy_mwh=generated,
+        fuel_mwh=fuel,
+        efficiency=_safe_ratio(generated, fuel),
+        # kJ of fuel per kWh generated: 3600 kJ/kWh at 100 % efficiency.
+        heat_rate_kj_per_kwh=3600.0 * _safe_ratio(fuel, generated),
+    )
+
+
+class KpiMemo:
+    """
+    Bounded LRU of computed KPI results, indexed by asset so that a write to any asset
+    drops every entry whose asset set contains it.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[frozenset[int], list]] = OrderedDict()
+        self._keys_by_asset: dict[int, set[Hashable]] = {}
+        # Bumped on every invalidation so a result that raced with a write is not kept.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self, key: Hashable, asset_ids: Sequence[int], compute: Callable[[], list]
+    ) -> list:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        # Computed outside the lock; concurrent misses for one key just compute twice.
+        value = compute()
+        with self._lock:
+            if generation != self._generation:
+                return value
+            assets = frozenset(asset_ids)
+            self._entries[key] = (assets, value)
+            for asset_id in assets:
+                self._keys_by_asset.setdefault(asset_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest, (oldest_assets, _) = self._entries.popitem(last=False)
+                self._unindex(oldest, oldest_assets)
+        return value
+
+    def invalidate(self, asset_ids: Sequence[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for asset_id in asset_ids:
+                for key in self._keys_by_asset.pop(asset_id, set()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._unindex(key, entry[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_asset.clear()
+
+    def _unindex(self, key: Hashable, assets: frozenset[int]) -> None:
+        for asset_id in assets:
+            keys = self._keys_by_asset.get(asset_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_asset[asset_id]
+
+
+memo = KpiMemo()
+
+
+def memoized(
+    kind: str,
+    db: Session,
+    request: schemas.KpiRequest,
+    compute: Callable[[Session, schemas.KpiRequest], list],
+) -> list:
+    # Asset order is part of the response, so it is part of the key as well.
+    key = (kind, request.model_dump_json())
+
+    def load() -> list:
+        require_assets(db, request.asset_ids)
+        return compute(db, request)
+
+    return memo.get_or_compute(key, request.asset_ids, load)
+
+
+@changes.on_commit
+def _invalidate_kpis(pending: Sequence[changes.Change]) -> None:
+    memo.invalidate({change.asset_id for change in pending if change.asset_id is not None})
@@ -1,24 +1,53 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
 from fastapi import FastAPI
 
-from . import models
-from .database import engine
-from .routers import assets, workorders
+from . import metrics, schema_version
+from .database import async_db_enabled, get_engine
+from .responses import TimedJSONResponse
+from .routers import feed, health, kpi, stats, telemetry
+from .routers import metrics as metrics_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # The engine is built and the schema checked here rather than in create_app, so
+    # importing the app stays cheap and touches no database.
+    schema_version.ensure_schema(get_engine())
+    yield
 
 
-def create_app() -> FastAPI:
+def create_app(async_db: Optional[bool] = None) -> FastAPI:
     app = FastAPI(
         title="Power Plant Assets API",
         description="Track generation assets and maintenance work orders.",
         version="0.1.0",
+        default_response_class=TimedJSONResponse,
+        lifespan=lifespan,
     )
-
-    # Ensure tables exist when the service starts. In production use migrations.
-    models.Base.metadata.create_all(bind=engine)
-
-    app.include_router(assets.router)
-    app.include_router(workorders.router)
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    # Async routers serve the same API from AsyncSession without the threadpool hop.
+    # Only the chosen pair is imported; route modules are a large share of startup.
+    if async_db if async_db is not None else async_db_enabled():
+        from .routers import assets_async, workorders_async
+
+        app.include_router(assets_async.router)
+        app.include_router(workorders_async.router)
+    else:
+        from .routers import assets, workorders
+
+        app.include_router(assets.router)
+        app.include_router(workorders.router)
+    app.include_router(stats.router)
+    app.include_router(telemetry.router)
+    app.include_router(kpi.router)
+    app.include_router(feed.router)
+    app.include_router(health.router)
+    app.include_router(metrics_router.router)
     return app
 
 
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per-request instrumentation in Prometheus text format. Engine events count and time
+# every statement against the request that issued it (found through a context variable,
+# which also follows sync endpoints into the threadpool), JSON responses report their
+# render time, and a middleware records the totals per route template once the response
+# is sent. Metrics are per process; with several workers, scrape each one.
+#
+# SLOW_QUERY_MS=<ms> logs statements slower than that to the "app.sql.slow" logger with
+# their bound parameters redacted. Unset or 0 disables the log.
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0"))
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_log = logging.getLogger("app.sql.slow")
+
+
+@dataclass
+class RequestStats:
+    scope: dict = field(repr=False)
+    statements: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        """The matched route template, e.g. /assets/{asset_id}, once routing is done."""
+        route = self.scope.get("route")
+        return route.path if route is not None else "unmatched"
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    # Values are methods, route templates and status codes: nothing needs escaping.
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...]) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, labels: tuple[str, ...], amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, labels: tuple[str, ...], buckets: tuple[float, ...]
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        # Per label set: observations per bucket (the last one is +Inf) and their sum.
+        self.values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        counts, total = self.values.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_labels((*self.labels, 'le'), (*labels, bound))} "
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class RequestMetrics:
+    """Per-route request, statement and timing series."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        route = ("method", "route")
+        self.requests = Counter(
+            "http_requests_total", "Requests by route and status code.", (*route, "status")
+        )
+        self.latency = Histogram(
+            "http_request_duration_seconds",
+            "Time from receiving a request to sending the last body chunk.",
+            route,
+            SECONDS_BUCKETS,
+        )
+        self.statements = Histogram(
+            "db_statements_per_request",
+            "SQL statements executed per request.",
+            route,
+            STATEMENT_BUCKETS,
+        )
+        self.db_time = Histogram(
+            "db_seconds_per_request",
+            "Time spent executing SQL per request.",
+            route,
+            SECONDS_BUCKETS,
+        )
+        self.serialize_time = Histogram(
+            "serialize_seconds_per_request",
+            "Time spent rendering JSON response bodies per request.",
+            route,
+            SECONDS_BUCKETS,
+        )
+        self.slow_queries = Counter(
+            "db_slow_queries_total", "Statements slower than SLOW_QUERY_MS.", ("route",)
+        )
+        self._series = (
+            self.requests,
+            self.latency,
+            self.statements,
+            self.db_time,
+            self.serialize_time,
+            self.slow_queries,
+        )
+
+    def observe(self, method: str, status: int, stats: RequestStats, seconds: float) -> None:
+        labels = (method, stats.route)
+        with self._lock:
+            self.requests.inc((*labels, str(status)))
+            self.latency.observe(labels, seconds)
+            self.statements.observe(labels, stats.statements)
+            self.db_time.observe(labels, stats.db_seconds)
+            self.serialize_time.observe(labels, stats.serialize_seconds)
+
+    def slow_query(self, route: str) -> None:
+        with self._lock:
+            self.slow_queries.inc((route,))
+
+    def render(self) -> str:
+        with self._lock:
+            return "\n".join(line for series in self._series for line in series.render()) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            for series in self._series:
+                series.values.clear()
+
+
+registry = RequestMetrics()
+
+
+def record_serialization(seconds: float) -> None:
+    """Add ``seconds`` of response rendering to the current request, if any."""
+    stats = _current.get()
+    if stats is not None:
+        stats.serialize_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "-"
+        registry.slow_query(route)
+        slow_query_log.warning(
+            "%.1f ms on %s: %s [%d %s redacted]",
+            elapsed * 1000,
+            route,
+            " ".join(statement.split()),
+            len(parameters or ()),
+            "parameter sets" if executemany else "parameters",
+        )
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Count and time the statements of ``sync_engine``; safe to call more than once."""
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """ASGI middleware that records every HTTP request under its route template."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            registry.observe(scope["method"], status_code, stats, time.perf_counter() - started)
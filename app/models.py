@@ -3,19 +3,24 @@ from __future__ import annotations
 from datetime import UTC, datetime
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    event,
+    func,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
+from . import search
 from .schemas import AssetStatus, WorkOrderPriority, WorkOrderStatus
 
 Base = declarative_base()
@@ -27,6 +32,12 @@ def utcnow() -> datetime:
 
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        Index("ix_assets_created_at_id", "created_at", "id"),
+        Index("ix_assets_status_created_at_id", "status", "created_at", "id"),
+        # Ids are never reused, so a new asset does not inherit a deleted one's history.
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, unique=True, index=True)
@@ -42,6 +53,11 @@ class Asset(Base):
         default=utcnow,
         onupdate=utcnow,
     )
+    # Bumped on every update (and when the asset's work orders change, since AssetRead
+    # embeds them); drives ETags and optimistic concurrency.
+    version = Column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version}
 
     work_orders = relationship(
         "WorkOrder",
@@ -53,10 +69,25 @@ class Asset(Base):
 
 class WorkOrder(Base):
     __tablename__ = "work_orders"
-    __table_args__ = (UniqueConstraint("asset_id", "title", name="uq_work_order_title"),)
+    __table_args__ = (
+        UniqueConstraint("asset_id", "title", name="uq_work_order_title"),
+        # Each list filter gets a (filter, created_at, id) index so its pages are read in
+        # order; (asset_id, id) orders the full asset view's nested work orders.
+        Index("ix_work_orders_created_at_id", "created_at", "id"),
+        Index("ix_work_orders_asset_id", "asset_id", "id"),
+        Index("ix_work_orders_asset_created_at_id", "asset_id", "created_at", "id"),
+        Index("ix_work_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_work_orders_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_work_orders_asset_status_priority", "asset_id", "status", "priority"),
+        Index("ix_work_orders_asset_schedule", "asset_id", "scheduled_start", "scheduled_end"),
+        # Closed work orders due for ``app.archive``.
+        Index("ix_work_orders_status_updated_at", "status", "updated_at"),
+        # Ids are never reused, so an archived work order keeps its id to itself.
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), nullable=False, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(120), nullable=False)
     description = Column(Text, nullable=True)
     status = Column(
@@ -75,5 +106,182 @@ class WorkOrder(Base):
         default=utcnow,
         onupdate=utcnow,
     )
+    version = Column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version}
 
     asset = relationship("Asset", back_populates="work_orders")
+
+    # Not a column: ids of overlapping work orders found by ``schedule.check`` on write.
+    schedule_conflicts = ()
+
+
+class ArchivedWorkOrder(Base):
+    """
+    Completed and cancelled work orders moved out of ``work_orders`` by ``app.archive``
+    once they have been closed for WORK_ORDER_ARCHIVE_AFTER_DAYS. Rows keep their id and
+    columns and are read-only; the indexes mirror the list filters of the hot table.
+    """
+
+    __tablename__ = "work_orders_archive"
+    __table_args__ = (
+        Index("ix_work_orders_archive_created_at_id", "created_at", "id"),
+        Index("ix_work_orders_archive_asset_created_at_id", "asset_id", "created_at", "id"),
+        Index("ix_work_orders_archive_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_work_orders_archive_priority_created_at_id", "priority", "created_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    asset_id = Column(Integer, ForeignKey("assets.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String(120), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(Enum(WorkOrderStatus), nullable=False)
+    priority = Column(Enum(WorkOrderPriority), nullable=False)
+    scheduled_start = Column(Date, nullable=True)
+    scheduled_end = Column(Date, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    version = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, nullable=False, default=utcnow)
+
+
+class CacheInvalidation(Base):
+    """Asset ids whose cached payloads other workers must drop (see ``app.cache``)."""
+
+    __tablename__ = "cache_invalidations"
+
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow, index=True)
+
+
+class WorkOrderStat(Base):
+    """Work order counts per asset, status and priority, maintained by ``app.stats``."""
+
+    __tablename__ = "work_order_stats"
+
+    asset_id = Column(Integer, primary_key=True)
+    status = Column(Enum(WorkOrderStatus), primary_key=True)
+    priority = Column(Enum(WorkOrderPriority), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AssetCapacityStat(Base):
+    """Asset counts and installed capacity per status and category (``app.stats``)."""
+
+    __tablename__ = "asset_capacity_stats"
+
+    status = Column(Enum(AssetStatus), primary_key=True)
+    category = Column(String(50), primary_key=True)
+    asset_count = Column(Integer, nullable=False, default=0)
+    capacity_mw = Column(Float, nullable=False, default=0.0)
+
+
+class AuditHistory(Base):
+    """
+    Append-only column-level changes to assets and work orders, written by
+    ``app.history`` in the transaction that made them. ``changes`` holds the columns a
+    write set; creations, deletions and every HISTORY_SNAPSHOT_INTERVAL-th entry of a
+    row also carry its full state in ``snapshot`` (null once deleted) and reset ``seq``.
+    """
+
+    __tablename__ = "audit_history"
+    __table_args__ = (
+        Index("ix_audit_history_entity", "entity", "entity_id", "changed_at", "id"),
+        # Work orders of one asset, for reading the asset as of a point in time.
+        Index("ix_audit_history_asset", "asset_id", "entity", "changed_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)  # "asset" or "work_order"
+    entity_id = Column(Integer, nullable=False)
+    asset_id = Column(Integer, nullable=False)  # owning asset; equals entity_id for assets
+    version = Column(Integer, nullable=True)
+    action = Column(String(10), nullable=False)  # "created", "updated" or "deleted"
+    changed_at = Column(DateTime, nullable=False)
+    seq = Column(Integer, nullable=False)  # entries since the last snapshot; 0 for one
+    changes = Column(Text, nullable=True)  # JSON
+    snapshot = Column(Text, nullable=True)  # JSON
+
+
+class TelemetryPoint(Base):
+    """
+    Append-only sensor samples. The primary key doubles as the (asset_id, tag, ts)
+    index, and on SQLite the table is stored WITHOUT ROWID so rows live in that index
+    instead of beside it.
+    """
+
+    __tablename__ = "telemetry_points"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    asset_id = Column(Integer, primary_key=True)
+    tag = Column(String(64), primary_key=True)
+    ts = Column(BigInteger, primary_key=True)  # epoch milliseconds, UTC
+    value = Column(Float, nullable=False)
+
+
+class TelemetryRollup(Base):
+    """
+    Per-bucket aggregates of ``telemetry_points`` at 60 s, 900 s and 3600 s, updated as
+    points arrive (see ``app.telemetry``).
+    """
+
+    __tablename__ = "telemetry_rollups"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    asset_id = Column(Integer, primary_key=True)
+    tag = Column(String(64), primary_key=True)
+    resolution_s = Column(Integer, primary_key=True)
+    bucket_start = Column(BigInteger, primary_key=True)  # epoch milliseconds, UTC
+    value_count = Column(Integer, nullable=False)
+    value_sum = Column(Float, nullable=False)
+    value_min = Column(Float, nullable=False)
+    value_max = Column(Float, nullable=False)
+    last_ts = Column(BigInteger, nullable=False)
+    last_value = Column(Float, nullable=False)
+
+
+class TelemetryBatch(Base):
+    """Idempotency keys of ingested telemetry batches; expired keys are evicted."""
+
+    __tablename__ = "telemetry_batches"
+
+    idempotency_key = Column(String(128), primary_key=True)
+    point_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow, index=True)
+
+
+class SchemaVersion(Base):
+    """The schema fingerprint a database was last brought up to (``app.schema_version``)."""
+
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)  # always 1
+    version = Column(String(64), nullable=False)
+    # How many of ``schema_version.MIGRATIONS`` have run, in order.
+    migrations = Column(Integer, nullable=False, default=0)
+    applied_at = Column(DateTime, nullable=False, default=utcnow)
+
+
+# Expression and descending indexes need the mapped columns, so they are declared here.
+Index("ix_assets_lower_name", func.lower(Asset.name))
+Index(
+    "ix_work_orders_asset_status_recent",
+    WorkOrder.asset_id,
+    WorkOrder.status,
+    WorkOrder.created_at.desc(),
+    WorkOrder.id.desc(),
+)
+
+# Keep the asset search index alongside the table for every engine, including tests.
+event.listen(
+    Asset.__table__,
+    "after_create",
+    lambda target, connection, **kw: search.ensure_search_index(connection),
+)
+event.listen(
+    Asset.__table__,
+    "before_drop",
+    lambda target, connection, **kw: search.drop_search_index(connection),
+)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import re
+import time
+from datetime import date, datetime
+from datetime import time as time_of_day
+from enum import Enum
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from . import metrics
+
+# List endpoints build plain dicts straight from column rows, in their response model's
+# field order, and encode them here instead of validating ORM objects through the
+# response model and then running the stdlib encoder.
+#
+# The bytes must match what JSONResponse produces for the same payload. orjson agrees
+# with it on strings (UTF-8, not ASCII-escaped), dates, naive datetimes and every float
+# that Python prints without an exponent. Python prints floats below 1e-4 or from 1e16
+# up with one, and the orjson release pinned in requirements.txt writes those as e.g.
+# "1e16" instead of "1e+16" and "0.00001" instead of "1e-05". Either form in the output
+# sends the payload through the exact stdlib path, which is also the only cost of a
+# false match inside a string. Other orjson releases format floats differently, so
+# check these forms again before changing the pin.
+
+_EXPONENT = re.compile(rb"[0-9]e[-0-9]|(?<![0-9.])0\.0000[0-9]")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time_of_day)):
+        # Same ISO format as pydantic (and orjson): "Z" for UTC.
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)[1:-1].decode()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode ``content`` exactly as JSONResponse would encode its JSON-mode dump."""
+    body = orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    if _EXPONENT.search(body) is None:
+        return body
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that reports its render time to ``app.metrics``."""
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        try:
+            return self.encode(content)
+        finally:
+            metrics.record_serialization(time.perf_counter() - started)
+
+    def encode(self, content: Any) -> bytes:
+        return super().render(content)
+
+
+class FastJSONResponse(TimedJSONResponse):
+    def encode(self, content: Any) -> bytes:
+        return dumps(content)
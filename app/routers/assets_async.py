@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud, crud_async, etags, export, history, schemas
+from ..database import get_async_db
+from ..pagination import decode_cursor, next_cursor
+from ..responses import FastJSONResponse
+
+# Async twin of ``routers.assets``, mounted instead of it when ASYNC_DB is enabled.
+router = APIRouter(prefix="/assets", tags=["assets"])
+
+
+@router.get(
+    "",
+    response_model=List[schemas.AssetListItem],
+    response_model_exclude_unset=True,
+    response_class=FastJSONResponse,
+)
+async def list_assets(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    status_filter: Optional[schemas.AssetStatus] = Query(
+        default=None, alias="status", description="Filter by asset status"
+    ),
+    search: Optional[str] = Query(
+        default=None,
+        min_length=2,
+        max_length=100,
+        description=(
+            "Case-insensitive substring search on asset name, category and location, "
+            "ranked by relevance"
+        ),
+    ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque keyset cursor taken from a previous X-Next-Cursor header",
+    ),
+    view: schemas.AssetListView = Query(
+        default=schemas.AssetListView.summary,
+        description=(
+            "summary: work order counts plus the most recent open work orders; "
+            "full: every work order of each asset"
+        ),
+    ),
+    open_limit: int = Query(
+        5, ge=0, le=50, description="Open work orders to include per asset in summary view"
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        max_length=500,
+        description="Comma-separated fields to return, e.g. id,name,status; default all",
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[schemas.AssetListItem]:
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip cannot be combined with cursor",
+        )
+    if cursor and search:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search results are ranked by relevance; page them with skip instead of cursor",
+        )
+    row_fields, nested_fields = crud.parse_asset_fields(fields, view)
+    assets = await crud_async.list_assets(
+        db,
+        fields=row_fields,
+        skip=skip,
+        limit=limit,
+        status_filter=status_filter,
+        search=search,
+        cursor=decode_cursor(cursor) if cursor else None,
+    )
+    # Ranked search results are paged with skip, so they get no cursor to follow.
+    token = None if search else next_cursor(assets, limit)
+    etag = etags.collection_etag(
+        "assets",
+        [(asset.id, asset.version) for asset in assets],
+        variant=",".join(row_fields + nested_fields),
+    )
+    if etags.none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    headers = {"ETag": etag}
+    if token:
+        headers["X-Next-Cursor"] = token
+    # Rows are shaped like AssetListItem already; skip re-validating them.
+    # Nested work order data is only queried for the fields that were asked for.
+    nested = await crud_async.list_asset_nested(
+        db, nested_fields, [asset.id for asset in assets], open_limit=open_limit
+    )
+    return FastJSONResponse(crud.build_asset_rows(assets, row_fields, nested), headers=headers)
+
+
+@router.post("", response_model=schemas.AssetRead, status_code=status.HTTP_201_CREATED)
+async def create_asset(
+    payload: schemas.AssetCreate, response: Response, db: AsyncSession = Depends(get_async_db)
+) -> schemas.AssetRead:
+    asset = await crud_async.create_asset(db, payload)
+    response.headers["ETag"] = etags.entity_etag("asset", asset.id, asset.version)
+    return asset
+
+
+@router.post(":bulk", response_model=List[schemas.BulkItemResult])
+async def bulk_create_assets(
+    payload: schemas.AssetBulkCreate,
+    upsert: bool = Query(False, description="Update assets whose name already exists"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[schemas.BulkItemResult]:
+    # The batch is a fixed handful of statements, so the sync helper runs as-is on the
+    # async connection instead of being duplicated.
+    return await db.run_sync(crud.bulk_create_assets, payload, upsert=upsert)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_assets(
+    status_filter: Optional[schemas.AssetStatus] = Query(
+        default=None, alias="status", description="Filter by asset status"
+    ),
+    search: Optional[str] = Query(
+        default=None,
+        min_length=2,
+        max_length=100,
+        description="Case-insensitive substring search on asset name, category and location",
+    ),
+    export_format: schemas.ExportFormat = Query(
+        default=schemas.ExportFormat.ndjson, alias="format", description="Output format"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> StreamingResponse:
+    """Stream every matching asset (without work orders) as NDJSON, CSV or Arrow IPC."""
+    stmt = export.asset_export_query(
+        db.bind.dialect.name, status_filter=status_filter, search=search
+    )
+    return export.stream_export_async(db.bind, stmt, "assets", export_format)
+
+
+@router.get("/{asset_id}", response_model=schemas.AssetRead)
+async def get_asset(
+    asset_id: int,
+    as_of: Optional[datetime] = Query(
+        default=None,
+        description="Return the asset as it was at this time, rebuilt from its history",
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    if as_of is not None:
+        return await db.run_sync(crud.get_asset_as_of, asset_id, as_of)
+    # Served from the asset cache as pre-encoded JSON, skipping response_model validation.
+    cached = await crud_async.get_asset_payload(db, asset_id)
+    etag = etags.entity_etag("asset", cached.asset_id, cached.version)
+    if etags.none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    return Response(content=cached.body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get(
+    "/{asset_id}/history",
+    response_model=List[schemas.HistoryEntry],
+    response_class=FastJSONResponse,
+)
+async def asset_history(
+    asset_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque keyset cursor taken from a previous X-Next-Cursor header",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[schemas.HistoryEntry]:
+    """Column-level changes to the asset, newest first; kept after it is deleted."""
+    decoded = decode_cursor(cursor) if cursor else None
+    rows = await db.run_sync(
+        crud.list_history, "asset", asset_id, limit=limit, cursor=decoded
+    )
+    token = history.next_cursor(rows, limit)
+    headers = {"X-Next-Cursor": token} if token else None
+    return FastJSONResponse(history.build_entries(rows), headers=headers)
+
+
+@router.patch("/{asset_id}", response_model=schemas.AssetRead)
+async def update_asset(
+    asset_id: int,
+    payload: schemas.AssetUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.AssetRead:
+    asset = await crud_async.get_asset_or_404(db, asset_id)
+    etags.require_match(if_match, etags.entity_etag("asset", asset.id, asset.version))
+    updated_asset = await crud_async.update_asset(db, asset, payload)
+    response.headers["ETag"] = etags.entity_etag("asset", updated_asset.id, updated_asset.version)
+    return updated_asset
+
+
+@router.delete(
+    "/{asset_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    response_class=Response,
+)
+async def delete_asset(asset_id: int, db: AsyncSession = Depends(get_async_db)) -> Response:
+    asset = await crud_async.get_asset_or_404(db, asset_id)
+    await crud_async.delete_asset(db, asset)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, WebSocket
+from fastapi.responses import StreamingResponse
+
+from .. import schemas
+from ..feed import HEARTBEAT_SECONDS, FeedFilter, feed, sse_stream
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+def feed_filters(
+    entity: Optional[schemas.ChangeEntity] = Query(
+        default=None, description="Only assets or only work orders"
+    ),
+    status_filter: Optional[str] = Query(
+        default=None,
+        alias="status",
+        max_length=32,
+        description="Entity status before or after the change, e.g. open",
+    ),
+    priority_filter: Optional[schemas.WorkOrderPriority] = Query(
+        default=None, alias="priority", description="Work order priority before or after"
+    ),
+    asset_id: Optional[int] = Query(default=None, gt=0, description="Owning asset"),
+) -> FeedFilter:
+    return FeedFilter(
+        entity=entity.value if entity else None,
+        status=status_filter,
+        priority=priority_filter.value if priority_filter else None,
+        asset_id=asset_id,
+    )
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(
+    filters: FeedFilter = Depends(feed_filters),
+    since: Optional[str] = Query(
+        default=None, max_length=64, description="Resume after this event cursor"
+    ),
+    last_event_id: Optional[str] = Header(default=None, max_length=64),
+) -> StreamingResponse:
+    """
+    Server-sent events for committed creates, updates and deletes. Browsers resume with
+    Last-Event-ID on reconnect; other clients pass the last ``cursor`` as ``since``.
+    """
+    subscription, replay = feed.subscribe(filters, last_event_id or since)
+    return StreamingResponse(
+        sse_stream(subscription, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def watch_changes(
+    websocket: WebSocket,
+    filters: FeedFilter = Depends(feed_filters),
+    since: Optional[str] = Query(default=None, max_length=64),
+) -> None:
+    """The same events as ``/changes/stream``, one JSON text message each."""
+    await websocket.accept()
+    subscription, replay = feed.subscribe(filters, since)
+    # Messages from the client are ignored; receiving only notices the disconnect.
+    closed = asyncio.ensure_future(_wait_closed(websocket))
+    try:
+        if replay is None:
+            await websocket.send_text(feed.reset_message())
+        else:
+            for event in replay:
+                await websocket.send_text(event.data)
+        while not closed.done():
+            batch = asyncio.ensure_future(subscription.next_batch(HEARTBEAT_SECONDS))
+            await asyncio.wait({batch, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                batch.cancel()
+                break
+            for event in batch.result():
+                await websocket.send_text(event.data)
+    finally:
+        closed.cancel()
+        feed.unsubscribe(subscription)
+
+
+async def _wait_closed(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from .. import anomaly, cache, database, feed
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/db")
+def database_health() -> dict[str, object]:
+    """Connection pool checkout, hold and wait statistics for worker sizing."""
+    return {"pools": database.pool_stats()}
+
+
+@router.get("/cache")
+def cache_health() -> dict[str, object]:
+    """Asset read cache hit, miss, eviction and invalidation counters."""
+    return {"assets": cache.asset_cache.stats()}
+
+
+@router.get("/changes")
+def change_feed_health() -> dict[str, object]:
+    """Change feed cursor, subscriber count and per-client queue drops."""
+    return feed.feed.stats()
+
+
+@router.get("/anomalies")
+def anomaly_health() -> dict[str, object]:
+    """Anomaly detector throughput, raised and suppressed alerts and dropped batches."""
+    return anomaly.detector.stats()
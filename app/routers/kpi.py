@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..database import get_db
+
+router = APIRouter(prefix="/kpi", tags=["kpi"])
+
+
+def _memoized(name: str, db: Session, request: schemas.KpiRequest) -> list:
+    # app.kpi (and numpy with it) is imported on the first KPI request, not at startup.
+    # Its memo fills only after that, so there is nothing to invalidate before.
+    from .. import kpi
+
+    return kpi.memoized(name, db, request, getattr(kpi, name))
+
+
+@router.post("/availability", response_model=List[schemas.AvailabilityResult])
+def get_availability(
+    request: schemas.KpiRequest, db: Session = Depends(get_db)
+) -> List[schemas.AvailabilityResult]:
+    """Share of each period an asset was not covered by maintenance work orders."""
+    return _memoized("availability", db, request)
+
+
+@router.post("/capacity-factor", response_model=List[schemas.CapacityFactorResult])
+def get_capacity_factor(
+    request: schemas.EnergyKpiRequest, db: Session = Depends(get_db)
+) -> List[schemas.CapacityFactorResult]:
+    """Energy generated over what the installed capacity could produce in each period."""
+    return _memoized("capacity_factor", db, request)
+
+
+@router.post("/efficiency", response_model=List[schemas.EfficiencyResult])
+def get_efficiency(
+    request: schemas.EnergyKpiRequest, db: Session = Depends(get_db)
+) -> List[schemas.EfficiencyResult]:
+    """Electrical energy out over fuel energy in, with the equivalent heat rate."""
+    return _memoized("efficiency", db, request)
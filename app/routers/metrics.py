@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .. import metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """Per-route request counts, latency, SQL statements, DB time and render time."""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from .. import schemas, stats
+from ..database import get_db
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("", response_model=schemas.StatsSummary)
+def get_stats(db: Session = Depends(get_db)) -> schemas.StatsSummary:
+    """Work order counts by status and priority, and capacity by asset status and category."""
+    return stats.summary(db)
+
+
+@router.get("/assets", response_model=List[schemas.AssetWorkOrderStats])
+def get_asset_stats(
+    status_filter: Optional[schemas.WorkOrderStatus] = Query(
+        default=None, alias="status", description="Only count work orders with this status"
+    ),
+    priority_filter: Optional[schemas.WorkOrderPriority] = Query(
+        default=None, alias="priority", description="Only count work orders with this priority"
+    ),
+    asset_id: Optional[int] = Query(default=None, gt=0),
+    db: Session = Depends(get_db),
+) -> List[schemas.AssetWorkOrderStats]:
+    """Per-asset work order counts, e.g. ``?status=open&priority=critical``."""
+    return stats.work_orders_by_asset(
+        db, status_filter=status_filter, priority_filter=priority_filter, asset_id=asset_id
+    )
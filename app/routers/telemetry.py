@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from .. import crud, schemas, telemetry
+from ..database import get_db
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+
+
+@router.post(
+    "", response_model=schemas.TelemetryIngestResult, status_code=status.HTTP_201_CREATED
+)
+def ingest_telemetry(
+    batch: schemas.TelemetryBatchIn,
+    idempotency_key: Optional[str] = Header(
+        default=None,
+        alias="Idempotency-Key",
+        max_length=128,
+        description="Client-chosen batch id; a repeated key is rejected with 409",
+    ),
+    db: Session = Depends(get_db),
+) -> schemas.TelemetryIngestResult:
+    return telemetry.ingest(db, batch, idempotency_key)
+
+
+@router.get(
+    "/series", response_model=schemas.TelemetrySeries, response_model_exclude_none=True
+)
+def get_series(
+    asset_id: int = Query(..., gt=0),
+    tag: str = Query(..., min_length=1, max_length=64),
+    start: datetime = Query(..., description="Inclusive range start; naive values are UTC"),
+    end: datetime = Query(..., description="Exclusive range end"),
+    max_points: int = Query(500, ge=3, le=10_000, description="Point budget for the chart"),
+    resolution: schemas.TelemetryResolution = Query(
+        default=schemas.TelemetryResolution.auto,
+        description=(
+            "auto picks raw points (LTTB-downsampled) for short ranges and otherwise the "
+            "finest rollup that fits max_points"
+        ),
+    ),
+    db: Session = Depends(get_db),
+) -> schemas.TelemetrySeries:
+    if telemetry.epoch_ms(end) <= telemetry.epoch_ms(start):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="end must be after start"
+        )
+    crud.get_asset_or_404(db, asset_id)
+    return telemetry.query_series(
+        db, asset_id, tag, start, end, max_points=max_points, resolution=resolution
+    )
+
+
+@router.get("/metrics")
+def ingest_metrics() -> dict[str, object]:
+    """Ingest throughput and duplicate counters for this worker."""
+    return telemetry.ingest_metrics.snapshot()
@@ -1,17 +1,21 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas
+from .. import crud, etags, export, history, schedule, schemas
 from ..database import get_db
+from ..pagination import decode_cursor, next_cursor
+from ..responses import FastJSONResponse
 
 router = APIRouter(prefix="/workorders", tags=["work orders"])
 
 
-@router.get("", response_model=List[schemas.WorkOrderRead])
+@router.get("", response_model=List[schemas.WorkOrderRead], response_class=FastJSONResponse)
 def list_work_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
@@ -26,39 +30,178 @@ def list_work_orders(
         gt=0,
         description="Limit to work orders for a specific asset",
     ),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque keyset cursor taken from a previous X-Next-Cursor header",
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        max_length=500,
+        description="Comma-separated fields to return, e.g. id,name,status; default all",
+    ),
+    include_archived: bool = Query(
+        False, description="Also return work orders moved to the archive once closed"
+    ),
+    if_none_match: Optional[str] = Header(default=None),
     db: Session = Depends(get_db),
 ) -> List[schemas.WorkOrderRead]:
+    if cursor and skip:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="skip cannot be combined with cursor",
+        )
+    selected = crud.parse_fields(fields, crud.WORK_ORDER_ROW_FIELDS)
     work_orders = crud.list_work_orders(
         db,
+        fields=selected,
         skip=skip,
         limit=limit,
         status_filter=status_filter,
         priority_filter=priority_filter,
         asset_id=asset_id,
+        cursor=decode_cursor(cursor) if cursor else None,
+        include_archived=include_archived,
+    )
+    token = next_cursor(work_orders, limit)
+    etag = etags.collection_etag(
+        "workorders", [(wo.id, wo.version) for wo in work_orders], variant=",".join(selected)
     )
-    return work_orders
+    if etags.none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    headers = {"ETag": etag}
+    if token:
+        headers["X-Next-Cursor"] = token
+    # Rows are shaped like WorkOrderRead already; skip re-validating them.
+    return FastJSONResponse(crud.build_work_order_rows(work_orders, selected), headers=headers)
 
 
 @router.post("", response_model=schemas.WorkOrderRead, status_code=status.HTTP_201_CREATED)
 def create_work_order(
-    payload: schemas.WorkOrderCreate, db: Session = Depends(get_db)
+    payload: schemas.WorkOrderCreate, response: Response, db: Session = Depends(get_db)
 ) -> schemas.WorkOrderRead:
     work_order = crud.create_work_order(db, payload)
+    schedule.add_conflict_header(response, work_order)
+    response.headers["ETag"] = etags.entity_etag("work_order", work_order.id, work_order.version)
     return work_order
 
 
+@router.post(":bulk", response_model=List[schemas.BulkItemResult])
+def bulk_create_work_orders(
+    payload: schemas.WorkOrderBulkCreate,
+    upsert: bool = Query(
+        False, description="Update work orders whose (asset_id, title) already exists"
+    ),
+    db: Session = Depends(get_db),
+) -> List[schemas.BulkItemResult]:
+    return crud.bulk_create_work_orders(db, payload, upsert=upsert)
+
+
+@router.post(":transition", response_model=schemas.WorkOrderTransitionResult)
+def transition_work_orders(
+    payload: schemas.WorkOrderTransition, db: Session = Depends(get_db)
+) -> schemas.WorkOrderTransitionResult:
+    """Complete, cancel or re-prioritize every work order the filter selects at once."""
+    return crud.transition_work_orders(db, payload)
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_work_orders(
+    status_filter: Optional[schemas.WorkOrderStatus] = Query(
+        default=None, alias="status", description="Filter by work order status"
+    ),
+    priority_filter: Optional[schemas.WorkOrderPriority] = Query(
+        default=None, alias="priority", description="Filter by work order priority"
+    ),
+    asset_id: Optional[int] = Query(
+        default=None,
+        gt=0,
+        description="Limit to work orders for a specific asset",
+    ),
+    export_format: schemas.ExportFormat = Query(
+        default=schemas.ExportFormat.ndjson, alias="format", description="Output format"
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Stream every matching work order as NDJSON, CSV or Arrow IPC."""
+    stmt = export.work_order_export_query(
+        status_filter=status_filter, priority_filter=priority_filter, asset_id=asset_id
+    )
+    return export.stream_export(db.get_bind(), stmt, "workorders", export_format)
+
+
+@router.get("/conflicts", response_model=List[schemas.ScheduleConflict])
+def list_schedule_conflicts(
+    asset_id: Optional[int] = Query(default=None, gt=0, description="Limit to one asset"),
+    limit: int = Query(1000, ge=1, le=10_000, description="Maximum pairs returned"),
+    db: Session = Depends(get_db),
+) -> List[schemas.ScheduleConflict]:
+    """Overlapping pairs of open or in-progress work orders across the fleet."""
+    return schedule.fleet_conflicts(db, asset_id=asset_id, limit=limit)
+
+
 @router.get("/{work_order_id}", response_model=schemas.WorkOrderRead)
-def get_work_order(work_order_id: int, db: Session = Depends(get_db)) -> schemas.WorkOrderRead:
-    work_order = crud.get_work_order_or_404(db, work_order_id)
+def get_work_order(
+    work_order_id: int,
+    response: Response,
+    as_of: Optional[datetime] = Query(
+        default=None,
+        description="Return the work order as it was at this time, rebuilt from its history",
+    ),
+    include_archived: bool = Query(
+        False, description="Fall back to the archive if the work order has been archived"
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+) -> schemas.WorkOrderRead:
+    if as_of is not None:
+        return crud.get_work_order_as_of(db, work_order_id, as_of)
+    work_order = crud.get_work_order_or_404(db, work_order_id, include_archived=include_archived)
+    etag = etags.entity_etag("work_order", work_order.id, work_order.version)
+    if etags.none_match(if_none_match, etag):
+        return etags.not_modified(etag)
+    response.headers["ETag"] = etag
     return work_order
 
 
+@router.get(
+    "/{work_order_id}/history",
+    response_model=List[schemas.HistoryEntry],
+    response_class=FastJSONResponse,
+)
+def work_order_history(
+    work_order_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque keyset cursor taken from a previous X-Next-Cursor header",
+    ),
+    db: Session = Depends(get_db),
+) -> List[schemas.HistoryEntry]:
+    """Column-level changes to the work order, newest first; kept after it is deleted."""
+    decoded = decode_cursor(cursor) if cursor else None
+    rows = crud.list_history(db, "work_order", work_order_id, limit=limit, cursor=decoded)
+    token = history.next_cursor(rows, limit)
+    headers = {"X-Next-Cursor": token} if token else None
+    return FastJSONResponse(history.build_entries(rows), headers=headers)
+
+
 @router.patch("/{work_order_id}", response_model=schemas.WorkOrderRead)
 def update_work_order(
-    work_order_id: int, payload: schemas.WorkOrderUpdate, db: Session = Depends(get_db)
+    work_order_id: int,
+    payload: schemas.WorkOrderUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
 ) -> schemas.WorkOrderRead:
     work_order = crud.get_work_order_or_404(db, work_order_id)
+    etags.require_match(
+        if_match, etags.entity_etag("work_order", work_order.id, work_order.version)
+    )
     updated_work_order = crud.update_work_order(db, work_order, payload)
+    schedule.add_conflict_header(response, updated_work_order)
+    response.headers["ETag"] = etags.entity_etag(
+        "work_order", updated_work_order.id, updated_work_order.version
+    )
     return updated_work_order
 
 
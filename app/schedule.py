@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import heapq
+import os
+from datetime import date
+from typing import Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+
+# Overlapping outages on one asset. A work order occupies the days from scheduled_start
+# through scheduled_end (or just scheduled_start) while it is open or in progress;
+# completed and cancelled work orders never conflict.
+#
+# WORK_ORDER_CONFLICT_POLICY=warn (default) accepts the write and lists the conflicting
+# ids in an X-Schedule-Conflicts header; =reject refuses it with 409. Bulk writes check
+# each item against the stored work orders and the rest of the batch, and report the
+# conflicts in the item's result: written with a detail, or a "conflict" result.
+
+CONFLICT_POLICY = os.getenv("WORK_ORDER_CONFLICT_POLICY", "warn")
+if CONFLICT_POLICY not in ("warn", "reject"):
+    raise ValueError(f"WORK_ORDER_CONFLICT_POLICY must be warn or reject, not {CONFLICT_POLICY!r}")
+
+CONFLICT_HEADER = "X-Schedule-Conflicts"
+BLOCKING_STATUSES = (schemas.WorkOrderStatus.open, schemas.WorkOrderStatus.in_progress)
+REPORT_CHUNK_SIZE = 5000
+
+
+def _schedule_end():
+    wo = models.WorkOrder
+    return func.coalesce(wo.scheduled_end, wo.scheduled_start)
+
+
+def conflict_query(
+    asset_id: int, start: date, end: date, exclude_id: Optional[int] = None
+) -> Select:
+    """Ids of blocking work orders on ``asset_id`` overlapping ``start``..``end``."""
+    wo = models.WorkOrder
+    # Served by ix_work_orders_asset_schedule: equality on asset_id, a range on
+    # scheduled_start, and scheduled_end read from the same index entry, in index order.
+    stmt = (
+        select(wo.id)
+        .where(
+            wo.asset_id == asset_id,
+            wo.scheduled_start <= end,
+            _schedule_end() >= start,
+            wo.status.in_(BLOCKING_STATUSES),
+        )
+        .order_by(wo.scheduled_start, wo.scheduled_end, wo.id)
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(wo.id != exclude_id)
+    return stmt
+
+
+def check(db: Session, work_order: models.WorkOrder) -> list[int]:
+    """
+    Conflicting ids for ``work_order`` as it is about to be written; raises 409 under the
+    reject policy. Callers run this after locking the asset row with the version bump, so
+    concurrent writes to one asset cannot both pass.
+    """
+    if work_order.scheduled_start is None or work_order.status not in BLOCKING_STATUSES:
+        return []
+    conflicts = list(
+        db.scalars(
+            conflict_query(
+                work_order.asset_id,
+                work_order.scheduled_start,
+                work_order.scheduled_end or work_order.scheduled_start,
+                exclude_id=work_order.id,
+            )
+        )
+    )
+    if conflicts and CONFLICT_POLICY == "reject":
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=conflict_detail(conflicts),
+        )
+    return conflicts
+
+
+def batch_conflicts(
+    db: Session, items: Sequence[tuple[int, int, date, date, Optional[int]]]
+) -> dict[int, tuple[list[int], list[int]]]:
+    """
+    Conflicts of a batch about to be written, as ``(index, asset_id, start, end, id)``
+    items (``id`` None for new rows): for each conflicting index, the ids of stored
+    blocking work orders and the indexes of other items it overlaps.
+
+    The same sweep as ``fleet_conflicts`` runs over the items and the stored blocking
+    work orders of their assets, so the cost is O(n log n) plus the pairs found. Rows
+    the batch rewrites are left out; their items stand in for them.
+    """
+    if not items:
+        return {}
+    wo = models.WorkOrder
+    stmt = select(wo.asset_id, wo.scheduled_start, _schedule_end(), wo.id).where(
+        wo.asset_id.in_({item[1] for item in items}),
+        wo.scheduled_start.is_not(None),
+        wo.status.in_(BLOCKING_STATUSES),
+    )
+    rewritten = [item[4] for item in items if item[4] is not None]
+    if rewritten:
+        stmt = stmt.where(wo.id.not_in(rewritten))
+    # (asset_id, start, end, is_item, id or index)
+    intervals = [(row[0], row[1], row[2], False, row[3]) for row in db.execute(stmt)]
+    intervals += [(asset_id, start, end, True, index) for index, asset_id, start, end, _ in items]
+    intervals.sort()
+
+    conflicts: dict[int, tuple[list[int], list[int]]] = {}
+
+    def add(index: int, is_item: bool, other: int) -> None:
+        ids, indexes = conflicts.setdefault(index, ([], []))
+        (indexes if is_item else ids).append(other)
+
+    current_asset: Optional[int] = None
+    active: list[tuple[date, bool, int]] = []
+    for asset_id, start, end, is_item, key in intervals:
+        if asset_id != current_asset:
+            current_asset = asset_id
+            active.clear()
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        for _, active_is_item, active_key in active:
+            if is_item:
+                add(key, active_is_item, active_key)
+            if active_is_item:
+                add(active_key, is_item, key)
+        heapq.heappush(active, (end, is_item, key))
+    return {
+        index: (sorted(ids), sorted(indexes)) for index, (ids, indexes) in conflicts.items()
+    }
+
+
+def conflict_detail(ids: Sequence[int], indexes: Sequence[int] = ()) -> str:
+    """The 409 or bulk result detail naming what a work order overlaps."""
+    parts = []
+    if ids:
+        parts.append(f"scheduled work orders: {', '.join(map(str, ids))}")
+    if indexes:
+        parts.append(f"batch items: {', '.join(map(str, indexes))}")
+    return f"Work order overlaps {'; '.join(parts)}"
+
+
+def add_conflict_header(response: Response, work_order: models.WorkOrder) -> None:
+    if work_order.schedule_conflicts:
+        response.headers[CONFLICT_HEADER] = ",".join(map(str, work_order.schedule_conflicts))
+
+
+def fleet_conflicts(
+    db: Session, *, asset_id: Optional[int] = None, limit: int = 1000
+) -> list[dict[str, object]]:
+    """
+    Every overlapping pair of blocking work orders, ordered by asset and start date.
+
+    One pass over the work orders sorted by (asset_id, scheduled_start) keeps a min-heap of
+    the intervals still open, keyed by end date. Each new interval first drops those that
+    ended before it starts and then overlaps exactly the ones left, so the cost is
+    O(n log n) plus the pairs reported, not O(n^2).
+    """
+    wo = models.WorkOrder
+    stmt = (
+        select(wo.asset_id, wo.scheduled_start, _schedule_end(), wo.id)
+        .where(wo.scheduled_start.is_not(None), wo.status.in_(BLOCKING_STATUSES))
+        .order_by(wo.asset_id, wo.scheduled_start, wo.scheduled_end, wo.id)
+    )
+    if asset_id is not None:
+        stmt = stmt.where(wo.asset_id == asset_id)
+
+    pairs: list[dict[str, object]] = []
+    current_asset: Optional[int] = None
+    active: list[tuple[date, int]] = []
+    result = db.execute(stmt.execution_options(yield_per=REPORT_CHUNK_SIZE))
+    for row_asset, start, end, work_order_id in result:
+        if row_asset != current_asset:
+            current_asset = row_asset
+            active.clear()
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        for active_end, active_id in sorted(active, key=lambda item: item[1]):
+            pairs.append(
+                {
+                    "asset_id": row_asset,
+                    "work_order_id": active_id,
+                    "conflicting_work_order_id": work_order_id,
+                    "overlap_start": start,
+                    "overlap_end": min(active_end, end),
+                }
+            )
+            if len(pairs) >= limit:
+                result.close()
+                return pairs
+        heapq.heappush(active, (end, work_order_id))
+    return pairs
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import warnings
+from datetime import UTC, datetime
+from functools import cache
+from typing import Iterator, Optional
+
+from sqlalchemy import Index, MetaData, Select, delete, exc, func, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine, Inspector
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from . import models, search
+
+# Schema setup at startup. A fingerprint of the models' tables, columns, indexes and
+# constraints (and of the search DDL) is stored in ``schema_version`` whenever the
+# schema is brought up to date. A start whose fingerprint matches the stored one costs
+# one indexed read, instead of create_all checking every table and index.
+#
+# SCHEMA_MODE picks the behavior:
+#   auto   - bring the schema up to date only when the fingerprint differs (default)
+#   always - run create_all and the index/search DDL on every start
+#   skip   - never touch the schema; it is managed outside the app
+#
+# Bringing the schema up to date first runs the MIGRATIONS the database has not had yet,
+# in order; they change tables that databases created by earlier releases already have.
+# It then creates missing tables and indexes and compares the live tables with the
+# models. A mismatch no migration covers stops the start instead of being recorded as up
+# to date. Each migration also checks the live schema first, so it is safe to run again.
+
+SCHEMA_MODE = os.getenv("SCHEMA_MODE", "auto").lower()
+MODES = ("auto", "always", "skip")
+
+
+@cache
+def fingerprint() -> str:
+    """A digest of the schema the models describe; changes whenever the DDL would."""
+    digest = hashlib.sha256(f"search:{search.DDL_VERSION}".encode())
+    for table in models.Base.metadata.sorted_tables:
+        parts = [table.name, repr(sorted(table.dialect_kwargs.items()))]
+        parts += [
+            f"{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}"
+            for column in table.columns
+        ]
+        parts += sorted(
+            f"{index.name}:{[str(expr) for expr in index.expressions]}:{index.unique}"
+            for index in table.indexes
+        )
+        parts += sorted(
+            f"{type(constraint).__name__}:{constraint.name}:{sorted(constraint.columns.keys())}"
+            for constraint in table.constraints
+        )
+        digest.update("\n".join(parts).encode())
+    return digest.hexdigest()
+
+
+def stored_version(connection: Connection) -> Optional[str]:
+    """The fingerprint stored in the database, or None if it has never been set up."""
+    table = models.SchemaVersion.__table__
+    if not connection.dialect.has_table(connection, table.name):
+        return None
+    return connection.scalar(select(table.c.version).where(table.c.id == 1))
+
+
+def applied_migrations(connection: Connection) -> int:
+    """How many of MIGRATIONS the database has had; 0 if it has never been set up."""
+    table = models.SchemaVersion.__table__
+    if not connection.dialect.has_table(connection, table.name):
+        return 0
+    return connection.scalar(select(table.c.migrations).where(table.c.id == 1)) or 0
+
+
+def _index_columns(inspector: Inspector) -> Iterator[tuple[Index, Optional[list[str]]]]:
+    """Each model index of an existing table with its live columns; None if the index
+    is missing or on an expression."""
+    for table in models.Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        with warnings.catch_warnings():
+            # SQLite does not reflect expression indexes and warns about each one.
+            warnings.simplefilter("ignore", exc.SAWarning)
+            live = {
+                index["name"]: index["column_names"]
+                for index in inspector.get_indexes(table.name)
+            }
+        for index in table.indexes:
+            columns = live.get(index.name)
+            yield index, None if columns is None or None in columns else columns
+
+
+def _has_autoincrement(connection: Connection, table: str) -> Optional[bool]:
+    """Whether a SQLite table was created with AUTOINCREMENT; None if it does not exist."""
+    sql = connection.scalar(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": table},
+    )
+    return None if sql is None else "AUTOINCREMENT" in sql.upper()
+
+
+def _has_history(connection: Connection) -> bool:
+    return connection.dialect.has_table(connection, models.AuditHistory.__tablename__)
+
+
+def _add_version_columns(connection: Connection) -> None:
+    """Add the optimistic concurrency ``version`` columns; existing rows start at 1."""
+    inspector = inspect(connection)
+    for table in (models.Asset.__tablename__, models.WorkOrder.__tablename__):
+        if not inspector.has_table(table):
+            continue
+        if "version" not in {column["name"] for column in inspector.get_columns(table)}:
+            connection.execute(
+                text(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+            )
+
+
+def _recreate_redefined_indexes(connection: Connection) -> None:
+    """Rebuild indexes whose columns changed since they were created under their name."""
+    inspector = inspect(connection)
+    for index, live_columns in _index_columns(inspector):
+        if live_columns is not None and live_columns != [c.name for c in index.columns]:
+            connection.execute(text(f"DROP INDEX {index.name}"))
+            connection.execute(CreateIndex(index))
+
+
+def _rebuild_with_autoincrement(connection: Connection, model: type, *taken: Select) -> None:
+    """
+    Rebuild ``model``'s table on SQLite if it was created without AUTOINCREMENT, which
+    hands the highest id out again once its row is gone: copy the rows into a new table,
+    drop the old one and rename the copy.
+
+    The ids ``taken`` selects (each a max) are reserved as well, so a new row never gets
+    the id of one that left the table before the rebuild.
+    """
+    table = model.__table__
+    if connection.dialect.name != "sqlite":
+        return
+    if _has_autoincrement(connection, table.name) in (None, True):
+        return
+    if connection.exec_driver_sql("PRAGMA foreign_keys").scalar():
+        # Dropping the old table would delete the rows that reference it.
+        raise RuntimeError(f"Rebuilding {table.name} needs PRAGMA foreign_keys off")
+    live = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in live)
+    metadata = MetaData()
+    for foreign_key in table.foreign_keys:
+        foreign_key.column.table.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name=f"{table.name}_rebuilt")
+    connection.execute(CreateTable(rebuilt))
+    connection.execute(
+        text(f"INSERT INTO {rebuilt.name} ({columns}) SELECT {columns} FROM {table.name}")
+    )
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {rebuilt.name} RENAME TO {table.name}"))
+    for index in table.indexes:
+        connection.execute(CreateIndex(index))
+    used = connection.scalar(select(func.max(table.c.id))) or 0
+    reserved = max((connection.scalar(query) or 0 for query in taken), default=0)
+    if reserved > used:
+        connection.execute(
+            text("DELETE FROM sqlite_sequence WHERE name = :name"), {"name": table.name}
+        )
+        connection.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+            {"name": table.name, "seq": reserved},
+        )
+
+
+def _history_max_id(entity: str) -> Select:
+    history = models.AuditHistory.__table__
+    return select(func.max(history.c.entity_id)).where(history.c.entity == entity)
+
+
+def _rebuild_work_orders(connection: Connection) -> None:
+    """Give ``work_orders`` AUTOINCREMENT, reserving archived ids."""
+    archive = models.ArchivedWorkOrder.__table__
+    taken = [_history_max_id("work_order")] if _has_history(connection) else []
+    if connection.dialect.has_table(connection, archive.name):
+        taken.append(select(func.max(archive.c.id)))
+    _rebuild_with_autoincrement(connection, models.WorkOrder, *taken)
+
+
+def _rebuild_assets(connection: Connection) -> None:
+    """
+    Give ``assets`` AUTOINCREMENT, reserving the ids of deleted assets the history still
+    has entries for, so a new asset does not inherit an old one's history.
+    """
+    taken = [_history_max_id("asset")] if _has_history(connection) else []
+    _rebuild_with_autoincrement(connection, models.Asset, *taken)
+
+
+# Append only: a database records how many of these it has had and runs the rest.
+MIGRATIONS = (
+    _add_version_columns,
+    _recreate_redefined_indexes,
+    _rebuild_work_orders,
+    _rebuild_assets,
+)
+
+
+def schema_mismatches(connection: Connection) -> list[str]:
+    """Differences between the live tables and the models that setup cannot fix."""
+    inspector = inspect(connection)
+    mismatches = []
+    for table in models.Base.metadata.sorted_tables:
+        live = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column.name for column in table.columns if column.name not in live]
+        if missing:
+            mismatches.append(f"{table.name} lacks columns {', '.join(missing)}")
+        if (
+            connection.dialect.name == "sqlite"
+            and table.dialect_options["sqlite"]["autoincrement"]
+            and not _has_autoincrement(connection, table.name)
+        ):
+            mismatches.append(f"{table.name} was created without AUTOINCREMENT")
+    for index, live_columns in _index_columns(inspector):
+        expected = [column.name for column in index.columns]
+        if live_columns is not None and live_columns != expected:
+            mismatches.append(
+                f"index {index.name} is on ({', '.join(live_columns)}), "
+                f"not ({', '.join(expected)})"
+            )
+    return mismatches
+
+
+def upgrade(connection: Connection) -> None:
+    """Run pending migrations, create missing tables, indexes and the search index, check
+    the result against the models, then store the fingerprint."""
+    for migration in MIGRATIONS[applied_migrations(connection):]:
+        migration(connection)
+    models.Base.metadata.create_all(bind=connection)
+    # create_all skips existing tables, so databases created earlier get newer indexes
+    # and the search index here.
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    search.ensure_search_index(connection)
+    mismatches = schema_mismatches(connection)
+    if mismatches:
+        raise RuntimeError(
+            "The database schema does not match the models and no migration covers it: "
+            + "; ".join(mismatches)
+        )
+    table = models.SchemaVersion.__table__
+    connection.execute(delete(table))
+    connection.execute(
+        insert(table).values(
+            id=1,
+            version=fingerprint(),
+            migrations=len(MIGRATIONS),
+            applied_at=datetime.now(UTC),
+        )
+    )
+
+
+def ensure_schema(bind: Engine, mode: str = SCHEMA_MODE) -> bool:
+    """Bring the schema up to date as ``mode`` asks; True if it ran ``upgrade``."""
+    if mode not in MODES:
+        raise ValueError(f"SCHEMA_MODE must be one of {', '.join(MODES)}, not {mode!r}")
+    if mode == "skip":
+        return False
+    if mode == "auto":
+        with bind.connect() as connection:
+            if stored_version(connection) == fingerprint():
+                return False
+    with bind.begin() as connection:
+        upgrade(connection)
+    return True
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, model_validator, with_config
+from typing_extensions import TypedDict
 
 
 class AssetStatus(str, Enum):
@@ -28,6 +29,29 @@ class WorkOrderPriority(str, Enum):
     critical = "critical"
 
 
+class BulkResultStatus(str, Enum):
+    created = "created"
+    updated = "updated"
+    conflict = "conflict"
+    not_found = "not_found"
+
+
+class ChangeEntity(str, Enum):
+    asset = "asset"
+    work_order = "work_order"
+
+
+class AssetListView(str, Enum):
+    summary = "summary"
+    full = "full"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"
+
+
 class AssetBase(BaseModel):
     name: str = Field(..., min_length=2, max_length=100, description="Unique asset name")
     category: str = Field(..., min_length=2, max_length=50, description="Asset category, e.g., turbine")
@@ -43,6 +67,22 @@ class AssetCreate(AssetBase):
     pass
 
 
+class AssetBulkCreate(BaseModel):
+    items: List[AssetCreate] = Field(..., min_length=1, max_length=5000)
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_unique_names(cls, values: "AssetBulkCreate") -> "AssetBulkCreate":
+        seen: set[str] = set()
+        for item in values.items:
+            key = item.name.lower()
+            if key in seen:
+                raise ValueError(f"duplicate asset name in batch: {item.name}")
+            seen.add(key)
+        return values
+
+
 class AssetUpdate(BaseModel):
     category: Optional[str] = Field(None, min_length=2, max_length=50)
     status: Optional[AssetStatus] = None
@@ -71,6 +111,19 @@ class AssetRead(AssetBase):
     model_config = {"from_attributes": True}
 
 
+class AssetListItem(AssetBase):
+    """List entry; which work order fields are present depends on the list view."""
+
+    id: int
+    created_at: datetime
+    updated_at: datetime
+    work_orders: Optional[List[WorkOrderSummary]] = None
+    work_order_counts: Optional[Dict[WorkOrderStatus, Dict[WorkOrderPriority, int]]] = None
+    open_work_orders: Optional[List[WorkOrderSummary]] = None
+
+    model_config = {"from_attributes": True}
+
+
 class WorkOrderBase(BaseModel):
     title: str = Field(..., min_length=3, max_length=120)
     description: Optional[str] = Field(None, max_length=10_000)
@@ -103,6 +156,24 @@ class WorkOrderCreate(WorkOrderBase):
     asset_id: int = Field(..., gt=0)
 
 
+class WorkOrderBulkCreate(BaseModel):
+    items: List[WorkOrderCreate] = Field(..., min_length=1, max_length=5000)
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_unique_titles(cls, values: "WorkOrderBulkCreate") -> "WorkOrderBulkCreate":
+        seen: set[tuple[int, str]] = set()
+        for item in values.items:
+            key = (item.asset_id, item.title)
+            if key in seen:
+                raise ValueError(
+                    f"duplicate work order title in batch for asset {item.asset_id}: {item.title}"
+                )
+            seen.add(key)
+        return values
+
+
 class WorkOrderUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=3, max_length=120)
     description: Optional[str] = Field(None, max_length=10_000)
@@ -131,6 +202,50 @@ class WorkOrderUpdate(BaseModel):
         return values
 
 
+class WorkOrderSelection(BaseModel):
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=5000)
+    asset_id: Optional[int] = Field(None, gt=0)
+    status: Optional[WorkOrderStatus] = None
+    priority: Optional[WorkOrderPriority] = None
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_not_empty(cls, values: "WorkOrderSelection") -> "WorkOrderSelection":
+        if not values.model_fields_set:
+            raise ValueError("select by at least one of ids, asset_id, status, priority")
+        return values
+
+
+class WorkOrderTransition(BaseModel):
+    filter: WorkOrderSelection
+    status: Optional[WorkOrderStatus] = None
+    priority: Optional[WorkOrderPriority] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_target(cls, values: "WorkOrderTransition") -> "WorkOrderTransition":
+        if not values.model_fields_set - {"filter"}:
+            raise ValueError("set at least one of status, priority, completed_at")
+        if values.status in (WorkOrderStatus.open, WorkOrderStatus.in_progress):
+            # Reopening can create schedule conflicts, which PATCH checks per work order.
+            raise ValueError("work orders can only be transitioned to completed or cancelled")
+        return values
+
+
+class WorkOrderTransitionResult(BaseModel):
+    updated: List[int]
+    skipped: List[int] = Field(
+        ...,
+        description=(
+            "Selected but left unchanged: completed_at is before their scheduled_start, "
+            "or they were modified concurrently"
+        ),
+    )
+
+
 class WorkOrderRead(WorkOrderBase):
     id: int
     asset_id: int
@@ -138,3 +253,160 @@ class WorkOrderRead(WorkOrderBase):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class HistoryAction(str, Enum):
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+
+
+class HistoryEntry(BaseModel):
+    version: Optional[int] = None
+    action: HistoryAction
+    changed_at: datetime
+    changes: Optional[Dict[str, Any]] = Field(
+        None, description="Columns the write set, with their new values; null for deletions"
+    )
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    result: BulkResultStatus
+    detail: Optional[str] = None
+
+
+class ScheduleConflict(BaseModel):
+    asset_id: int
+    work_order_id: int = Field(..., description="The work order that starts first")
+    conflicting_work_order_id: int
+    overlap_start: date
+    overlap_end: date = Field(..., description="Last day both work orders cover")
+
+
+class CapacityTotals(BaseModel):
+    assets: int
+    capacity_mw: float
+
+
+class StatsSummary(BaseModel):
+    work_orders: Dict[WorkOrderStatus, Dict[WorkOrderPriority, int]]
+    capacity: Dict[AssetStatus, Dict[str, CapacityTotals]] = Field(
+        ..., description="Asset count and installed capacity by status, then category"
+    )
+
+
+class AssetWorkOrderStats(BaseModel):
+    asset_id: int
+    work_orders: Dict[WorkOrderStatus, Dict[WorkOrderPriority, int]]
+
+
+# A TypedDict rather than a model: batches carry up to 50k points, and validating into
+# plain dicts takes about half the time of building a model instance per point.
+@with_config({"extra": "forbid"})
+class TelemetryPointIn(TypedDict):
+    asset_id: Annotated[int, Field(gt=0)]
+    tag: Annotated[str, Field(min_length=1, max_length=64, description="Sensor tag")]
+    ts: Annotated[datetime, Field(description="Sample time; naive values are taken as UTC")]
+    value: Annotated[float, Field(allow_inf_nan=False)]
+
+
+class TelemetryBatchIn(BaseModel):
+    points: List[TelemetryPointIn] = Field(..., min_length=1, max_length=50_000)
+
+    model_config = {"extra": "forbid"}
+
+
+class TelemetryIngestResult(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int = Field(..., description="Points whose (asset_id, tag, ts) already existed")
+
+
+class TelemetryResolution(str, Enum):
+    auto = "auto"
+    raw = "raw"
+    minute = "1m"
+    quarter_hour = "15m"
+    hour = "1h"
+
+
+class TelemetrySeriesPoint(BaseModel):
+    ts: datetime
+    value: float = Field(..., description="Sample value, or the bucket mean for rollups")
+    min: Optional[float] = None
+    max: Optional[float] = None
+    last: Optional[float] = None
+    count: Optional[int] = None
+
+
+class TelemetrySeries(BaseModel):
+    asset_id: int
+    tag: str
+    resolution: TelemetryResolution = Field(..., description="Resolution actually served")
+    downsampled: bool = Field(..., description="True when LTTB dropped points to fit max_points")
+    points: List[TelemetrySeriesPoint]
+
+
+class KpiPeriod(BaseModel):
+    start: datetime = Field(..., description="Inclusive period start; naive values are UTC")
+    end: datetime = Field(..., description="Exclusive period end")
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_range(cls, values: "KpiPeriod") -> "KpiPeriod":
+        if values.end <= values.start:
+            raise ValueError("end must be after start")
+        return values
+
+
+class KpiRequest(BaseModel):
+    asset_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    periods: List[KpiPeriod] = Field(..., min_length=1, max_length=366)
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def validate_unique_assets(cls, values: "KpiRequest") -> "KpiRequest":
+        if len(set(values.asset_ids)) != len(values.asset_ids):
+            raise ValueError("duplicate asset id in asset_ids")
+        return values
+
+
+class EnergyKpiRequest(KpiRequest):
+    power_tag: str = Field(
+        "active_power_mw", min_length=1, max_length=64, description="Electrical output in MW"
+    )
+    fuel_tag: str = Field(
+        "fuel_input_mw_th",
+        min_length=1,
+        max_length=64,
+        description="Thermal fuel input in MW; only used for efficiency",
+    )
+
+
+class KpiResultBase(BaseModel):
+    asset_id: int
+    start: datetime
+    end: datetime
+
+
+class AvailabilityResult(KpiResultBase):
+    period_hours: float
+    downtime_hours: float = Field(..., description="Hours covered by non-cancelled work orders")
+    availability: float
+
+
+class CapacityFactorResult(KpiResultBase):
+    energy_mwh: float
+    capacity_mw: float
+    capacity_factor: Optional[float] = None
+
+
+class EfficiencyResult(KpiResultBase):
+    energy_mwh: float
+    fuel_mwh: float
+    efficiency: Optional[float] = None
+    heat_rate_kj_per_kwh: Optional[float] = None
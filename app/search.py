@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Asset search index ------------------------------------------------------------------
+# SQLite keeps an external-content FTS5 table with the trigram tokenizer in sync with
+# ``assets`` through triggers, so substring matches stay index-backed. Postgres gets a
+# pg_trgm GIN index over the same text, which it maintains on its own.
+SQLITE_FTS_TABLE = "assets_search"
+SEARCH_COLUMNS = ("name", "category", "location")
+
+# FTS5 trigram queries need at least three characters; shorter terms fall back to LIKE.
+MIN_TRIGRAM_LENGTH = 3
+
+# Part of the schema fingerprint (``app.schema_version``): bump it when the DDL below
+# changes so existing databases pick the change up on their next start.
+DDL_VERSION = 2
+
+_SQLITE_DDL = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai AFTER INSERT ON assets BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, category, location)
+        VALUES (new.id, new.name, new.category, new.location);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad AFTER DELETE ON assets BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, category, location)
+        VALUES ('delete', old.id, old.name, old.category, old.location);
+    END
+    """,
+    # Only on the searched columns: every work order write bumps assets.version, which
+    # must not rewrite the asset's search row. Dropped first so databases with the
+    # older, unconditional trigger get this one.
+    f"DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au",
+    f"""
+    CREATE TRIGGER {SQLITE_FTS_TABLE}_au AFTER UPDATE OF {', '.join(SEARCH_COLUMNS)} ON assets
+    BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, category, location)
+        VALUES ('delete', old.id, old.name, old.category, old.location);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, category, location)
+        VALUES (new.id, new.name, new.category, new.location);
+    END
+    """,
+)
+
+POSTGRES_SEARCH_DOCUMENT = "lower(name || ' ' || category || ' ' || location)"
+
+_POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_assets_search_trgm ON assets "
+    f"USING gin (({POSTGRES_SEARCH_DOCUMENT}) gin_trgm_ops)",
+)
+
+
+def ensure_search_index(connection: Connection) -> None:
+    """Create the asset search index if it is missing; safe to call on every start."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": SQLITE_FTS_TABLE},
+        ).first()
+        if exists is None:
+            connection.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE {SQLITE_FTS_TABLE} USING fts5("
+                    f"{', '.join(SEARCH_COLUMNS)}, content='assets', content_rowid='id', "
+                    "tokenize='trigram')"
+                )
+            )
+            # Index rows that were written before the search table existed.
+            connection.execute(
+                text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+            )
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Drop the SQLite search table; triggers and Postgres indexes go with ``assets``."""
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}"))
+
+
+def fts_phrase(term: str) -> str:
+    """Quote ``term`` as a single FTS5 phrase so user input is never parsed as syntax."""
+    return '"' + term.replace('"', '""') + '"'
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import Connection, delete, event, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+
+# The /stats aggregates live in two summary tables. Write helpers in ``crud`` describe
+# what they changed as a StatsDelta and apply it in their own transaction, so reads cost
+# O(groups) and never drift from the rows they summarize.
+
+WorkOrderKey = tuple[int, schemas.WorkOrderStatus, schemas.WorkOrderPriority]
+CapacityKey = tuple[schemas.AssetStatus, str]
+
+
+@dataclass
+class StatsDelta:
+    work_orders: Counter[WorkOrderKey] = field(default_factory=Counter)
+    asset_counts: Counter[CapacityKey] = field(default_factory=Counter)
+    capacity_mw: defaultdict[CapacityKey, float] = field(
+        default_factory=lambda: defaultdict(float)
+    )
+
+    def asset(self, asset: Any, sign: int = 1) -> StatsDelta:
+        """Count ``asset`` (a model, row or schema) in, or out with ``sign=-1``."""
+        key = (schemas.AssetStatus(asset.status), asset.category)
+        self.asset_counts[key] += sign
+        self.capacity_mw[key] += sign * asset.capacity_mw
+        return self
+
+    def work_order(self, work_order: Any, sign: int = 1) -> StatsDelta:
+        key = (
+            work_order.asset_id,
+            schemas.WorkOrderStatus(work_order.status),
+            schemas.WorkOrderPriority(work_order.priority),
+        )
+        self.work_orders[key] += sign
+        return self
+
+
+def apply(db: Session, delta: StatsDelta) -> None:
+    """Add ``delta`` to the summary tables with one upsert per table."""
+    dialect = db.get_bind().dialect.name
+    insert_ = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    work_orders = [
+        {"asset_id": asset_id, "status": wo_status, "priority": priority, "count": count}
+        for (asset_id, wo_status, priority), count in delta.work_orders.items()
+        if count
+    ]
+    if work_orders:
+        table = models.WorkOrderStat.__table__
+        stmt = insert_(table)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["asset_id", "status", "priority"],
+                set_={"count": table.c["count"] + stmt.excluded["count"]},
+            ),
+            work_orders,
+        )
+    capacity = [
+        {
+            "status": key[0],
+            "category": key[1],
+            "asset_count": delta.asset_counts[key],
+            "capacity_mw": delta.capacity_mw[key],
+        }
+        for key in delta.asset_counts.keys() | delta.capacity_mw.keys()
+        if delta.asset_counts[key] or delta.capacity_mw[key]
+    ]
+    if capacity:
+        table = models.AssetCapacityStat.__table__
+        stmt = insert_(table)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["status", "category"],
+                set_={
+                    "asset_count": table.c.asset_count + stmt.excluded.asset_count,
+                    "capacity_mw": table.c.capacity_mw + stmt.excluded.capacity_mw,
+                },
+            ),
+            capacity,
+        )
+
+
+def forget_asset(db: Session, asset_id: int) -> None:
+    """Drop the work order counts of a deleted asset (its work orders cascade)."""
+    db.execute(delete(models.WorkOrderStat).where(models.WorkOrderStat.asset_id == asset_id))
+
+
+def rebuild(db: Session | Connection) -> None:
+    """Recompute both summary tables from scratch, e.g. for a pre-existing database."""
+    wo = models.WorkOrder
+    asset = models.Asset
+    db.execute(delete(models.WorkOrderStat))
+    db.execute(
+        insert(models.WorkOrderStat).from_select(
+            ["asset_id", "status", "priority", "count"],
+            select(wo.asset_id, wo.status, wo.priority, func.count()).group_by(
+                wo.asset_id, wo.status, wo.priority
+            ),
+        )
+    )
+    db.execute(delete(models.AssetCapacityStat))
+    db.execute(
+        insert(models.AssetCapacityStat).from_select(
+            ["status", "category", "asset_count", "capacity_mw"],
+            select(
+                asset.status, asset.category, func.count(), func.sum(asset.capacity_mw)
+            ).group_by(asset.status, asset.category),
+        )
+    )
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _populate_new_summary_tables(target, connection: Connection, tables=(), **kw) -> None:
+    # create_all only creates missing tables; when the summary tables are new but the
+    # data is not, seed them once so the incremental updates start from the truth.
+    names = {table.name for table in tables}
+    if names & {models.WorkOrderStat.__tablename__, models.AssetCapacityStat.__tablename__}:
+        rebuild(connection)
+
+
+def summary(db: Session) -> dict[str, object]:
+    """Overall work order counts (status -> priority -> count) and capacity totals."""
+    stat = models.WorkOrderStat
+    work_orders: dict[str, dict[str, int]] = {}
+    for wo_status, priority, count in db.execute(
+        select(stat.status, stat.priority, func.sum(stat.count))
+        .group_by(stat.status, stat.priority)
+        .having(func.sum(stat.count) > 0)
+    ):
+        work_orders.setdefault(wo_status.value, {})[priority.value] = count
+
+    capacity: dict[str, dict[str, dict[str, float]]] = {}
+    for row in db.execute(
+        select(models.AssetCapacityStat).where(models.AssetCapacityStat.asset_count > 0)
+    ).scalars():
+        capacity.setdefault(row.status.value, {})[row.category] = {
+            "assets": row.asset_count,
+            # Sums are maintained by repeated addition; trim float noise.
+            "capacity_mw": round(row.capacity_mw, 6),
+        }
+    return {"work_orders": work_orders, "capacity": capacity}
+
+
+def work_orders_by_asset(
+    db: Session,
+    *,
+    status_filter: Optional[schemas.WorkOrderStatus] = None,
+    priority_filter: Optional[schemas.WorkOrderPriority] = None,
+    asset_id: Optional[int] = None,
+) -> list[dict[str, object]]:
+    stat = models.WorkOrderStat
+    stmt = select(stat.asset_id, stat.status, stat.priority, stat.count).where(stat.count > 0)
+    if status_filter:
+        stmt = stmt.where(stat.status == status_filter)
+    if priority_filter:
+        stmt = stmt.where(stat.priority == priority_filter)
+    if asset_id:
+        stmt = stmt.where(stat.asset_id == asset_id)
+    per_asset: dict[int, dict[str, dict[str, int]]] = {}
+    for row in db.execute(stmt.order_by(stat.asset_id)):
+        per_asset.setdefault(row.asset_id, {}).setdefault(row.status.value, {})[
+            row.priority.value
+        ] = row.count
+    return [
+        {"asset_id": asset_id, "work_orders": counts} for asset_id, counts in per_asset.items()
+    ]
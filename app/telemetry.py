@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Connection, Row, case, delete, event, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import anomaly, changes, models, schemas
+from .changes import Change
+from .downsample import lttb
+
+# Capacity target for one worker on SQLite (WAL, synchronous=NORMAL), measured by
+# benchmarks/telemetry_ingest.py. /telemetry/metrics reports the observed rate against it.
+TARGET_POINTS_PER_SECOND = 50_000
+
+IDEMPOTENCY_TTL = timedelta(
+    seconds=int(os.getenv("TELEMETRY_IDEMPOTENCY_TTL_SECONDS", "86400"))
+)
+# Expired keys are swept at most this often, piggybacking on ingest requests.
+EVICTION_INTERVAL_SECONDS = 60.0
+
+
+# Rollup bucket widths in seconds, finest first.
+ROLLUP_RESOLUTIONS = {
+    schemas.TelemetryResolution.minute: 60,
+    schemas.TelemetryResolution.quarter_hour: 900,
+    schemas.TelemetryResolution.hour: 3600,
+}
+# Zoomed-in queries read raw points and LTTB them down to the budget, as long as the
+# range holds at most this many points; wider ranges are served from rollups.
+RAW_QUERY_LIMIT = 200_000
+
+
+def epoch_ms(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=UTC)
+    return int(ts.timestamp() * 1000)
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, UTC)
+
+
+class IngestMetrics:
+    """Ingest counters; the rate is points per second of time spent inside ``ingest``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.duplicate_batches = 0
+        self.points_received = 0
+        self.points_inserted = 0
+        self.ingest_seconds = 0.0
+        self.last_batch_points_per_second = 0.0
+
+    def record_batch(self, received: int, inserted: int, seconds: float) -> None:
+        with self._lock:
+            self.batches += 1
+            self.points_received += received
+            self.points_inserted += inserted
+            self.ingest_seconds += seconds
+            self.last_batch_points_per_second = received / seconds if seconds else 0.0
+
+    def record_duplicate_batch(self) -> None:
+        with self._lock:
+            self.duplicate_batches += 1
+
+    def snapshot(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "duplicate_batches": self.duplicate_batches,
+                "points_received": self.points_received,
+                "points_inserted": self.points_inserted,
+                "duplicate_points": self.points_received - self.points_inserted,
+                "ingest_seconds_total": round(self.ingest_seconds, 6),
+                "points_per_second": (
+                    round(self.points_received / self.ingest_seconds, 1)
+                    if self.ingest_seconds
+                    else 0.0
+                ),
+                "last_batch_points_per_second": round(self.last_batch_points_per_second, 1),
+                "target_points_per_second": TARGET_POINTS_PER_SECOND,
+            }
+
+
+ingest_metrics = IngestMetrics()
+_next_eviction = 0.0
+_eviction_lock = threading.Lock()
+
+
+def _claim_idempotency_key(db: Session, key: str, point_count: int) -> None:
+    batches = models.TelemetryBatch
+    cutoff = datetime.now(UTC) - IDEMPOTENCY_TTL
+    # An expired key may be reused even if the periodic sweep has not removed it yet.
+    db.execute(
+        delete(batches).where(batches.idempotency_key == key, batches.created_at < cutoff)
+    )
+    db.add(batches(idempotency_key=key, point_count=point_count))
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        ingest_metrics.record_duplicate_batch()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A batch with this Idempotency-Key was already ingested",
+        ) from exc
+
+
+def evict_expired_keys(db: Session, *, force: bool = False) -> int:
+    """Delete idempotency keys older than the TTL; rate-limited unless ``force``."""
+    global _next_eviction
+    with _eviction_lock:
+        now = time.monotonic()
+        if not force and now < _next_eviction:
+            return 0
+        _next_eviction = now + EVICTION_INTERVAL_SECONDS
+    batches = models.TelemetryBatch
+    result = db.execute(
+        delete(batches).where(batches.created_at < datetime.now(UTC) - IDEMPOTENCY_TTL)
+    )
+    return result.rowcount
+
+
+PointRow = tuple[int, str, int, float]  # asset_id, tag, ts (epoch ms), value
+
+# Rows per INSERT statement; at four parameters a row this stays under SQLite's
+# 32766-variable limit and PostgreSQL's 65535.
+INSERT_CHUNK_ROWS = 4000
+
+
+@lru_cache(maxsize=16)
+def _insert_sql(row_count: int, placeholder: str) -> str:
+    row = "(" + ", ".join([placeholder] * 4) + ")"
+    return (
+        f"INSERT INTO {models.TelemetryPoint.__tablename__} (asset_id, tag, ts, value) "
+        f"VALUES {', '.join([row] * row_count)} "
+        "ON CONFLICT (asset_id, tag, ts) DO NOTHING RETURNING asset_id, tag, ts, value"
+    )
+
+
+def insert_points(db: Session, rows: list[PointRow]) -> list[Row]:
+    """
+    Insert ``rows`` with multi-row INSERTs and return the ones actually stored.
+
+    The statement text is cached per chunk size and parameters are passed as one flat
+    tuple: building Core parameter sets costs more than the insert itself at this size.
+    """
+    connection = db.connection()
+    placeholder = "?" if connection.dialect.paramstyle == "qmark" else "%s"
+    inserted: list[Row] = []
+    for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+        chunk = rows[start : start + INSERT_CHUNK_ROWS]
+        result = connection.exec_driver_sql(
+            _insert_sql(len(chunk), placeholder), tuple(chain.from_iterable(chunk))
+        )
+        inserted.extend(result.all())
+    return inserted
+
+
+RollupKey = tuple[int, str, int, int]  # asset_id, tag, resolution_s, bucket_start
+
+
+def aggregate_rollups(points: list[Row] | list[PointRow]) -> list[dict[str, object]]:
+    """Fold points into one partial aggregate per (asset, tag, resolution, bucket)."""
+    # Points are folded into the finest buckets only; coarser buckets are then built from
+    # those partials, which are far fewer than the points.
+    finest, *coarser = ROLLUP_RESOLUTIONS.values()
+    width = finest * 1000
+    partials: dict[RollupKey, list] = {}
+    for asset_id, tag, ts, value in points:
+        key = (asset_id, tag, finest, ts - ts % width)
+        bucket = partials.get(key)
+        if bucket is None:
+            partials[key] = [1, value, value, value, ts, value]
+            continue
+        bucket[0] += 1
+        bucket[1] += value
+        if value < bucket[2]:
+            bucket[2] = value
+        elif value > bucket[3]:
+            bucket[3] = value
+        if ts >= bucket[4]:
+            bucket[4], bucket[5] = ts, value
+
+    for resolution_s in coarser:
+        width = resolution_s * 1000
+        for (asset_id, tag, source_s, bucket_start), part in list(partials.items()):
+            if source_s != finest:
+                continue
+            key = (asset_id, tag, resolution_s, bucket_start - bucket_start % width)
+            bucket = partials.get(key)
+            if bucket is None:
+                partials[key] = list(part)
+                continue
+            bucket[0] += part[0]
+            bucket[1] += part[1]
+            bucket[2] = min(bucket[2], part[2])
+            bucket[3] = max(bucket[3], part[3])
+            if part[4] >= bucket[4]:
+                bucket[4], bucket[5] = part[4], part[5]
+
+    return [
+        {
+            "asset_id": asset_id,
+            "tag": tag,
+            "resolution_s": resolution_s,
+            "bucket_start": bucket_start,
+            "value_count": count,
+            "value_sum": total,
+            "value_min": low,
+            "value_max": high,
+            "last_ts": last_ts,
+            "last_value": last_value,
+        }
+        for (asset_id, tag, resolution_s, bucket_start), (
+            count,
+            total,
+            low,
+            high,
+            last_ts,
+            last_value,
+        ) in partials.items()
+    ]
+
+
+def merge_rollups(db: Session | Connection, rollups: list[dict[str, object]]) -> None:
+    """Upsert partial aggregates, combining them with what each bucket already holds."""
+    if not rollups:
+        return
+    dialect = db.dialect if isinstance(db, Connection) else db.get_bind().dialect
+    is_postgres = dialect.name == "postgresql"
+    insert_ = postgresql.insert if is_postgres else sqlite.insert
+    least, greatest = (func.least, func.greatest) if is_postgres else (func.min, func.max)
+    table = models.TelemetryRollup.__table__
+    stmt = insert_(table)
+    new = stmt.excluded
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["asset_id", "tag", "resolution_s", "bucket_start"],
+            set_={
+                "value_count": table.c.value_count + new.value_count,
+                "value_sum": table.c.value_sum + new.value_sum,
+                "value_min": least(table.c.value_min, new.value_min),
+                "value_max": greatest(table.c.value_max, new.value_max),
+                "last_value": case(
+                    (new.last_ts >= table.c.last_ts, new.last_value), else_=table.c.last_value
+                ),
+                "last_ts": greatest(table.c.last_ts, new.last_ts),
+            },
+        ),
+        rollups,
+    )
+
+
+def rebuild_rollups(connection: Connection, chunk_size: int = 50_000) -> None:
+    """Recompute every rollup from the raw points, streaming them in chunks."""
+    connection.execute(delete(models.TelemetryRollup))
+    points = models.TelemetryPoint
+    result = connection.execution_options(yield_per=chunk_size).execute(
+        select(points.asset_id, points.tag, points.ts, points.value)
+    )
+    for chunk in result.partitions():
+        merge_rollups(connection, aggregate_rollups(chunk))
+
+
+@event.listens_for(models.Base.metadata, "after_create")
+def _populate_new_rollup_table(target, connection: Connection, tables=(), **kw) -> None:
+    # Same idea as the stats tables: seed rollups once when added to existing data.
+    if models.TelemetryRollup.__tablename__ in {table.name for table in tables}:
+        rebuild_rollups(connection)
+
+
+def ingest(
+    db: Session, batch: schemas.TelemetryBatchIn, idempotency_key: Optional[str] = None
+) -> dict[str, int]:
+    """
+    Store a batch of points in one transaction.
+
+    Points already stored under the same (asset_id, tag, ts) are skipped, so replaying
+    a batch without a key is harmless too.
+    """
+    started = time.perf_counter()
+    rows: list[PointRow] = [
+        (point["asset_id"], point["tag"], epoch_ms(point["ts"]), point["value"])
+        for point in batch.points
+    ]
+    asset_ids = {row[0] for row in rows}
+    capacities = dict(
+        db.execute(
+            select(models.Asset.id, models.Asset.capacity_mw).where(models.Asset.id.in_(asset_ids))
+        ).all()
+    )
+    if missing := sorted(asset_ids - capacities.keys()):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Related asset not found: {', '.join(map(str, missing))}",
+        )
+    if idempotency_key:
+        _claim_idempotency_key(db, idempotency_key, len(rows))
+    evict_expired_keys(db)
+
+    inserted = insert_points(db, rows)
+    # Only points that were actually stored count, so replays never double a bucket.
+    merge_rollups(db, aggregate_rollups(inserted))
+    stored_assets = {row[0] for row in inserted}
+    changes.record(
+        db, *(Change("telemetry", "created", asset_id, asset_id) for asset_id in stored_assets)
+    )
+    db.commit()
+    ingest_metrics.record_batch(len(rows), len(inserted), time.perf_counter() - started)
+    # Anomaly checks run on the detector's workers, after the points are durable.
+    anomaly.detector.submit(db.get_bind(), inserted, capacities)
+    return {
+        "received": len(rows),
+        "inserted": len(inserted),
+        "duplicates": len(rows) - len(inserted),
+    }
+
+
+def _raw_points(
+    db: Session, asset_id: int, tag: str, start: int, end: int, limit: int
+) -> list[Row]:
+    points = models.TelemetryPoint
+    return db.execute(
+        select(points.ts, points.value)
+        .where(
+            points.asset_id == asset_id,
+            points.tag == tag,
+            points.ts >= start,
+            points.ts < end,
+        )
+        .order_by(points.ts)
+        .limit(limit)
+    ).all()
+
+
+def _rollup_points(
+    db: Session, asset_id: int, tag: str, resolution_s: int, start: int, end: int
+) -> list[Row]:
+    rollups = models.TelemetryRollup
+    width = resolution_s * 1000
+    return db.execute(
+        select(
+            rollups.bucket_start,
+            rollups.value_count,
+            rollups.value_sum,
+            rollups.value_min,
+            rollups.value_max,
+            rollups.last_value,
+        )
+        .where(
+            rollups.asset_id == asset_id,
+            rollups.tag == tag,
+            rollups.resolution_s == resolution_s,
+            rollups.bucket_start >= start - start % width,
+            rollups.bucket_start < end,
+        )
+        .order_by(rollups.bucket_start)
+    ).all()
+
+
+def _pick_resolution(start: int, end: int, max_points: int) -> schemas.TelemetryResolution:
+    """The finest rollup whose bucket count over the range fits ``max_points``."""
+    for resolution, resolution_s in ROLLUP_RESOLUTIONS.items():
+        if (end - start) / (resolution_s * 1000) <= max_points:
+            return resolution
+    return schemas.TelemetryResolution.hour
+
+
+def query_series(
+    db: Session,
+    asset_id: int,
+    tag: str,
+    start: datetime,
+    end: datetime,
+    *,
+    max_points: int,
+    resolution: schemas.TelemetryResolution = schemas.TelemetryResolution.auto,
+) -> dict[str, object]:
+    """
+    Return at most ``max_points`` points for one series.
+
+    ``auto`` serves raw points when the range would fit in 1-minute buckets and holds
+    no more than RAW_QUERY_LIMIT samples (LTTB-downsampled to the budget), and otherwise
+    the finest rollup whose buckets fit the budget. Rollups that still exceed it, e.g.
+    years at 1 h, are LTTB-downsampled on their means.
+    """
+    start_ms, end_ms = epoch_ms(start), epoch_ms(end)
+    chosen = resolution
+    raw: Optional[list[Row]] = None
+    if resolution == schemas.TelemetryResolution.auto:
+        chosen = _pick_resolution(start_ms, end_ms, max_points)
+        if chosen == schemas.TelemetryResolution.minute:
+            raw = _raw_points(db, asset_id, tag, start_ms, end_ms, RAW_QUERY_LIMIT + 1)
+            if len(raw) <= RAW_QUERY_LIMIT:
+                chosen = schemas.TelemetryResolution.raw
+    if chosen == schemas.TelemetryResolution.raw:
+        if raw is None:
+            raw = _raw_points(db, asset_id, tag, start_ms, end_ms, RAW_QUERY_LIMIT)
+        points = [{"ts": from_epoch_ms(row.ts), "value": row.value} for row in raw]
+        xs, ys = [row.ts for row in raw], [row.value for row in raw]
+    else:
+        rows = _rollup_points(
+            db, asset_id, tag, ROLLUP_RESOLUTIONS[chosen], start_ms, end_ms
+        )
+        points = [
+            {
+                "ts": from_epoch_ms(row.bucket_start),
+                "value": row.value_sum / row.value_count,
+                "min": row.value_min,
+                "max": row.value_max,
+                "last": row.last_value,
+                "count": row.value_count,
+            }
+            for row in rows
+        ]
+        xs, ys = [row.bucket_start for row in rows], [point["value"] for point in points]
+
+    downsampled = len(points) > max_points
+    if downsampled:
+        points = [points[index] for index in lttb(xs, ys, max_points)]
+    return {
+        "asset_id": asset_id,
+        "tag": tag,
+        "resolution": chosen,
+        "downsampled": downsampled,
+        "points": points,
+    }
@@ -0,0 +1,349 @@
+"""
+Drive a concurrent request mix against a seeded fleet and report latency as JSON.
+
+    python -m benchmarks.load --assets 10000 --work-orders 1000000 --duration 60 \\
+        --concurrency 16 --output results/$(git rev-parse --short HEAD).json
+
+The app is built with ``create_app()`` against ``--database-url`` (default: a fresh
+SQLite file) and seeded with a synthetic fleet: asset statuses and work order
+statuses and priorities follow a fixed skew, and a few assets carry most of the work
+orders. The same ``--seed`` always produces the same data and the same request sequence per
+worker. Seeding is skipped when the database already holds assets, so a seeded Postgres
+database can be reused across runs (seeding also rebuilds the stats tables).
+
+Requests go through the ASGI stack in process, or to a running server with
+``--base-url``. Each worker picks operations from ``--mix``; after ``--warmup`` seconds
+every response is timed until ``--duration`` is up. The report holds per-operation
+and overall throughput, p50/p95/p99 latency and error counts. ``--baseline`` adds the
+p50/p95/p99 ratios against an earlier report.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import UTC, date, datetime, timedelta
+from typing import Optional
+
+ASSET_STATUSES = {"active": 80, "maintenance": 10, "inactive": 7, "decommissioned": 3}
+WORK_ORDER_STATUSES = {"completed": 60, "open": 18, "in_progress": 12, "cancelled": 10}
+PRIORITIES = {"low": 35, "medium": 40, "high": 20, "critical": 5}
+CATEGORIES = ("gas_turbine", "steam_turbine", "wind_turbine", "solar_array", "transformer")
+SITES = ("North Ridge", "Harbor", "Eastfield", "Lakeside", "Summit", "Old Mill")
+SEARCH_TERMS = ("turbine", "harbor", "unit 12", "solar", "ridge", "transformer 3")
+DEFAULT_MIX = "list_assets=15,list_work_orders=20,search=10,get=30,create=10,patch=15"
+INSERT_CHUNK = 10_000
+
+
+def _weighted(rng: random.Random, weights: dict[str, int], k: int) -> list[str]:
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def seed(engine, assets: int, work_orders: int, rng: random.Random) -> tuple[int, int]:
+    """Insert the synthetic fleet unless assets exist; return (asset, work order) counts."""
+    from sqlalchemy import func, insert, select
+
+    from app import models, stats
+
+    with engine.begin() as connection:
+        existing = connection.scalar(select(func.count()).select_from(models.Asset))
+        if existing:
+            return existing, connection.scalar(
+                select(func.count()).select_from(models.WorkOrder)
+            )
+
+        now = datetime.now(UTC).replace(tzinfo=None)
+        statuses = _weighted(rng, ASSET_STATUSES, assets)
+        connection.execute(
+            insert(models.Asset),
+            [
+                {
+                    "name": f"{SITES[index % len(SITES)]} {CATEGORIES[index % 5]} unit {index}",
+                    "category": CATEGORIES[index % len(CATEGORIES)],
+                    "status": statuses[index],
+                    "location": f"{SITES[index % len(SITES)]} block {index % 40}",
+                    "capacity_mw": round(rng.uniform(5, 900), 1),
+                    "installed_at": date(1995, 1, 1) + timedelta(days=rng.randrange(10_000)),
+                    "created_at": now - timedelta(minutes=assets - index),
+                    "updated_at": now,
+                }
+                for index in range(assets)
+            ],
+        )
+        asset_ids = connection.scalars(select(models.Asset.id).order_by(models.Asset.id)).all()
+
+        # Zipf-like: a handful of assets carry most of the maintenance history.
+        asset_weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(asset_ids))]
+        for start in range(0, work_orders, INSERT_CHUNK):
+            size = min(INSERT_CHUNK, work_orders - start)
+            owners = rng.choices(asset_ids, weights=asset_weights, k=size)
+            wo_statuses = _weighted(rng, WORK_ORDER_STATUSES, size)
+            priorities = _weighted(rng, PRIORITIES, size)
+            rows = []
+            for offset in range(size):
+                index = start + offset
+                scheduled = date(2020, 1, 1) + timedelta(days=rng.randrange(2_000))
+                rows.append(
+                    {
+                        "asset_id": owners[offset],
+                        "title": f"WO-{index:07d} inspection",
+                        "description": "Inspect, clean and report findings.",
+                        "status": wo_statuses[offset],
+                        "priority": priorities[offset],
+                        "scheduled_start": scheduled,
+                        "scheduled_end": scheduled + timedelta(days=rng.randrange(4)),
+                        "created_at": now - timedelta(seconds=work_orders - index),
+                        "updated_at": now,
+                    }
+                )
+            connection.execute(insert(models.WorkOrder), rows)
+        stats.rebuild(connection)
+    return assets, work_orders
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _summary(latencies: list[float], errors: int, seconds: float) -> dict[str, object]:
+    ordered = sorted(latencies)
+    summary: dict[str, object] = {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / seconds, 1),
+    }
+    if ordered:
+        summary.update(
+            mean_ms=round(sum(ordered) / len(ordered) * 1000, 3),
+            p50_ms=round(_percentile(ordered, 0.50) * 1000, 3),
+            p95_ms=round(_percentile(ordered, 0.95) * 1000, 3),
+            p99_ms=round(_percentile(ordered, 0.99) * 1000, 3),
+            max_ms=round(ordered[-1] * 1000, 3),
+        )
+    return summary
+
+
+class Workload:
+    """Builds one request per call; every worker owns its own instance and RNG."""
+
+    def __init__(self, worker: int, seed: int, assets: int, work_orders: int) -> None:
+        self.rng = random.Random(seed * 1000 + worker)
+        self.worker = worker
+        self.assets = assets
+        self.work_orders = work_orders
+        self.created = 0
+
+    def list_assets(self) -> tuple[str, str, Optional[dict]]:
+        params = {"limit": 50}
+        if self.rng.random() < 0.5:
+            params["status"] = _weighted(self.rng, ASSET_STATUSES, 1)[0]
+        return "GET", "/assets?" + "&".join(f"{k}={v}" for k, v in params.items()), None
+
+    def list_work_orders(self) -> tuple[str, str, Optional[dict]]:
+        choice = self.rng.random()
+        if choice < 0.4:
+            query = f"asset_id={self.rng.randint(1, self.assets)}"
+        elif choice < 0.8:
+            query = f"status={_weighted(self.rng, WORK_ORDER_STATUSES, 1)[0]}"
+        else:
+            query = f"priority={_weighted(self.rng, PRIORITIES, 1)[0]}"
+        return "GET", f"/workorders?limit=50&{query}", None
+
+    def search(self) -> tuple[str, str, Optional[dict]]:
+        term = self.rng.choice(SEARCH_TERMS).replace(" ", "+")
+        return "GET", f"/assets?search={term}&limit=20", None
+
+    def get(self) -> tuple[str, str, Optional[dict]]:
+        if self.rng.random() < 0.5:
+            return "GET", f"/assets/{self.rng.randint(1, self.assets)}", None
+        return "GET", f"/workorders/{self.rng.randint(1, self.work_orders)}", None
+
+    def create(self) -> tuple[str, str, Optional[dict]]:
+        self.created += 1
+        scheduled = date(2026, 1, 1) + timedelta(days=self.rng.randrange(365))
+        return (
+            "POST",
+            "/workorders",
+            {
+                "asset_id": self.rng.randint(1, self.assets),
+                "title": f"Load w{self.worker} #{self.created} {time.time_ns()}",
+                "priority": _weighted(self.rng, PRIORITIES, 1)[0],
+                "scheduled_start": scheduled.isoformat(),
+            },
+        )
+
+    def patch(self) -> tuple[str, str, Optional[dict]]:
+        body = {"priority": _weighted(self.rng, PRIORITIES, 1)[0]}
+        return "PATCH", f"/workorders/{self.rng.randint(1, self.work_orders)}", body
+
+
+OPERATIONS = ("list_assets", "list_work_orders", "search", "get", "create", "patch")
+
+
+async def run(client, args, assets: int, work_orders: int) -> dict[str, object]:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    statuses: dict[str, int] = defaultdict(int)
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + args.warmup
+    stop_at = measure_from + args.duration
+    names, weights = list(args.mix), list(args.mix.values())
+
+    async def worker(index: int) -> None:
+        workload = Workload(index, args.seed, assets, work_orders)
+        while loop.time() < stop_at:
+            operation = workload.rng.choices(names, weights=weights)[0]
+            method, url, body = getattr(workload, operation)()
+            began = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            elapsed = time.perf_counter() - began
+            if loop.time() < measure_from:
+                continue
+            statuses[str(response.status_code)] += 1
+            # 404 (sparse ids after deletes) and 409 (write conflicts) are expected
+            # outcomes of a random mix; anything else is an error.
+            if response.status_code >= 500 or response.status_code in (400, 422):
+                errors[operation] += 1
+            latencies[operation].append(elapsed)
+
+    await asyncio.gather(*(worker(index) for index in range(args.concurrency)))
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "operations": {
+            name: _summary(latencies[name], errors[name], args.duration) for name in names
+        },
+        "total": _summary(everything, sum(errors.values()), args.duration),
+        "status_codes": dict(sorted(statuses.items())),
+    }
+
+
+def _compare(report: dict, baseline: dict) -> dict[str, dict[str, float]]:
+    """Ratios of this run's percentiles to the baseline's (above 1.0 is slower)."""
+    comparison = {}
+    sections = {**report["operations"], "total": report["total"]}
+    previous = {**baseline.get("operations", {}), "total": baseline.get("total", {})}
+    for name, summary in sections.items():
+        before = previous.get(name, {})
+        ratios = {
+            key: round(summary[key] / before[key], 3)
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+            if summary.get(key) and before.get(key)
+        }
+        if before.get("throughput_rps"):
+            ratios["throughput"] = round(summary["throughput_rps"] / before["throughput_rps"], 3)
+        if ratios:
+            comparison[name] = ratios
+    return comparison
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="default: a new SQLite file in a temp dir")
+    parser.add_argument("--base-url", help="benchmark a running server instead")
+    parser.add_argument("--assets", type=int, default=10_000)
+    parser.add_argument("--work-orders", type=int, default=1_000_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="load-bench-"), "bench.db"
+    )
+    os.environ["DATABASE_URL"] = database_url
+    # Imported late so the app binds to the benchmark database.
+    import httpx
+    from sqlalchemy.engine import make_url
+
+    from app import schema_version
+    from app.database import engine
+    from app.main import create_app
+
+    app = create_app()
+    # ASGITransport does not run the lifespan, which sets the schema up in a server.
+    schema_version.ensure_schema(engine)
+    began = time.perf_counter()
+    assets, work_orders = seed(engine, args.assets, args.work_orders, random.Random(args.seed))
+    seed_seconds = time.perf_counter() - began
+    print(f"fleet: {assets} assets, {work_orders} work orders", file=sys.stderr)
+
+    async def drive() -> dict[str, object]:
+        if args.base_url:
+            transport, base_url = None, args.base_url
+        else:
+            transport, base_url = httpx.ASGITransport(app=app), "http://bench"
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, limits=limits, timeout=60
+        ) as client:
+            return await run(client, args, assets, work_orders)
+
+    results = asyncio.run(drive())
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "started_at": datetime.now(UTC).isoformat(),
+            "database": make_url(database_url).render_as_string(hide_password=True),
+            "target": args.base_url or "in-process ASGI",
+            "python": platform.python_version(),
+            "assets": assets,
+            "work_orders": work_orders,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": args.mix,
+            "seed": args.seed,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        **results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            report["comparison"] = _compare(report, json.load(baseline))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Compare list serialization before and after the row-based fast path.
+
+    python -m benchmarks.serialization --assets 100 --work-orders 20 --rounds 50
+
+For full pages of GET /assets (summary and full views) and GET /workorders, times the
+previous pipeline (load ORM objects, validate them through the response model, dump in
+JSON mode, render with the stdlib encoder) against the current one (select column
+rows, build dicts, encode with ``app.responses``). Both run against the same SQLite
+file with the same page, and their bodies are checked to be byte-identical.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import UTC, date, datetime, timedelta
+from typing import Callable, List
+
+
+def _best_of(rounds: int, fn: Callable[[], bytes]) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(rounds):
+        began = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - began)
+    return best, body
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=100, help="page size (max 100)")
+    parser.add_argument("--work-orders", type=int, default=20, help="per asset")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="serialization-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # Imported late so the app binds to the benchmark database.
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from sqlalchemy import insert, select
+    from sqlalchemy.orm import joinedload
+
+    from app import crud, models, schemas
+    from app.database import SessionLocal, engine
+    from app.responses import dumps
+
+    models.Base.metadata.create_all(bind=engine)
+    now = datetime.now(UTC)
+    with SessionLocal() as db:
+        asset_ids = db.scalars(
+            insert(models.Asset).returning(models.Asset.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": f"Bench Unit {index}",
+                    "category": "gas_turbine",
+                    "location": "Bench",
+                    "capacity_mw": 100.0 + index / 7,
+                    "installed_at": date(2020, 1, 1),
+                    "created_at": now + timedelta(seconds=index),
+                    "updated_at": now,
+                }
+                for index in range(args.assets)
+            ],
+        ).all()
+        db.execute(
+            insert(models.WorkOrder),
+            [
+                {
+                    "asset_id": asset_id,
+                    "title": f"Work order {index}",
+                    "description": "Inspect, clean and report.",
+                    "status": list(schemas.WorkOrderStatus)[index % 4],
+                    "priority": list(schemas.WorkOrderPriority)[index % 4],
+                    "scheduled_start": date(2024, 5, 1),
+                    "created_at": now + timedelta(milliseconds=index),
+                    "updated_at": now,
+                }
+                for asset_id in asset_ids
+                for index in range(args.work_orders)
+            ],
+        )
+        db.commit()
+
+    limit = min(args.assets, 100)
+    assets_adapter = TypeAdapter(List[schemas.AssetListItem])
+    work_orders_adapter = TypeAdapter(List[schemas.WorkOrderRead])
+
+    def previous(adapter: TypeAdapter, content: object, exclude_unset: bool) -> bytes:
+        validated = adapter.validate_python(content, from_attributes=True)
+        return JSONResponse(
+            adapter.dump_python(validated, mode="json", exclude_unset=exclude_unset)
+        ).body
+
+    def old_summary() -> bytes:
+        with SessionLocal() as db:
+            assets = db.scalars(
+                select(models.Asset)
+                .order_by(models.Asset.created_at.desc(), models.Asset.id.desc())
+                .limit(limit)
+            ).all()
+            counts, recent = crud.summarize_work_orders(db, [asset.id for asset in assets])
+            content = [
+                {
+                    **{field: getattr(asset, field) for field in crud.ASSET_ROW_FIELDS},
+                    "work_order_counts": counts[asset.id],
+                    "open_work_orders": recent[asset.id],
+                }
+                for asset in assets
+            ]
+            return previous(assets_adapter, content, True)
+
+    def new_summary() -> bytes:
+        with SessionLocal() as db:
+            assets = crud.list_assets(db, limit=limit)
+            fields = crud.ASSET_NESTED_FIELDS[schemas.AssetListView.summary]
+            nested = crud.list_asset_nested(db, fields, [asset.id for asset in assets])
+            return dumps(crud.build_asset_rows(assets, crud.ASSET_ROW_FIELDS, nested))
+
+    def old_full() -> bytes:
+        with SessionLocal() as db:
+            assets = (
+                db.scalars(
+                    select(models.Asset)
+                    .options(joinedload(models.Asset.work_orders))
+                    .order_by(models.Asset.created_at.desc(), models.Asset.id.desc())
+                    .limit(limit)
+                )
+                .unique()
+                .all()
+            )
+            for asset in assets:
+                asset.work_orders.sort(key=lambda work_order: work_order.id)
+            return previous(assets_adapter, assets, True)
+
+    def new_full() -> bytes:
+        with SessionLocal() as db:
+            assets = crud.list_assets(db, limit=limit)
+            nested = crud.list_asset_nested(db, ("work_orders",), [asset.id for asset in assets])
+            return dumps(crud.build_asset_rows(assets, crud.ASSET_ROW_FIELDS, nested))
+
+    def old_work_orders() -> bytes:
+        with SessionLocal() as db:
+            work_orders = db.scalars(
+                select(models.WorkOrder)
+                .options(joinedload(models.WorkOrder.asset))
+                .order_by(models.WorkOrder.created_at.desc(), models.WorkOrder.id.desc())
+                .limit(100)
+            ).all()
+            return previous(work_orders_adapter, work_orders, False)
+
+    def new_work_orders() -> bytes:
+        with SessionLocal() as db:
+            return dumps(crud.build_work_order_rows(crud.list_work_orders(db, limit=100)))
+
+    identical = True
+    for name, old, new in (
+        ("GET /assets", old_summary, new_summary),
+        ("GET /assets?view=full", old_full, new_full),
+        ("GET /workorders?limit=100", old_work_orders, new_work_orders),
+    ):
+        old_seconds, old_body = _best_of(args.rounds, old)
+        new_seconds, new_body = _best_of(args.rounds, new)
+        identical &= old_body == new_body
+        print(
+            f"{name:28} {old_seconds * 1000:7.2f} ms -> {new_seconds * 1000:6.2f} ms "
+            f"({old_seconds / new_seconds:4.1f}x, {len(new_body):,} bytes, "
+            f"{'identical' if old_body == new_body else 'DIFFERENT'})"
+        )
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
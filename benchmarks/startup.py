@@ -0,0 +1,88 @@
+"""
+Measure cold start: the time from a fresh interpreter to an app ready to serve.
+
+    python -m benchmarks.startup --runs 10 --target 2.0
+
+Each run is a new process, as when an autoscaler starts a container. It imports
+``app.main`` and runs the lifespan (engine, schema check), timing each step, and the
+parent times the whole process. The first run sets up a fresh SQLite file; later runs
+find its stored schema version and skip the setup. The same runs with
+SCHEMA_MODE=always show what re-running create_all on every start costs. The run fails
+when the median warm start takes longer than ``--target`` seconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = """
+import asyncio, json, time
+began = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def start():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({"import_s": imported - began, "lifespan_s": ready - imported}))
+"""
+
+
+def start_once(database_url: str, schema_mode: str) -> dict[str, float]:
+    env = {**os.environ, "DATABASE_URL": database_url, "SCHEMA_MODE": schema_mode}
+    began = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    timings = json.loads(output)
+    timings["process_s"] = time.perf_counter() - began
+    return timings
+
+
+def summarize(runs: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    return {
+        key: {
+            "median": round(statistics.median(run[key] for run in runs), 4),
+            "max": round(max(run[key] for run in runs), 4),
+        }
+        for key in ("import_s", "lifespan_s", "process_s")
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=float(os.getenv("STARTUP_TARGET_SECONDS", "2.0")),
+        help="maximum median seconds from process start to ready",
+    )
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    first = start_once(database_url, "auto")
+    warm = [start_once(database_url, "auto") for _ in range(args.runs)]
+    always = [start_once(database_url, "always") for _ in range(args.runs)]
+    report = {
+        "first_start": {key: round(value, 4) for key, value in first.items()},
+        "warm_start": summarize(warm),
+        "schema_mode_always": summarize(always),
+        "target_s": args.target,
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if report["warm_start"]["process_s"]["median"] <= args.target else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Measure POST /telemetry throughput on a single SQLite worker.
+
+    python -m benchmarks.telemetry_ingest --batches 20 --batch-size 10000
+
+Requests go through the full ASGI stack (JSON parsing, validation, insert, rollups,
+commit) against a fresh file database with the production pragmas. Bodies are encoded
+before the clock starts, so only server work is timed. The run fails when the sustained
+rate is below ``app.telemetry.TARGET_POINTS_PER_SECOND``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--assets", type=int, default=10)
+    parser.add_argument("--tags", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="telemetry-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # Imported late so the app binds to the benchmark database.
+    from fastapi.testclient import TestClient
+
+    from app import schema_version, telemetry
+    from app.database import engine
+    from app.main import create_app
+
+    # The client is not entered, so the lifespan does not run; set up the schema here.
+    schema_version.ensure_schema(engine)
+    client = TestClient(create_app())
+    asset_ids = [
+        client.post(
+            "/assets",
+            json={
+                "name": f"Bench Unit {index}",
+                "category": "gas_turbine",
+                "location": "Bench",
+                "capacity_mw": 100.0,
+                "installed_at": "2020-01-01",
+            },
+        ).json()["id"]
+        for index in range(args.assets)
+    ]
+
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    series = [(asset_id, f"tag_{tag}") for asset_id in asset_ids for tag in range(args.tags)]
+    samples_per_series = args.batch_size // len(series)
+    bodies = []
+    for batch in range(args.batches):
+        points = [
+            {
+                "asset_id": asset_id,
+                "tag": tag,
+                "ts": (start + timedelta(seconds=batch * samples_per_series + step)).isoformat(),
+                "value": float(step),
+            }
+            for asset_id, tag in series
+            for step in range(samples_per_series)
+        ]
+        bodies.append(json.dumps({"points": points}).encode())
+
+    elapsed = 0.0
+    for batch, body in enumerate(bodies):
+        headers = {"Content-Type": "application/json", "Idempotency-Key": f"bench-{batch}"}
+        began = time.perf_counter()
+        response = client.post("/telemetry", content=body, headers=headers)
+        elapsed += time.perf_counter() - began
+        response.raise_for_status()
+
+    total = args.batches * samples_per_series * len(series)
+    rate = total / elapsed
+    target = telemetry.TARGET_POINTS_PER_SECOND
+    print(f"{total} points in {elapsed:.2f}s: {rate:,.0f} points/s end to end (target {target:,})")
+    print(f"server-side: {telemetry.ingest_metrics.snapshot()['points_per_second']:,} points/s")
+    return 0 if rate >= target else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import os
+
+# Check telemetry for anomalies on the request thread: the in-memory database has a
+# single shared connection, and tests assert on the work orders right after ingest.
+os.environ.setdefault("ANOMALY_WORKERS", "0")
+# Fixtures override the session dependencies; the app's own engine, which the lifespan
+# builds for its schema check and /health/db reports on, stays in memory.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app import models
-from app.database import get_db
+from app import anomaly, cache, feed, kpi, metrics, models
+from app.database import get_async_db, get_db
 from app.main import create_app
 
 
@@ -18,9 +28,23 @@ def engine():
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    metrics.instrument_engine(engine)
     yield engine
 
 
+@pytest.fixture(autouse=True)
+def clear_asset_cache():
+    # Ids are reused once the tables are recreated, so no entry may outlive a test.
+    cache.asset_cache.clear()
+    kpi.memo.clear()
+    feed.feed.clear()
+    metrics.registry.clear()
+    anomaly.detector.clear()
+    yield
+    cache.asset_cache.clear()
+    kpi.memo.clear()
+
+
 @pytest.fixture(scope="function")
 def client(engine):
     app = create_app()
@@ -41,3 +65,28 @@ def client(engine):
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def async_client(tmp_path):
+    # aiosqlite connections are bound to the event loop that opened them, so the async
+    # app gets a file database and a fresh connection per session.
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    models.Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(
+        url.replace("sqlite", "sqlite+aiosqlite", 1), poolclass=NullPool
+    )
+    session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    app = create_app(async_db=True)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from app import anomaly
+
+
+@pytest.fixture(autouse=True)
+def no_cooldown(monkeypatch):
+    monkeypatch.setattr(anomaly, "COOLDOWN_SECONDS", 0.0)
+
+
+def _create_asset(client) -> int:
+    return client.post(
+        "/assets",
+        json={
+            "name": "Unit A",
+            "category": "gas_turbine",
+            "location": "Plant A",
+            "capacity_mw": 100.0,
+            "installed_at": "2021-06-01",
+        },
+    ).json()["id"]
+
+
+def _point(asset_id: int, second: int, tag: str, value: float) -> dict:
+    return {
+        "asset_id": asset_id,
+        "tag": tag,
+        "ts": f"2024-03-01T{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}Z",
+        "value": value,
+    }
+
+
+def _steady(asset_id: int, start: int, count: int, tag: str = "bearing_temp_c") -> list[dict]:
+    return [_point(asset_id, i, tag, 80.0 + i % 5) for i in range(start, start + count)]
+
+
+def _anomalies(client, asset_id: int) -> list[dict]:
+    work_orders = client.get("/workorders", params={"asset_id": asset_id}).json()
+    return [wo for wo in work_orders if wo["title"].startswith("Anomaly:")]
+
+
+def test_spike_raises_one_work_order_until_it_is_closed(client):
+    asset_id = _create_asset(client)
+    client.post("/telemetry", json={"points": _steady(asset_id, 0, 60)})
+    assert _anomalies(client, asset_id) == []
+
+    spike = [_point(asset_id, 1000, "bearing_temp_c", 140.0)]
+    assert client.post("/telemetry", json={"points": spike}).status_code == 201
+    [raised] = _anomalies(client, asset_id)
+    assert raised["title"] == "Anomaly: bearing_temp_c outside rolling range"
+    assert raised["priority"] == "critical"
+    assert raised["status"] == "open"
+
+    # Still open: the repeat hits the title constraint and is suppressed.
+    client.post("/telemetry", json={"points": [_point(asset_id, 1001, "bearing_temp_c", 160.0)]})
+    assert len(_anomalies(client, asset_id)) == 1
+
+    client.patch(f"/workorders/{raised['id']}", json={"status": "completed"})
+    client.post("/telemetry", json={"points": [_point(asset_id, 1002, "bearing_temp_c", 180.0)]})
+    titles = sorted(wo["title"] for wo in _anomalies(client, asset_id))
+    assert titles == [raised["title"], f"{raised['title']} #2"]
+
+    stats = client.get("/health/anomalies").json()
+    assert stats["work_orders_raised"] == 2
+    assert stats["duplicates_suppressed"] == 1
+
+
+def test_rule_flags_high_exhaust_temperature_at_low_load(client):
+    asset_id = _create_asset(client)
+    loaded = [
+        _point(asset_id, 0, "active_power_mw", 90.0),
+        _point(asset_id, 1, "exhaust_temp_c", 620.0),
+    ]
+    client.post("/telemetry", json={"points": loaded})
+    assert _anomalies(client, asset_id) == []
+
+    idling = [
+        _point(asset_id, 2, "active_power_mw", 10.0),
+        _point(asset_id, 3, "exhaust_temp_c", 650.0),
+    ]
+    client.post("/telemetry", json={"points": idling})
+    [raised] = _anomalies(client, asset_id)
+    assert raised["title"] == "Anomaly: High exhaust temperature at low load"
+    assert raised["priority"] == "high"
+
+
+def test_rolling_window_matches_the_last_values():
+    window = anomaly.RollingWindow(size=50)
+    values = [((i * 37) % 101) / 7 for i in range(500)]
+    for value in values:
+        window.push(value)
+    recent = values[-50:]
+    mean = sum(recent) / len(recent)
+    variance = sum((value - mean) ** 2 for value in recent) / (len(recent) - 1)
+    assert window.count == 50
+    assert window.mean == pytest.approx(mean)
+    assert window.std() == pytest.approx(variance**0.5)
+
+
+def test_worker_pool_checks_batches_off_the_calling_thread(engine, client):
+    asset_id = _create_asset(client)
+    detector = anomaly.Detector(workers=2)
+    points = [(asset_id, "bearing_temp_c", i, 80.0 + i % 5) for i in range(60)]
+    detector.submit(engine, points, {asset_id: 100.0})
+    detector.submit(engine, [(asset_id, "bearing_temp_c", 60, 150.0)], {asset_id: 100.0})
+    detector.drain()
+    assert detector.stats()["points"] == 61
+    assert detector.stats()["work_orders_raised"] == 1
+    assert len(_anomalies(client, asset_id)) == 1
+
+
+def test_failed_checks_are_logged_and_the_worker_keeps_going(engine, client, caplog):
+    asset_id = _create_asset(client)
+    detector = anomaly.Detector(workers=1)
+    points = [(asset_id, "bearing_temp_c", i, 80.0 + i % 5) for i in range(60)]
+    detector.submit(engine, points, {asset_id: 100.0})
+    client.delete(f"/assets/{asset_id}")
+    with caplog.at_level(logging.ERROR, logger="app.anomaly"):
+        detector.submit(engine, [(asset_id, "bearing_temp_c", 60, 150.0)], {asset_id: 100.0})
+        detector.drain()
+    [record] = caplog.records
+    assert record.getMessage() == (
+        f"Raising an anomaly work order for asset {asset_id}, tag bearing_temp_c failed"
+    )
+    assert record.exc_info is not None
+    assert detector.stats()["errors"] == 1
+
+    other = _create_asset(client)
+    detector.submit(engine, [(other, "bearing_temp_c", 0, 80.0)], {other: 100.0})
+    detector.drain()
+    assert detector.stats()["points"] == 61
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import Session
+
+from app import archive, models, stats
+
+
+def _create_asset(client, name: str = "Unit R") -> int:
+    return client.post(
+        "/assets",
+        json={
+            "name": name,
+            "category": "hydro",
+            "location": "Plant R",
+            "capacity_mw": 80.0,
+            "installed_at": "2015-09-01",
+        },
+    ).json()["id"]
+
+
+def _work_order(client, asset_id: int, title: str, status: str = "open") -> dict:
+    payload = {
+        "asset_id": asset_id,
+        "title": title,
+        "status": status,
+        "scheduled_start": "2024-03-01",
+        "scheduled_end": "2024-03-01",
+    }
+    return client.post("/workorders", json=payload).json()
+
+
+def _age(engine, ids: list[int], days: int) -> None:
+    wo = models.WorkOrder.__table__
+    with engine.begin() as connection:
+        connection.execute(
+            update(wo)
+            .where(wo.c.id.in_(ids))
+            .values(updated_at=datetime(2024, 4, 1) - timedelta(days=days))
+        )
+
+
+def _without_autoincrement(engine) -> None:
+    # As databases created before ids were reserved have it: SQLite hands out max(id) + 1.
+    with engine.begin() as connection:
+        sql = connection.scalar(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'work_orders'")
+        )
+        connection.execute(text("DROP TABLE work_orders"))
+        connection.execute(text(sql.replace(" AUTOINCREMENT", "")))
+
+
+def _archive(engine, **options) -> int:
+    with Session(engine) as db:
+        return archive.archive_closed_work_orders(
+            datetime.now() - datetime(2024, 3, 1), session=db, **options
+        )
+
+
+def test_closed_work_orders_move_to_the_archive(client, engine):
+    asset_id = _create_asset(client)
+    done = _work_order(client, asset_id, "Inspect penstock", "completed")
+    dropped = _work_order(client, asset_id, "Grease gates", "cancelled")
+    recent = _work_order(client, asset_id, "Repaint turbine hall", "completed")
+    still_open = _work_order(client, asset_id, "Replace seals")
+    _age(engine, [done["id"], dropped["id"], still_open["id"]], days=60)
+    availability = {
+        "asset_ids": [asset_id],
+        "periods": [{"start": "2024-03-01T00:00:00Z", "end": "2024-03-02T00:00:00Z"}],
+    }
+    before = client.post("/kpi/availability", json=availability).json()
+
+    assert _archive(engine) == 2
+    listed = client.get("/workorders").json()
+    assert {wo["id"] for wo in listed} == {recent["id"], still_open["id"]}
+    everything = client.get("/workorders", params={"include_archived": True}).json()
+    assert [wo["id"] for wo in everything] == [
+        still_open["id"], recent["id"], dropped["id"], done["id"]
+    ]
+    page = client.get("/workorders", params={"include_archived": True, "limit": 3})
+    rest = client.get(
+        "/workorders",
+        params={"include_archived": True, "cursor": page.headers["X-Next-Cursor"]},
+    )
+    assert [wo["id"] for wo in rest.json()] == [done["id"]]
+
+    assert client.get(f"/workorders/{done['id']}").status_code == 404
+    archived = client.get(f"/workorders/{done['id']}", params={"include_archived": True})
+    assert archived.json()["status"] == "completed"
+    assert archived.json()["title"] == "Inspect penstock"
+    assert client.patch(f"/workorders/{done['id']}", json={"priority": "low"}).status_code == 404
+
+    assert client.get("/stats").json()["work_orders"] == {
+        "open": {"medium": 1},
+        "completed": {"medium": 1},
+    }
+    assert client.post("/kpi/availability", json=availability).json() == before
+    # The title is free again on the hot table.
+    assert _work_order(client, asset_id, "Inspect penstock")["status"] == "open"
+    assert _archive(engine) == 0
+
+
+def test_archive_runs_in_batches_and_follows_asset_deletes(client, engine):
+    asset_id = _create_asset(client)
+    ids = [_work_order(client, asset_id, f"Task {n}", "completed")["id"] for n in range(5)]
+    _age(engine, ids, days=60)
+
+    assert _archive(engine, batch_size=2, max_batches=2) == 4
+    assert _archive(engine, batch_size=2) == 1
+    with Session(engine) as db:
+        incremental = client.get("/stats").json()
+        stats.rebuild(db)
+        db.commit()
+    assert client.get("/stats").json() == incremental
+
+    client.delete(f"/assets/{asset_id}")
+    with engine.connect() as connection:
+        remaining = connection.scalar(
+            select(func.count()).select_from(models.ArchivedWorkOrder)
+        )
+    assert remaining == 0
+
+
+def test_archive_skips_work_orders_whose_id_is_already_archived(client, engine):
+    _without_autoincrement(engine)
+    asset_id = _create_asset(client)
+    _work_order(client, asset_id, "Replace seals")
+    done = _work_order(client, asset_id, "Inspect penstock", "completed")
+    _age(engine, [done["id"]], days=60)
+    assert _archive(engine) == 1
+
+    reused = _work_order(client, asset_id, "Grease gates", "completed")
+    assert reused["id"] == done["id"]
+    _age(engine, [reused["id"]], days=60)
+    assert _archive(engine) == 0
+    assert client.get(f"/workorders/{reused['id']}").json()["title"] == "Grease gates"
+    assert client.get("/stats").json()["work_orders"] == {
+        "open": {"medium": 1},
+        "completed": {"medium": 1},
+    }
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import json
 from datetime import date
 
+import pytest
+from sqlalchemy import text
+
 
 def _asset_payload(name: str = "Unit 1", status: str = "active") -> dict:
     return {
@@ -42,3 +46,185 @@ def test_list_assets_can_filter_by_status(client):
     assert len(data) == 1
     assert data[0]["name"] == "Unit Beta"
     assert data[0]["status"] == "maintenance"
+
+
+def test_list_assets_cursor_pagination(client):
+    for name in ("Unit A1", "Unit A2", "Unit A3"):
+        client.post("/assets", json=_asset_payload(name=name))
+
+    first = client.get("/assets", params={"limit": 2})
+    assert [item["name"] for item in first.json()] == ["Unit A3", "Unit A2"]
+    token = first.headers["X-Next-Cursor"]
+
+    second = client.get("/assets", params={"limit": 2, "cursor": token})
+    assert [item["name"] for item in second.json()] == ["Unit A1"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_list_assets_rejects_invalid_cursor(client):
+    response = client.get("/assets", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def _work_order_payload(asset_id: int, title: str, status: str = "open", priority: str = "high"):
+    return {"asset_id": asset_id, "title": title, "status": status, "priority": priority}
+
+
+def test_list_assets_summary_view_counts_and_limits_open_work_orders(client):
+    asset = client.post("/assets", json=_asset_payload(name="Unit S")).json()
+    for index in range(4):
+        client.post("/workorders", json=_work_order_payload(asset["id"], f"Open task {index}"))
+    client.post(
+        "/workorders",
+        json=_work_order_payload(asset["id"], "Done task", status="completed", priority="low"),
+    )
+
+    response = client.get("/assets", params={"open_limit": 2})
+    assert response.status_code == 200
+    item = response.json()[0]
+    assert "work_orders" not in item
+    assert item["work_order_counts"] == {"open": {"high": 4}, "completed": {"low": 1}}
+    assert [wo["title"] for wo in item["open_work_orders"]] == ["Open task 3", "Open task 2"]
+
+
+def test_list_assets_full_view_keeps_nested_work_orders(client):
+    asset = client.post("/assets", json=_asset_payload(name="Unit T")).json()
+    client.post("/workorders", json=_work_order_payload(asset["id"], "Only task"))
+
+    response = client.get("/assets", params={"view": "full"})
+    item = response.json()[0]
+    assert [wo["title"] for wo in item["work_orders"]] == ["Only task"]
+    assert "work_order_counts" not in item
+
+
+def test_list_assets_fields_narrow_columns_and_nested_data(client):
+    asset = client.post("/assets", json=_asset_payload(name="Unit S")).json()
+    client.post("/workorders", json=_work_order_payload(asset["id"], "Skipped task"))
+    full = client.get("/assets")
+
+    response = client.get("/assets", params={"fields": "status, id,name"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": asset["id"], "name": "Unit S", "status": "active"}]
+    assert response.headers["ETag"] != full.headers["ETag"]
+
+    counts = client.get("/assets", params={"fields": "id,work_order_counts"}).json()
+    assert counts == [{"id": asset["id"], "work_order_counts": {"open": {"high": 1}}}]
+
+    rejected = client.get("/assets", params={"fields": "id,work_orders"})
+    assert rejected.status_code == 400
+    assert "work_orders" in rejected.json()["detail"]
+
+
+def test_search_matches_name_category_and_location_ranked_by_relevance(client):
+    client.post("/assets", json={**_asset_payload(name="Boiler Feed Pump"), "location": "Plant C"})
+    client.post("/assets", json={**_asset_payload(name="Unit 7"), "category": "feed_water"})
+    client.post("/assets", json=_asset_payload(name="Unit 8"))
+
+    response = client.get("/assets", params={"search": "FEED"})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()] == ["Boiler Feed Pump", "Unit 7"]
+
+    by_location = client.get("/assets", params={"search": "plant c"})
+    assert [item["name"] for item in by_location.json()] == ["Boiler Feed Pump"]
+
+    # A full page of ranked results is continued with skip, not a cursor.
+    first = client.get("/assets", params={"search": "feed", "limit": 1})
+    assert "X-Next-Cursor" not in first.headers
+    second = client.get("/assets", params={"search": "feed", "limit": 1, "skip": 1})
+    assert [item["name"] for item in second.json()] == ["Unit 7"]
+
+
+def test_search_index_follows_updates_and_deletes(client):
+    asset = client.post("/assets", json=_asset_payload(name="Unit Search")).json()
+    client.patch(f"/assets/{asset['id']}", json={"location": "Riverside"})
+
+    assert client.get("/assets", params={"search": "plant a"}).json() == []
+    assert len(client.get("/assets", params={"search": "riverside"}).json()) == 1
+
+    client.delete(f"/assets/{asset['id']}")
+    assert client.get("/assets", params={"search": "riverside"}).json() == []
+
+
+def test_search_index_skips_updates_to_other_columns(client, engine):
+    asset = client.post("/assets", json=_asset_payload(name="Unit Quiet")).json()
+    with engine.begin() as connection:
+        before = connection.scalar(text("SELECT total_changes()"))
+        # As every work order write does.
+        connection.execute(text("UPDATE assets SET version = version + 1"))
+        # total_changes() counts rows that triggers write too.
+        assert connection.scalar(text("SELECT total_changes()")) - before == 1
+    assert [item["id"] for item in client.get("/assets", params={"search": "quiet"}).json()] == [
+        asset["id"]
+    ]
+
+
+def test_bulk_create_assets_reports_per_row_results(client):
+    client.post("/assets", json=_asset_payload(name="Unit B1"))
+    batch = {"items": [_asset_payload(name="unit b1"), _asset_payload(name="Unit B2")]}
+
+    response = client.post("/assets:bulk", json=batch)
+    assert response.status_code == 200
+    results = response.json()
+    assert [row["result"] for row in results] == ["conflict", "created"]
+    assert client.get(f"/assets/{results[1]['id']}").json()["name"] == "Unit B2"
+
+
+def test_bulk_upsert_assets_updates_existing_rows(client):
+    existing = client.post("/assets", json=_asset_payload(name="Unit U1")).json()
+    batch = {"items": [{**_asset_payload(name="Unit U1"), "capacity_mw": 200.0}]}
+
+    response = client.post("/assets:bulk", params={"upsert": True}, json=batch)
+    assert response.json() == [
+        {"index": 0, "id": existing["id"], "result": "updated", "detail": None}
+    ]
+    assert client.get(f"/assets/{existing['id']}").json()["capacity_mw"] == 200.0
+
+
+def test_bulk_create_assets_rejects_duplicate_names_in_batch(client):
+    batch = {"items": [_asset_payload(name="Unit D1"), _asset_payload(name="UNIT D1")]}
+    assert client.post("/assets:bulk", json=batch).status_code == 422
+
+
+def test_asset_etag_changes_when_its_work_orders_change(client):
+    asset = client.post("/assets", json=_asset_payload(name="Unit V")).json()
+    etag = client.get(f"/assets/{asset['id']}").headers["ETag"]
+    list_etag = client.get("/assets").headers["ETag"]
+    assert client.get("/assets", headers={"If-None-Match": list_etag}).status_code == 304
+
+    client.post("/workorders", json=_work_order_payload(asset["id"], "New task"))
+
+    refreshed = client.get(f"/assets/{asset['id']}", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["work_orders"][0]["title"] == "New task"
+    assert client.get("/assets", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_export_assets_streams_ndjson_and_csv_with_filters(client):
+    client.post("/assets", json=_asset_payload(name="Unit Alpha", status="active"))
+    client.post("/assets", json=_asset_payload(name="Unit Beta", status="maintenance"))
+
+    ndjson = client.get("/assets/export", params={"status": "maintenance"})
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Unit Beta"]
+    assert rows[0]["status"] == "maintenance"
+    assert rows[0]["installed_at"] == "2018-05-01"
+
+    csv_export = client.get("/assets/export", params={"format": "csv"})
+    header, *lines = csv_export.text.splitlines()
+    assert header.split(",")[:3] == ["id", "name", "category"]
+    assert len(lines) == 2
+
+
+def test_export_assets_as_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+    for index in range(3):
+        client.post("/assets", json=_asset_payload(name=f"Unit {index}"))
+
+    response = client.get("/assets/export", params={"format": "arrow"})
+    assert response.status_code == 200
+    exported = pa.ipc.open_stream(response.content).read_all()
+    assert exported.num_rows == 3
+    assert exported.column("name").to_pylist() == ["Unit 0", "Unit 1", "Unit 2"]
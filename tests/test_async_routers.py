@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import date
+
+
+def _asset_payload(name: str) -> dict:
+    return {
+        "name": name,
+        "category": "hydro",
+        "status": "active",
+        "location": "Plant D",
+        "capacity_mw": 40.0,
+        "installed_at": date(2015, 3, 1).isoformat(),
+    }
+
+
+def test_async_asset_lifecycle(async_client):
+    created = async_client.post("/assets", json=_asset_payload("Unit Async"))
+    assert created.status_code == 201
+    asset = created.json()
+    assert asset["work_orders"] == []
+
+    patched = async_client.patch(f"/assets/{asset['id']}", json={"status": "maintenance"})
+    assert patched.json()["status"] == "maintenance"
+
+    listed = async_client.get("/assets", params={"search": "async"})
+    assert [item["name"] for item in listed.json()] == ["Unit Async"]
+
+    assert async_client.delete(f"/assets/{asset['id']}").status_code == 204
+    assert async_client.get(f"/assets/{asset['id']}").status_code == 404
+
+    entries = async_client.get(f"/assets/{asset['id']}/history").json()
+    assert [entry["action"] for entry in entries] == ["deleted", "updated", "created"]
+    past = async_client.get(f"/assets/{asset['id']}", params={"as_of": asset["updated_at"]})
+    assert past.json()["status"] == "active"
+
+
+def test_async_work_orders_and_summary(async_client):
+    asset = async_client.post("/assets", json=_asset_payload("Unit Async WO")).json()
+    response = async_client.post(
+        "/workorders", json={"asset_id": asset["id"], "title": "Check penstock", "priority": "low"}
+    )
+    assert response.status_code == 201
+    duplicate = async_client.post(
+        "/workorders", json={"asset_id": asset["id"], "title": "Check penstock"}
+    )
+    assert duplicate.status_code == 409
+
+    summary = async_client.get("/assets").json()[0]
+    assert summary["work_order_counts"] == {"open": {"low": 1}}
+    assert async_client.get(f"/assets/{asset['id']}").json()["work_orders"][0]["title"] == (
+        "Check penstock"
+    )
+
+    bulk = async_client.post(
+        "/workorders:bulk",
+        json={"items": [{"asset_id": asset["id"], "title": "Inspect runner"}]},
+    )
+    assert [row["result"] for row in bulk.json()] == ["created"]
+    assert len(async_client.get("/workorders", params={"asset_id": asset["id"]}).json()) == 2
+
+    closed = async_client.post(
+        "/workorders:transition",
+        json={"filter": {"asset_id": asset["id"]}, "status": "cancelled"},
+    )
+    assert len(closed.json()["updated"]) == 2
+    listed = async_client.get(
+        "/workorders", params={"asset_id": asset["id"], "include_archived": True}
+    )
+    assert {wo["status"] for wo in listed.json()} == {"cancelled"}
+    work_order_id = closed.json()["updated"][0]
+    fallback = async_client.get(f"/workorders/{work_order_id}", params={"include_archived": True})
+    assert fallback.status_code == 200
+    summary = async_client.get("/assets").json()[0]
+    assert summary["work_order_counts"] == {"cancelled": {"low": 1, "medium": 1}}
+
+
+def test_async_export_streams_csv(async_client):
+    async_client.post("/assets", json=_asset_payload("Unit Export"))
+    response = async_client.get("/assets/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.text.splitlines()[1].split(",")[1] == "Unit Export"
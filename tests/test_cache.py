@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import cache, models
+
+
+def _asset_payload() -> dict:
+    return {
+        "name": "Unit 1",
+        "category": "gas_turbine",
+        "status": "active",
+        "location": "Plant A",
+        "capacity_mw": 175.5,
+        "installed_at": "2018-05-01",
+    }
+
+
+def _cache_stats(client) -> dict:
+    return client.get("/health/cache").json()["assets"]
+
+
+def test_asset_reads_hit_the_cache_and_match_uncached_body(client):
+    asset_id = client.post("/assets", json=_asset_payload()).json()["id"]
+    hits_before = _cache_stats(client)["hits"]
+
+    first = client.get(f"/assets/{asset_id}")
+    second = client.get(f"/assets/{asset_id}")
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.json()["name"] == "Unit 1"
+
+    stats = _cache_stats(client)
+    assert stats["hits"] == hits_before + 1
+    assert stats["size"] == 1
+
+
+def test_cache_is_invalidated_by_asset_and_work_order_writes(client):
+    asset_id = client.post("/assets", json=_asset_payload()).json()["id"]
+    client.get(f"/assets/{asset_id}")
+    invalidations_before = _cache_stats(client)["invalidations"]
+
+    client.patch(f"/assets/{asset_id}", json={"location": "Plant B"})
+    assert client.get(f"/assets/{asset_id}").json()["location"] == "Plant B"
+
+    client.post(
+        "/workorders",
+        json={"asset_id": asset_id, "title": "Inspect blades", "priority": "high"},
+    )
+    assert len(client.get(f"/assets/{asset_id}").json()["work_orders"]) == 1
+    assert _cache_stats(client)["invalidations"] == invalidations_before + 2
+
+    client.delete(f"/assets/{asset_id}")
+    assert client.get(f"/assets/{asset_id}").status_code == 404
+
+
+
+def test_stale_cached_name_does_not_block_a_create(client):
+    # Another worker deleted this asset, and its invalidation has not arrived yet.
+    cache.asset_cache.put(99, "Unit Gone", 1, b"{}", generation=cache.asset_cache.generation)
+    created = client.post("/assets", json={**_asset_payload(), "name": "Unit Gone"})
+    assert created.status_code == 201
+    assert client.post("/assets", json={**_asset_payload(), "name": "unit gone"}).status_code == 409
+
+
+def test_lru_evicts_oldest_and_ttl_expires_entries():
+    now = [0.0]
+    lru = cache.AssetCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+    for asset_id in (1, 2):
+        lru.put(asset_id, f"Unit {asset_id}", 1, b"{}", generation=lru.generation)
+    assert lru.get(1) is not None  # 2 is now least recently used
+    lru.put(3, "Unit 3", 1, b"{}", generation=lru.generation)
+
+    assert lru.get(2) is None
+    assert lru.get_by_name("Unit 2") is None
+    assert lru.get_by_name("UNIT 3").asset_id == 3
+    now[0] = 11
+    assert lru.get(1) is None
+    assert lru.stats()["evictions"] == 1
+    assert lru.stats()["expirations"] == 1
+
+
+def test_fill_that_raced_with_an_invalidation_is_not_stored():
+    lru = cache.AssetCache()
+    generation = lru.generation
+    lru.invalidate([1])
+    lru.put(1, "Unit 1", 1, b"{}", generation=generation)
+    assert lru.get(1) is None
+
+
+def test_invalidation_channel_propagates_writes_between_workers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'shared.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    writer_cache, reader_cache = cache.AssetCache(), cache.AssetCache()
+    writer = cache.InvalidationChannel(writer_cache, poll_interval=0)
+    reader = cache.InvalidationChannel(reader_cache, poll_interval=0)
+
+    with Session(engine, autoflush=False) as db:
+        reader.poll(db)
+        reader_cache.put(7, "Unit 7", 1, b"{}", generation=reader_cache.generation)
+        writer.publish(db, [7])
+        db.commit()
+        db.add(models.CacheInvalidation(asset_id=8))
+        reader.poll(db)
+        db.rollback()
+
+    assert reader_cache.get(7) is None
+    # Polling left the request session's own pending work uncommitted.
+    with engine.connect() as connection:
+        published = connection.scalars(select(models.CacheInvalidation.asset_id)).all()
+    assert published == [7]
+    engine.dispose()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app import database
+
+
+def test_file_engine_applies_sqlite_pragmas(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "1234")
+    engine = database.build_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+    engine.dispose()
+
+
+def test_pool_metrics_record_checkouts_and_waits(tmp_path):
+    metrics = database.PoolMetrics()
+    engine = database.build_engine(f"sqlite:///{tmp_path / 'pooled.db'}", metrics)
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    stats = metrics.snapshot(engine.pool)
+    assert stats["checkouts"] == 3
+    assert stats["checked_out"] == 0
+    assert stats["wait_seconds_total"] >= 0
+    assert stats["hold_seconds_max"] > 0
+    engine.dispose()
+
+
+def test_health_endpoint_exposes_pool_stats(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    assert "checkouts" in response.json()["pools"]["sync"]
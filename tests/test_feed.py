@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.changes import Change, State
+from app.feed import ChangeFeed, FeedFilter, Subscription, _encode, sse_stream
+
+
+def _create_asset(client, name: str) -> int:
+    return client.post(
+        "/assets",
+        json={
+            "name": name,
+            "category": "hydro",
+            "location": "Plant F",
+            "capacity_mw": 40.0,
+            "installed_at": "2019-04-01",
+        },
+    ).json()["id"]
+
+
+def _create_work_order(client, asset_id: int, title: str, **fields) -> int:
+    payload = {"asset_id": asset_id, "title": title, **fields}
+    return client.post("/workorders", json=payload).json()["id"]
+
+
+def test_websocket_delivers_filtered_events_and_resumes_from_cursor(client):
+    watched = _create_asset(client, "Unit F1")
+    other = _create_asset(client, "Unit F2")
+    query = f"/changes/ws?entity=work_order&status=open&asset_id={watched}"
+
+    with client.websocket_connect(query) as websocket:
+        _create_work_order(client, other, "Ignored: other asset")
+        _create_work_order(client, watched, "Ignored: already done", status="completed")
+        work_order_id = _create_work_order(client, watched, "Replace seals")
+        created = websocket.receive_json()
+    assert (created["action"], created["id"], created["status"]) == (
+        "created",
+        work_order_id,
+        "open",
+    )
+
+    # Leaving the filter is still delivered; later events are replayed on reconnect.
+    client.patch(f"/workorders/{work_order_id}", json={"status": "completed"})
+    with client.websocket_connect(f"{query}&since={created['cursor']}") as websocket:
+        updated = websocket.receive_json()
+    assert updated["action"] == "updated"
+    assert (updated["previous_status"], updated["status"]) == ("open", "completed")
+    assert updated["seq"] > created["seq"]
+
+    with client.websocket_connect(f"{query}&since=stale:1") as websocket:
+        assert websocket.receive_json()["type"] == "reset"
+
+
+def test_subscription_coalesces_per_row_and_drops_oldest():
+    async def scenario() -> list[tuple[int, str]]:
+        subscription = Subscription(FeedFilter(), asyncio.get_running_loop(), maxsize=2)
+        feed = ChangeFeed()
+        for seq, (entity_id, action) in enumerate(
+            [(1, "created"), (1, "updated"), (2, "created"), (3, "created")], start=1
+        ):
+            subscription.offer(_encode(feed.epoch, seq, Change("work_order", action, entity_id, 9)))
+        batch = await subscription.next_batch(timeout=1)
+        assert (subscription.coalesced, subscription.dropped) == (1, 1)
+        return [(event.change.entity_id, event.change.action) for event in batch]
+
+    assert asyncio.run(scenario()) == [(2, "created"), (3, "created")]
+
+
+def test_sse_stream_frames_replayed_and_live_events():
+    async def scenario() -> list[bytes]:
+        feed = ChangeFeed()
+        start = feed.cursor()
+        feed.publish([Change("asset", "created", 5, 5, State("active"))])
+        subscription, replay = feed.subscribe(FeedFilter(entity="asset"), start)
+        feed.publish([Change("asset", "deleted", 5, 5, State("active"))])
+        stream = sse_stream(subscription, replay)
+        frames = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return frames
+
+    replayed, live = asyncio.run(scenario())
+    assert replayed.startswith(b"id: ") and b'"action":"created"' in replayed
+    assert b"event: change\n" in live and b'"action":"deleted"' in live
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import archive, history, models
+
+
+def _create_asset(client, name: str = "Unit H") -> dict:
+    response = client.post(
+        "/assets",
+        json={
+            "name": name,
+            "category": "wind",
+            "location": "Plant H",
+            "capacity_mw": 50.0,
+            "installed_at": "2019-03-01",
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_work_order_history_and_as_of_reads(client):
+    asset = _create_asset(client)
+    created = client.post(
+        "/workorders", json={"asset_id": asset["id"], "title": "Replace gearbox oil"}
+    ).json()
+    started = client.patch(
+        f"/workorders/{created['id']}", json={"status": "in_progress", "priority": "high"}
+    ).json()
+
+    entries = client.get(f"/workorders/{created['id']}/history").json()
+    assert [entry["action"] for entry in entries] == ["updated", "created"]
+    assert [entry["version"] for entry in entries] == [2, 1]
+    assert entries[0]["changes"] == {
+        "status": "in_progress",
+        "priority": "high",
+        "updated_at": started["updated_at"],
+    }
+    assert entries[1]["changes"]["title"] == "Replace gearbox oil"
+
+    before = client.get(f"/workorders/{created['id']}", params={"as_of": created["updated_at"]})
+    assert before.json() == created
+    now = client.get(f"/workorders/{created['id']}", params={"as_of": started["updated_at"]})
+    assert now.json() == started
+    embedded = client.get(f"/assets/{asset['id']}", params={"as_of": created["updated_at"]})
+    assert [wo["status"] for wo in embedded.json()["work_orders"]] == ["open"]
+
+    client.delete(f"/workorders/{created['id']}")
+    entries = client.get(f"/workorders/{created['id']}/history").json()
+    assert entries[0]["action"] == "deleted"
+    assert entries[0]["changes"] is None
+    # Past states stay readable after the delete; the present one is gone.
+    assert client.get(
+        f"/workorders/{created['id']}", params={"as_of": started["updated_at"]}
+    ).json() == started
+    latest = client.get(f"/workorders/{created['id']}", params={"as_of": "2100-01-01T00:00:00"})
+    assert latest.status_code == 404
+    early = client.get(f"/workorders/{created['id']}", params={"as_of": "2000-01-01T00:00:00"})
+    assert early.status_code == 404
+
+
+def test_as_of_replays_from_periodic_snapshots(client, engine):
+    asset = _create_asset(client)
+    states = [asset]
+    for capacity in range(51, 51 + 2 * history.SNAPSHOT_INTERVAL):
+        states.append(
+            client.patch(f"/assets/{asset['id']}", json={"capacity_mw": capacity}).json()
+        )
+
+    for state in states:
+        past = client.get(f"/assets/{asset['id']}", params={"as_of": state["updated_at"]})
+        assert past.json() == state
+
+    with engine.connect() as connection:
+        snapshots = connection.scalar(
+            select(func.count()).where(models.AuditHistory.seq == 0)
+        )
+    assert snapshots == 3
+
+    first = client.get(f"/assets/{asset['id']}/history", params={"limit": 30})
+    assert len(first.json()) == 30
+    rest = client.get(
+        f"/assets/{asset['id']}/history", params={"cursor": first.headers["X-Next-Cursor"]}
+    )
+    assert len(rest.json()) == len(states) - 30
+    assert rest.json()[-1]["action"] == "created"
+
+
+def test_bulk_upserts_and_asset_deletes_are_recorded(client):
+    asset = _create_asset(client)
+    work_order = client.post(
+        "/workorders", json={"asset_id": asset["id"], "title": "Check yaw drive"}
+    ).json()
+    payload = {**asset, "capacity_mw": 75.0}
+    for key in ("id", "created_at", "updated_at", "work_orders"):
+        payload.pop(key)
+    client.post("/assets:bulk", params={"upsert": True}, json={"items": [payload]})
+
+    entries = client.get(f"/assets/{asset['id']}/history").json()
+    assert entries[0]["changes"]["capacity_mw"] == 75.0
+    assert entries[0]["version"] == 3  # the work order bumped it to 2
+
+    client.delete(f"/assets/{asset['id']}")
+    cascaded = client.get(f"/workorders/{work_order['id']}/history").json()
+    assert [entry["action"] for entry in cascaded] == ["deleted", "created"]
+    assert client.get("/assets/999/history").status_code == 404
+
+
+def test_deleting_an_asset_ends_the_history_of_its_archived_work_orders(client, engine):
+    asset = _create_asset(client)
+    done = client.post(
+        "/workorders",
+        json={"asset_id": asset["id"], "title": "Inspect blades", "status": "completed"},
+    ).json()
+    with Session(engine) as db:
+        assert archive.archive_closed_work_orders(timedelta(days=-1), session=db) == 1
+
+    client.delete(f"/assets/{asset['id']}")
+    entries = client.get(f"/workorders/{done['id']}/history").json()
+    assert [entry["action"] for entry in entries] == ["deleted", "created"]
+    assert client.get(
+        f"/workorders/{done['id']}", params={"as_of": done["updated_at"]}
+    ).json() == done
+    latest = client.get(f"/workorders/{done['id']}", params={"as_of": "2100-01-01T00:00:00"})
+    assert latest.status_code == 404
+
+
+def test_a_new_asset_does_not_inherit_a_deleted_assets_history(client):
+    old = _create_asset(client, "Old Unit")
+    client.patch(f"/assets/{old['id']}", json={"capacity_mw": 55.0})
+    client.delete(f"/assets/{old['id']}")
+
+    new = _create_asset(client, "New Unit")
+    assert new["id"] != old["id"]
+    entries = client.get(f"/assets/{new['id']}/history").json()
+    assert [entry["action"] for entry in entries] == ["created"]
+    assert entries[0]["changes"]["name"] == "New Unit"
+    latest = client.get(f"/assets/{old['id']}", params={"as_of": "2100-01-01T00:00:00"})
+    assert latest.status_code == 404
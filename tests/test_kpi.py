@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pytest
+
+from app import kpi
+
+DAY = {"start": "2024-03-01T00:00:00Z", "end": "2024-03-02T00:00:00Z"}
+MARCH = {"start": "2024-03-01T00:00:00Z", "end": "2024-04-01T00:00:00Z"}
+
+
+def _create_asset(client, name: str = "Unit K", capacity_mw: float = 100.0) -> int:
+    return client.post(
+        "/assets",
+        json={
+            "name": name,
+            "category": "gas_turbine",
+            "location": "Plant K",
+            "capacity_mw": capacity_mw,
+            "installed_at": "2021-06-01",
+        },
+    ).json()["id"]
+
+
+def _work_order(client, asset_id: int, title: str, start: str, end: str) -> dict:
+    return client.post(
+        "/workorders",
+        json={
+            "asset_id": asset_id,
+            "title": title,
+            "scheduled_start": start,
+            "scheduled_end": end,
+        },
+    ).json()
+
+
+def _hourly(asset_id: int, tag: str, value: float, hours: int) -> list[dict]:
+    return [
+        {"asset_id": asset_id, "tag": tag, "ts": f"2024-03-01T{h:02d}:30:00Z", "value": value}
+        for h in range(hours)
+    ]
+
+
+def test_availability_counts_overlapping_work_orders_once(client):
+    busy = _create_asset(client, "Unit K1")
+    idle = _create_asset(client, "Unit K2")
+    _work_order(client, busy, "Borescope inspection", "2024-03-02", "2024-03-04")
+    _work_order(client, busy, "Filter change", "2024-03-03", "2024-03-05")
+
+    response = client.post(
+        "/kpi/availability", json={"asset_ids": [busy, idle], "periods": [MARCH, DAY]}
+    )
+    assert response.status_code == 200
+    rows = {(row["asset_id"], row["end"][:10]): row for row in response.json()}
+    # March 2nd to 5th inclusive: four days, not six.
+    assert rows[(busy, "2024-04-01")]["downtime_hours"] == 96
+    assert rows[(busy, "2024-04-01")]["availability"] == pytest.approx(1 - 96 / 744)
+    assert rows[(busy, "2024-03-02")]["availability"] == 1
+    assert rows[(idle, "2024-04-01")]["availability"] == 1
+
+
+def test_capacity_factor_and_efficiency_from_hourly_rollups(client):
+    asset_id = _create_asset(client, capacity_mw=100.0)
+    points = _hourly(asset_id, "active_power_mw", 50.0, 12)
+    points += _hourly(asset_id, "fuel_input_mw_th", 125.0, 12)
+    assert client.post("/telemetry", json={"points": points}).status_code == 201
+
+    body = {"asset_ids": [asset_id], "periods": [DAY]}
+    [factor] = client.post("/kpi/capacity-factor", json=body).json()
+    assert factor["energy_mwh"] == 600
+    assert factor["capacity_factor"] == pytest.approx(600 / 2400)
+
+    [result] = client.post("/kpi/efficiency", json=body).json()
+    assert result["fuel_mwh"] == 1500
+    assert result["efficiency"] == pytest.approx(0.4)
+    assert result["heat_rate_kj_per_kwh"] == pytest.approx(9000)
+
+
+def test_results_are_memoized_until_a_work_order_changes(client):
+    asset_id = _create_asset(client)
+    body = {"asset_ids": [asset_id], "periods": [MARCH]}
+    first = client.post("/kpi/availability", json=body).json()
+    hits = kpi.memo.hits
+    assert client.post("/kpi/availability", json=body).json() == first
+    assert kpi.memo.hits == hits + 1
+
+    work_order = _work_order(client, asset_id, "Hot gas path", "2024-03-10", "2024-03-10")
+    after_create = client.post("/kpi/availability", json=body).json()
+    assert after_create[0]["downtime_hours"] == 24
+
+    client.patch(f"/workorders/{work_order['id']}", json={"status": "cancelled"})
+    assert client.post("/kpi/availability", json=body).json() == first
+
+
+def test_result_computed_across_an_invalidation_is_not_kept():
+    memo = kpi.KpiMemo()
+
+    def racing_write() -> list:
+        memo.invalidate([1])  # a commit lands while the result is being computed
+        return ["stale"]
+
+    assert memo.get_or_compute("key", [1], racing_write) == ["stale"]
+    assert memo.get_or_compute("key", [1], lambda: ["fresh"]) == ["fresh"]
+    assert memo.get_or_compute("key", [1], lambda: ["unused"]) == ["fresh"]
+
+
+def test_unknown_asset_is_not_found(client):
+    response = client.post("/kpi/availability", json={"asset_ids": [999], "periods": [DAY]})
+    assert response.status_code == 404
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import logging
+
+from app import metrics
+
+
+def _asset_payload(name: str) -> dict:
+    return {
+        "name": name,
+        "category": "gas_turbine",
+        "location": "Plant M",
+        "capacity_mw": 150.0,
+        "installed_at": "2020-02-01",
+    }
+
+
+def _sample(body: str, series: str) -> float:
+    for line in body.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{series} not in /metrics")
+
+
+def test_metrics_record_statements_and_timings_per_route(client):
+    asset = client.post("/assets", json=_asset_payload("Unit M")).json()
+    client.get(f"/assets/{asset['id']}")
+    client.get(f"/assets/{asset['id']}")
+    client.get("/assets")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    route = 'method="GET",route="/assets/{asset_id}"'
+    assert _sample(body, f'http_requests_total{{{route},status="200"}}') == 2
+    assert _sample(body, f"http_request_duration_seconds_count{{{route}}}") == 2
+    assert _sample(body, f'db_statements_per_request_bucket{{{route},le="+Inf"}}') == 2
+    create = 'method="POST",route="/assets"'
+    assert _sample(body, f"db_statements_per_request_sum{{{create}}}") >= 3
+    assert _sample(body, f"db_seconds_per_request_sum{{{create}}}") > 0
+    assert _sample(body, 'serialize_seconds_per_request_count{method="GET",route="/assets"}') == 1
+
+
+def test_slow_query_log_redacts_bound_parameters(client, monkeypatch, caplog):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_MS", 1e-9)
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        client.post("/assets", json=_asset_payload("Secret Unit"))
+
+    assert "on /assets: INSERT INTO assets" in caplog.text
+    assert "parameters redacted" in caplog.text
+    assert "Secret Unit" not in caplog.text
+    assert 'db_slow_queries_total{route="/assets"}' in client.get("/metrics").text
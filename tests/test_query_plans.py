@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+import re
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import archive, models
+
+# Query plan regression suite: drive the API through its read and write paths, capture
+# every SELECT, UPDATE and DELETE it sends, and EXPLAIN each one. A full table scan or a
+# sort the indexes should have made unnecessary fails the test.
+#
+# SQLite always runs. Set TEST_POSTGRES_URL (a throwaway database; its tables are
+# dropped) to check the Postgres plans too, with sequential scans and sorts disabled so
+# the planner only falls back to them when no index can serve the query.
+
+TABLES = set(models.Base.metadata.tables)
+
+# Sorts that no index can remove, each matched against the statement text.
+ALLOWED_SORTS = {
+    # Search results are ordered by relevance score.
+    "relevance ranking": re.compile(r"\b(bm25|similarity)\("),
+    # Re-orders at most open_limit recent open work orders per asset on the page.
+    "open work orders per asset": re.compile(r"row_number\(\) OVER"),
+    # The fleet-wide conflict report reads every blocking work order; without ANALYZE
+    # statistics SQLite prefers the status index and sorts the result once.
+    "fleet conflict report": re.compile(
+        r"WHERE work_orders\.scheduled_start IS NOT NULL AND work_orders\.status IN "
+        r"\([^)]*\) ORDER BY"
+    ),
+    # include_archived reads a page of at most skip + limit rows from each table by index
+    # and sorts only those.
+    "archive merge": re.compile(r"\bUNION ALL\b"),
+}
+
+
+def _engines():
+    yield pytest.param("sqlite://", id="sqlite")
+    yield pytest.param(
+        os.getenv("TEST_POSTGRES_URL"),
+        id="postgresql",
+        marks=pytest.mark.skipif(
+            not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL is not set"
+        ),
+    )
+
+
+@pytest.fixture(scope="module", params=list(_engines()))
+def engine(request):
+    # Overrides the session-wide SQLite engine from conftest for this module.
+    if request.param == "sqlite://":
+        engine = create_engine(
+            request.param, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(request.param)
+    yield engine
+    models.Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def captured(engine):
+    statements: dict[str, object] = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(
+            ("SELECT", "UPDATE", "DELETE")
+        ):
+            statements.setdefault(statement, parameters)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def _sqlite_plan(connection, statement: str, parameters) -> list[str]:
+    problems = []
+    for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+        detail = row[-1]
+        words = detail.split()
+        if words[0] == "SCAN" and words[1] in TABLES:
+            # Walking a whole index is how an unfiltered page is read in order; with a
+            # WHERE clause it means no index matched the filter.
+            if "USING" not in words or re.search(r"\bWHERE\b", statement):
+                problems.append(f"table scan: {detail}")
+        elif "TEMP B-TREE" in detail:
+            problems.append(f"sort: {detail}")
+    return problems
+
+
+def _postgres_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _postgres_nodes(child)
+
+
+def _postgres_plan(connection, statement: str, parameters) -> list[str]:
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    connection.exec_driver_sql("SET LOCAL enable_sort = off")
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    ).scalar_one()
+    problems = []
+    for node in _postgres_nodes(plan[0]["Plan"]):
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in TABLES:
+            problems.append(f"table scan: {node['Relation Name']}")
+        elif node["Node Type"] in ("Sort", "Incremental Sort"):
+            problems.append(f"sort: {', '.join(node.get('Sort Key', ()))}")
+    return problems
+
+
+def _asset_payload(index: int, status: str = "active", location: str = "Plant Q") -> dict:
+    return {
+        "name": f"Plan Unit {index}",
+        "category": "gas_turbine",
+        "status": status,
+        "location": location,
+        "capacity_mw": 120.0,
+        "installed_at": "2019-04-01",
+    }
+
+
+def _exercise(client, engine) -> None:
+    assets = [
+        client.post("/assets", json=_asset_payload(index, status)).json()
+        for index, status in enumerate(("active", "maintenance", "active"))
+    ]
+    asset_id = assets[0]["id"]
+    work_orders = []
+    for index, (wo_status, priority) in enumerate(
+        (("open", "high"), ("in_progress", "low"), ("open", "critical"), ("completed", "high"))
+    ):
+        response = client.post(
+            "/workorders",
+            json={
+                "asset_id": asset_id,
+                "title": f"Plan task {index}",
+                "status": wo_status,
+                "priority": priority,
+                "scheduled_start": "2024-05-01",
+                "scheduled_end": "2024-05-03",
+            },
+        )
+        work_orders.append(response.json())
+
+    page = client.get("/assets", params={"limit": 1})
+    client.get("/assets", params={"limit": 1, "cursor": page.headers["X-Next-Cursor"]})
+    client.get("/assets", params={"status": "active"})
+    client.get("/assets", params={"view": "full"})
+    client.get("/assets", params={"search": "unit"})
+    client.get(f"/assets/{asset_id}")
+    page = client.get("/workorders", params={"limit": 1})
+    client.get("/workorders", params={"limit": 1, "cursor": page.headers["X-Next-Cursor"]})
+    for params in (
+        {"status": "open"},
+        {"priority": "high"},
+        {"asset_id": asset_id},
+        {"asset_id": asset_id, "status": "open", "priority": "high"},
+    ):
+        assert client.get("/workorders", params=params).status_code == 200
+    client.get(f"/workorders/{work_orders[0]['id']}")
+    client.get("/workorders/conflicts")
+    client.get("/workorders/conflicts", params={"asset_id": asset_id})
+    client.post(
+        "/kpi/availability",
+        json={
+            "asset_ids": [asset_id],
+            "periods": [{"start": "2024-05-01T00:00:00Z", "end": "2024-06-01T00:00:00Z"}],
+        },
+    )
+    client.patch(f"/workorders/{work_orders[1]['id']}", json={"status": "completed"})
+    client.patch(f"/assets/{assets[1]['id']}", json={"status": "active"})
+    transition = client.post(
+        "/workorders:transition",
+        json={"filter": {"asset_id": asset_id, "status": "open"}, "priority": "critical"},
+    )
+    assert transition.status_code == 200
+    page = client.get(f"/workorders/{work_orders[1]['id']}/history", params={"limit": 1})
+    client.get(
+        f"/workorders/{work_orders[1]['id']}/history",
+        params={"limit": 1, "cursor": page.headers["X-Next-Cursor"]},
+    )
+    as_of = {"as_of": work_orders[1]["updated_at"]}
+    assert client.get(f"/workorders/{work_orders[1]['id']}", params=as_of).status_code == 200
+    assert client.get(f"/assets/{asset_id}", params=as_of).status_code == 200
+    with Session(engine) as db:
+        assert archive.archive_closed_work_orders(timedelta(0), session=db) == 2
+    for params in ({}, {"status": "completed"}, {"asset_id": asset_id}):
+        archived = client.get("/workorders", params={**params, "include_archived": True})
+        assert archived.status_code == 200
+    archived = {"include_archived": True}
+    assert client.get(f"/workorders/{work_orders[1]['id']}", params=archived).status_code == 200
+    bulk = client.post(
+        "/assets:bulk",
+        params={"upsert": True},
+        json={"items": [_asset_payload(2, location="Plant R")]},
+    )
+    assert bulk.status_code == 200
+    client.delete(f"/workorders/{work_orders[2]['id']}")
+    client.delete(f"/assets/{assets[2]['id']}")
+
+
+def test_queries_use_indexes_without_scans_or_sorts(client, captured, engine):
+    _exercise(client, engine)
+    assert captured
+
+    explain = _postgres_plan if engine.dialect.name == "postgresql" else _sqlite_plan
+    failures = []
+    with engine.connect() as connection:
+        for statement, parameters in captured.items():
+            problems = explain(connection, statement, parameters)
+            if any(pattern.search(statement) for pattern in ALLOWED_SORTS.values()):
+                problems = [problem for problem in problems if not problem.startswith("sort")]
+            failures.extend(f"{problem}\n    {' '.join(statement.split())}" for problem in problems)
+        connection.rollback()
+
+    assert not failures, "\n".join(failures)
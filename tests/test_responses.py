@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
+
+from app import crud, models, responses, schemas
+
+
+def _reference_body(model, content, *, exclude_unset: bool = False) -> bytes:
+    # What FastAPI produced before list endpoints skipped the response model: validate,
+    # dump in JSON mode, then render with the stdlib encoder.
+    adapter = TypeAdapter(List[model])
+    validated = adapter.validate_python(content, from_attributes=True)
+    dumped = adapter.dump_python(validated, mode="json", exclude_unset=exclude_unset)
+    return JSONResponse(dumped).body
+
+
+def _seed(client) -> None:
+    # Floats outside [1e-4, 1e16) take the exact fallback; the rest the orjson path.
+    for index, capacity in enumerate([123.456, 0.00001, 2.5e16, 1 / 3]):
+        asset = client.post(
+            "/assets",
+            json={
+                "name": f"Kraftwerk Süd {index} – “Block”",
+                "category": "gas_turbine",
+                "location": "Plant 東",
+                "capacity_mw": capacity,
+                "installed_at": "2020-02-29",
+            },
+        ).json()
+        for title, wo_status in (("Inspect bearings", "open"), ("Replace filters", "completed")):
+            client.post(
+                "/workorders",
+                json={
+                    "asset_id": asset["id"],
+                    "title": title,
+                    "description": "Vibration ≥ 4.5 mm/s\nrecheck",
+                    "status": wo_status,
+                    "scheduled_start": "2024-05-01",
+                    "completed_at": "2024-05-02T10:11:12.000345"
+                    if wo_status == "completed"
+                    else None,
+                },
+            )
+
+
+def test_list_bodies_match_response_model_encoding(client, engine):
+    _seed(client)
+    with Session(engine) as db:
+        assets = db.scalars(
+            select(models.Asset)
+            .options(selectinload(models.Asset.work_orders))
+            .order_by(models.Asset.created_at.desc(), models.Asset.id.desc())
+        ).all()
+        for asset in assets:
+            asset.work_orders.sort(key=lambda work_order: work_order.id)
+        counts, recent_open = crud.summarize_work_orders(db, [asset.id for asset in assets])
+        summaries = [
+            {
+                **{field: getattr(asset, field) for field in crud.ASSET_ROW_FIELDS},
+                "work_order_counts": counts[asset.id],
+                "open_work_orders": recent_open[asset.id],
+            }
+            for asset in assets
+        ]
+        work_orders = db.scalars(
+            select(models.WorkOrder).order_by(
+                models.WorkOrder.created_at.desc(), models.WorkOrder.id.desc()
+            )
+        ).all()
+
+        assert client.get("/assets").content == _reference_body(
+            schemas.AssetListItem, summaries, exclude_unset=True
+        )
+        assert client.get("/assets", params={"view": "full"}).content == _reference_body(
+            schemas.AssetListItem, assets, exclude_unset=True
+        )
+        assert client.get("/workorders").content == _reference_body(
+            schemas.WorkOrderRead, work_orders
+        )
+
+
+def test_dumps_matches_stdlib_encoding_for_awkward_values():
+    content = {
+        "floats": [1e16, 1e-05, 0.0001, 9999999999999998.0, -2.5e-7, 0.1],
+        "text": "e5 1e5 ü",
+        "when": [datetime(2024, 1, 1, 0, 0, 0, 7), datetime(2024, 1, 1)],
+        "status": schemas.WorkOrderStatus.open,
+    }
+    expected = JSONResponse(TypeAdapter(dict).dump_python(content, mode="json")).body
+    assert responses.dumps(content) == expected
+    for value in (1e-05, -2e-05, 10.00001):
+        assert responses.dumps([value]) == JSONResponse([value]).body
+
+
+def test_installed_orjson_is_the_pinned_release():
+    # The fallback above covers the float formats of this release only.
+    requirements = Path(__file__).resolve().parents[1] / "requirements.txt"
+    assert f"orjson=={orjson.__version__}" in requirements.read_text().splitlines()
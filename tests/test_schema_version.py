@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, inspect, text, update
+from sqlalchemy.orm import sessionmaker
+
+from app import main, models, schema_version
+from app.database import get_db
+
+# The tables as the first release created them, before any migration.
+BASELINE_SCHEMA = (
+    """
+    CREATE TABLE assets (
+        id INTEGER NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        category VARCHAR(50) NOT NULL,
+        status VARCHAR(14) NOT NULL,
+        location VARCHAR(100) NOT NULL,
+        capacity_mw FLOAT NOT NULL,
+        installed_at DATE NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX ix_assets_id ON assets (id)",
+    "CREATE UNIQUE INDEX ix_assets_name ON assets (name)",
+    """
+    CREATE TABLE work_orders (
+        id INTEGER NOT NULL,
+        asset_id INTEGER NOT NULL,
+        title VARCHAR(120) NOT NULL,
+        description TEXT,
+        status VARCHAR(11) NOT NULL,
+        priority VARCHAR(8) NOT NULL,
+        scheduled_start DATE,
+        scheduled_end DATE,
+        completed_at DATETIME,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (id),
+        CONSTRAINT uq_work_order_title UNIQUE (asset_id, title),
+        FOREIGN KEY(asset_id) REFERENCES assets (id) ON DELETE CASCADE
+    )
+    """,
+    "CREATE INDEX ix_work_orders_id ON work_orders (id)",
+    "CREATE INDEX ix_work_orders_asset_id ON work_orders (asset_id)",
+    """
+    INSERT INTO assets VALUES (1, 'Unit B', 'hydro', 'active', 'Plant B', 40.0,
+        '2012-05-01', '2023-01-01 00:00:00.000000', '2023-01-01 00:00:00.000000')
+    """,
+    """
+    INSERT INTO work_orders VALUES (7, 1, 'Inspect intake', NULL, 'open', 'high', NULL,
+        NULL, NULL, '2023-01-02 00:00:00.000000', '2023-01-02 00:00:00.000000')
+    """,
+)
+
+
+def baseline_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+    return engine
+
+
+def test_schema_setup_runs_only_when_the_fingerprint_changes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    assert schema_version.ensure_schema(engine, "skip") is False
+    assert inspect(engine).get_table_names() == []
+
+    assert schema_version.ensure_schema(engine, "auto") is True
+    assert "work_orders_archive" in inspect(engine).get_table_names()
+    assert schema_version.ensure_schema(engine, "auto") is False
+    assert schema_version.ensure_schema(engine, "always") is True
+
+    with engine.begin() as connection:
+        connection.execute(update(models.SchemaVersion.__table__).values(version="older"))
+    assert schema_version.ensure_schema(engine, "auto") is True
+    with engine.connect() as connection:
+        assert schema_version.stored_version(connection) == schema_version.fingerprint()
+        assert schema_version.applied_migrations(connection) == len(schema_version.MIGRATIONS)
+    engine.dispose()
+
+
+def test_schema_setup_refuses_a_database_it_cannot_bring_up_to_date(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    schema_version.ensure_schema(engine, "auto")
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE telemetry_batches DROP COLUMN point_count"))
+        connection.execute(update(models.SchemaVersion.__table__).values(version="older"))
+
+    with pytest.raises(RuntimeError, match="telemetry_batches lacks columns point_count"):
+        schema_version.ensure_schema(engine, "auto")
+    with engine.connect() as connection:
+        assert schema_version.stored_version(connection) == "older"
+    engine.dispose()
+
+
+def test_importing_the_app_defers_the_engine_and_optional_modules():
+    probe = (
+        "import json, sys\n"
+        "import app.main\n"
+        "from app import database\n"
+        "print(json.dumps([database._engine is None, 'numpy' in sys.modules,\n"
+        "                  'app.routers.workorders_async' in sys.modules]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=Path(__file__).resolve().parents[1],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert json.loads(output) == [True, False, False]
+
+
+def test_app_boots_against_a_baseline_database(tmp_path, monkeypatch):
+    engine = baseline_engine(tmp_path / "baseline.db")
+    # Work order 9 was archived and asset 3 deleted while the tables still handed out
+    # max(id) + 1.
+    models.ArchivedWorkOrder.__table__.create(engine)
+    models.AuditHistory.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO work_orders_archive VALUES (9, 1, 'Old task', NULL, 'completed',"
+                " 'low', NULL, NULL, NULL, '2023-01-01', '2023-01-01', 1, '2023-06-01')"
+            )
+        )
+        connection.execute(
+            insert(models.AuditHistory.__table__).values(
+                entity="asset",
+                entity_id=3,
+                asset_id=3,
+                action="deleted",
+                changed_at=datetime(2023, 6, 1),
+                seq=0,
+            )
+        )
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    # The lifespan migrates the database it is started against.
+    monkeypatch.setattr(main, "get_engine", lambda: engine)
+    app = main.create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        [asset] = client.get("/assets").json()
+        assert asset["name"] == "Unit B"
+        work_order = client.get("/workorders/7")
+        assert work_order.json()["priority"] == "high"
+        assert work_order.headers["ETag"] == '"work_order-7-v1"'
+        updated = client.patch("/workorders/7", json={"status": "in_progress"})
+        assert updated.status_code == 200
+        assert client.get("/stats").json()["work_orders"] == {"in_progress": {"high": 1}}
+        created = client.post("/workorders", json={"asset_id": 1, "title": "Check seals"})
+        assert created.json()["id"] == 10
+        asset = client.post(
+            "/assets",
+            json={
+                "name": "Unit C",
+                "category": "hydro",
+                "location": "Plant C",
+                "capacity_mw": 20.0,
+                "installed_at": "2014-01-01",
+            },
+        )
+        assert asset.json()["id"] == 4
+        found = client.get("/assets", params={"search": "plant c"}).json()
+        assert [item["name"] for item in found] == ["Unit C"]
+
+    with engine.connect() as connection:
+        assert schema_version.schema_mismatches(connection) == []
+        assert schema_version.applied_migrations(connection) == len(schema_version.MIGRATIONS)
+    indexes = {index["name"]: index for index in inspect(engine).get_indexes("work_orders")}
+    assert indexes["ix_work_orders_asset_id"]["column_names"] == ["asset_id", "id"]
+    assert "uq_work_order_title" in {
+        constraint["name"] for constraint in inspect(engine).get_unique_constraints("work_orders")
+    }
+    engine.dispose()
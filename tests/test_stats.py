@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy.orm import Session
+
+from app import stats
+
+
+def _asset_payload(name: str, category: str = "gas_turbine", capacity_mw: float = 100.0) -> dict:
+    return {
+        "name": name,
+        "category": category,
+        "status": "active",
+        "location": "Plant S",
+        "capacity_mw": capacity_mw,
+        "installed_at": date(2019, 1, 1).isoformat(),
+    }
+
+
+def _work_order(asset_id: int, title: str, priority: str = "critical") -> dict:
+    return {"asset_id": asset_id, "title": title, "priority": priority}
+
+
+def test_stats_follow_creates_updates_and_deletes(client):
+    gt = client.post("/assets", json=_asset_payload("Unit GT", capacity_mw=150.5)).json()
+    pv = client.post("/assets", json=_asset_payload("Unit PV", "solar", 20.0)).json()
+    first = client.post("/workorders", json=_work_order(gt["id"], "Replace filters")).json()
+    client.post("/workorders", json=_work_order(gt["id"], "Borescope"))
+    client.post("/workorders", json=_work_order(pv["id"], "Clean panels", "low"))
+
+    summary = client.get("/stats").json()
+    assert summary["work_orders"] == {"open": {"critical": 2, "low": 1}}
+    assert summary["capacity"]["active"] == {
+        "gas_turbine": {"assets": 1, "capacity_mw": 150.5},
+        "solar": {"assets": 1, "capacity_mw": 20.0},
+    }
+
+    client.patch(f"/workorders/{first['id']}", json={"status": "completed"})
+    client.patch(f"/assets/{pv['id']}", json={"status": "maintenance"})
+    open_critical = client.get("/stats/assets", params={"status": "open", "priority": "critical"})
+    assert open_critical.json() == [
+        {"asset_id": gt["id"], "work_orders": {"open": {"critical": 1}}}
+    ]
+    assert client.get("/stats").json()["capacity"]["maintenance"] == {
+        "solar": {"assets": 1, "capacity_mw": 20.0}
+    }
+
+    client.delete(f"/assets/{gt['id']}")
+    summary = client.get("/stats").json()
+    assert summary["work_orders"] == {"open": {"low": 1}}
+    assert "active" not in summary["capacity"]
+    # The asset's work orders went with it, matching the counts.
+    assert client.get("/workorders", params={"asset_id": gt["id"]}).json() == []
+    assert client.get(f"/workorders/{first['id']}").status_code == 404
+
+
+def test_incremental_stats_match_a_full_rebuild(client, engine):
+    assets = client.post(
+        "/assets:bulk",
+        json={"items": [_asset_payload(f"Unit {i}", capacity_mw=10.0 + i) for i in range(4)]},
+    ).json()
+    ids = [row["id"] for row in assets]
+    items = [_work_order(asset_id, f"Task {n}", "high") for n, asset_id in enumerate(ids)]
+    client.post("/workorders:bulk", json={"items": items})
+    items[0]["priority"] = "low"
+    client.post("/workorders:bulk", params={"upsert": "true"}, json={"items": items})
+    client.post(
+        "/assets:bulk",
+        params={"upsert": "true"},
+        json={"items": [_asset_payload("Unit 0", "steam", 12.5)]},
+    )
+
+    incremental = client.get("/stats").json()
+    with Session(engine) as db:
+        stats.rebuild(db)
+        db.commit()
+    assert client.get("/stats").json() == incremental
+    assert incremental["work_orders"] == {"open": {"high": 3, "low": 1}}
+    assert incremental["capacity"]["active"]["steam"] == {"assets": 1, "capacity_mw": 12.5}
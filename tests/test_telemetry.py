@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from app import telemetry
+from app.downsample import lttb
+
+
+def _create_asset(client) -> int:
+    return client.post(
+        "/assets",
+        json={
+            "name": "Unit T",
+            "category": "gas_turbine",
+            "location": "Plant T",
+            "capacity_mw": 120.0,
+            "installed_at": "2021-06-01",
+        },
+    ).json()["id"]
+
+
+def _points(asset_id: int, count: int, tag: str = "exhaust_temp") -> list[dict]:
+    return [
+        {
+            "asset_id": asset_id,
+            "tag": tag,
+            "ts": f"2024-03-01T00:{i // 60:02d}:{i % 60:02d}Z",
+            "value": i,
+        }
+        for i in range(count)
+    ]
+
+
+def test_ingest_batch_skips_points_already_stored(client):
+    asset_id = _create_asset(client)
+    first = client.post("/telemetry", json={"points": _points(asset_id, 120)})
+    assert first.status_code == 201
+    assert first.json() == {"received": 120, "inserted": 120, "duplicates": 0}
+
+    overlap = client.post("/telemetry", json={"points": _points(asset_id, 150)})
+    assert overlap.json() == {"received": 150, "inserted": 30, "duplicates": 120}
+
+
+def test_repeated_idempotency_key_is_rejected_until_it_expires(client, monkeypatch):
+    asset_id = _create_asset(client)
+    headers = {"Idempotency-Key": "batch-42"}
+    first = client.post("/telemetry", json={"points": _points(asset_id, 5)}, headers=headers)
+    assert first.status_code == 201
+
+    replay = {"points": _points(asset_id, 5, "rpm")}
+    assert client.post("/telemetry", json=replay, headers=headers).status_code == 409
+    assert client.get("/telemetry/metrics").json()["duplicate_batches"] >= 1
+
+    # Once the key has expired the same batch is accepted, and none of its points were
+    # kept from the rejected attempt.
+    monkeypatch.setattr(telemetry, "IDEMPOTENCY_TTL", timedelta(0))
+    retry = client.post("/telemetry", json=replay, headers=headers)
+    assert retry.json()["inserted"] == 5
+
+
+def test_ingest_rejects_unknown_assets_and_non_finite_values(client):
+    asset_id = _create_asset(client)
+    missing = client.post("/telemetry", json={"points": _points(asset_id + 1, 1)})
+    assert missing.status_code == 404
+    assert missing.json()["detail"] == f"Related asset not found: {asset_id + 1}"
+
+    point = {**_points(asset_id, 1)[0], "value": "NaN"}
+    assert client.post("/telemetry", json={"points": [point]}).status_code == 422
+
+
+def test_large_batches_span_several_insert_statements(client):
+    asset_id = _create_asset(client)
+    count = telemetry.INSERT_CHUNK_ROWS + 7
+    # Numeric timestamps this large are read as epoch milliseconds.
+    points = [
+        {"asset_id": asset_id, "tag": "vibration", "ts": 1_709_251_200_000 + i, "value": 0.5}
+        for i in range(count)
+    ]
+    assert client.post("/telemetry", json={"points": points}).json()["inserted"] == count
+    metrics = client.get("/telemetry/metrics").json()
+    assert metrics["target_points_per_second"] == telemetry.TARGET_POINTS_PER_SECOND
+    assert metrics["points_per_second"] > 0
+
+
+def test_rollups_aggregate_each_bucket_once(client):
+    asset_id = _create_asset(client)
+    base = 1_709_251_200_000  # 2024-03-01T00:00:00Z, on an hour boundary
+    points = [
+        {"asset_id": asset_id, "tag": "load_mw", "ts": base + minute * 60_000, "value": minute}
+        for minute in range(120)
+    ]
+    client.post("/telemetry", json={"points": points})
+    client.post("/telemetry", json={"points": points[:30]})  # replayed points are ignored
+
+    series = client.get(
+        "/telemetry/series",
+        params={
+            "asset_id": asset_id,
+            "tag": "load_mw",
+            "start": "2024-03-01T00:00:00Z",
+            "end": "2024-03-01T02:00:00Z",
+            "resolution": "1h",
+        },
+    ).json()
+    assert series["resolution"] == "1h"
+    first_hour, second_hour = series["points"]
+    assert first_hour == {
+        "ts": "2024-03-01T00:00:00Z", "value": 29.5, "min": 0, "max": 59, "last": 59, "count": 60
+    }
+    assert second_hour["ts"] == "2024-03-01T01:00:00Z"
+    assert (second_hour["min"], second_hour["max"], second_hour["count"]) == (60, 119, 60)
+
+
+def test_auto_resolution_uses_raw_lttb_when_zoomed_in_and_rollups_when_wide(client):
+    asset_id = _create_asset(client)
+    base = 1_709_251_200_000
+    points = [
+        {"asset_id": asset_id, "tag": "rpm", "ts": base + second * 1000, "value": second % 7}
+        for second in range(3 * 3600)
+    ]
+    client.post("/telemetry", json={"points": points})
+    params = {"asset_id": asset_id, "tag": "rpm", "max_points": 100}
+
+    zoomed = client.get(
+        "/telemetry/series",
+        params={**params, "start": "2024-03-01T00:00:00Z", "end": "2024-03-01T00:30:00Z"},
+    ).json()
+    assert zoomed["resolution"] == "raw"
+    assert zoomed["downsampled"] is True
+    assert len(zoomed["points"]) == 100
+    assert zoomed["points"][0]["ts"] == "2024-03-01T00:00:00Z"
+    assert "count" not in zoomed["points"][0]
+
+    wide = client.get(
+        "/telemetry/series",
+        params={**params, "start": "2024-03-01T00:00:00Z", "end": "2024-03-04T00:00:00Z"},
+    ).json()
+    assert wide["resolution"] == "1h"
+    assert [point["count"] for point in wide["points"]] == [3600, 3600, 3600]
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    xs = list(range(1000))
+    ys = [0.0] * 1000
+    ys[500] = 100.0
+    picked = lttb(xs, ys, 20)
+    assert len(picked) == 20
+    assert picked[0] == 0 and picked[-1] == 999
+    assert 500 in picked
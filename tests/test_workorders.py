@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import json
 from datetime import date
 
+from app import schedule
+
 
 def _asset_payload(name: str = "Unit 99") -> dict:
     return {
@@ -75,3 +78,247 @@ def test_list_work_orders_can_filter_by_asset(client):
     assert len(data) == 1
     assert data[0]["title"] == "Task A"
     assert data[0]["asset_id"] == asset_a["id"]
+
+
+def test_list_work_orders_cursor_walks_every_row_once(client):
+    asset = _create_asset(client, "Unit C")
+    for index in range(5):
+        client.post(
+            "/workorders", json=_work_order_payload(asset_id=asset["id"], title=f"Task {index}")
+        )
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/workorders", params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        token = response.headers.get("X-Next-Cursor")
+        if token is None:
+            break
+        params = {"limit": 2, "cursor": token}
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_list_work_orders_fields_select_a_subset(client):
+    asset = _create_asset(client, "Unit P")
+    client.post("/workorders", json=_work_order_payload(asset_id=asset["id"], title="Task P"))
+
+    response = client.get("/workorders", params={"fields": "title,id"})
+    assert response.status_code == 200
+    assert list(response.json()[0]) == ["title", "id"]
+    assert client.get("/workorders", params={"fields": "cost"}).status_code == 400
+
+
+def test_bulk_upsert_work_orders(client):
+    asset = _create_asset(client, "Unit K")
+    client.post("/workorders", json=_work_order_payload(asset_id=asset["id"], title="Task A"))
+    batch = {
+        "items": [
+            {**_work_order_payload(asset_id=asset["id"], title="Task A"), "priority": "low"},
+            _work_order_payload(asset_id=asset["id"], title="Task B"),
+            _work_order_payload(asset_id=999, title="Task C"),
+        ]
+    }
+
+    response = client.post("/workorders:bulk", params={"upsert": True}, json=batch)
+    assert response.status_code == 200
+    assert [row["result"] for row in response.json()] == ["updated", "created", "not_found"]
+
+    listed = client.get("/workorders", params={"asset_id": asset["id"]}).json()
+    assert {wo["title"]: wo["priority"] for wo in listed} == {"Task A": "low", "Task B": "high"}
+
+
+def test_get_work_order_returns_304_for_matching_etag(client):
+    asset = _create_asset(client, "Unit E")
+    work_order = client.post("/workorders", json=_work_order_payload(asset_id=asset["id"])).json()
+
+    first = client.get(f"/workorders/{work_order['id']}")
+    etag = first.headers["ETag"]
+    cached = client.get(f"/workorders/{work_order['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    client.patch(f"/workorders/{work_order['id']}", json={"status": "in_progress"})
+    changed = client.get(f"/workorders/{work_order['id']}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_patch_work_order_with_stale_if_match_is_rejected(client):
+    asset = _create_asset(client, "Unit M")
+    created = client.post("/workorders", json=_work_order_payload(asset_id=asset["id"]))
+    work_order_id = created.json()["id"]
+    original_etag = created.headers["ETag"]
+
+    first = client.patch(
+        f"/workorders/{work_order_id}",
+        json={"priority": "low"},
+        headers={"If-Match": original_etag},
+    )
+    assert first.status_code == 200
+    stale = client.patch(
+        f"/workorders/{work_order_id}",
+        json={"priority": "critical"},
+        headers={"If-Match": original_etag},
+    )
+    assert stale.status_code == 412
+
+
+def test_export_work_orders_filters_by_asset(client):
+    asset_a = _create_asset(client, "Unit H")
+    asset_b = _create_asset(client, "Unit I")
+    client.post("/workorders", json=_work_order_payload(asset_id=asset_a["id"], title="Task A"))
+    client.post("/workorders", json=_work_order_payload(asset_id=asset_b["id"], title="Task B"))
+
+    response = client.get("/workorders/export", params={"asset_id": asset_b["id"]})
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="workorders.ndjson"'
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Task B"]
+    assert rows[0]["scheduled_start"] is not None
+
+
+def test_overlapping_work_orders_warn_or_reject_by_policy(client, monkeypatch):
+    asset = _create_asset(client, "Unit S")
+    first = client.post("/workorders", json=_work_order_payload(asset["id"], "Outage A"))
+    assert "X-Schedule-Conflicts" not in first.headers
+
+    overlapping = _work_order_payload(asset["id"], "Outage B")
+    overlapping["scheduled_start"] = overlapping["scheduled_end"] = "2024-05-02"
+    second = client.post("/workorders", json=overlapping)
+    assert second.status_code == 201
+    assert second.headers["X-Schedule-Conflicts"] == str(first.json()["id"])
+
+    # Moving it clear of the first work order resolves the conflict.
+    moved = client.patch(
+        f"/workorders/{second.json()['id']}",
+        json={"scheduled_start": "2024-05-03", "scheduled_end": "2024-05-03"},
+    )
+    assert "X-Schedule-Conflicts" not in moved.headers
+
+    monkeypatch.setattr(schedule, "CONFLICT_POLICY", "reject")
+    overlapping["title"] = "Outage C"
+    rejected = client.post("/workorders", json=overlapping)
+    assert rejected.status_code == 409
+    assert len(client.get("/workorders", params={"asset_id": asset["id"]}).json()) == 2
+
+
+def test_bulk_work_orders_are_checked_against_the_schedule(client, monkeypatch):
+    asset = _create_asset(client, "Unit SB")
+    stored = client.post("/workorders", json=_work_order_payload(asset["id"], "Outage A")).json()
+
+    def outage(title: str, start: str, end: str, status: str = "open") -> dict:
+        return {
+            **_work_order_payload(asset["id"], title),
+            "status": status,
+            "scheduled_start": start,
+            "scheduled_end": end,
+        }
+
+    monkeypatch.setattr(schedule, "CONFLICT_POLICY", "reject")
+    batch = {
+        "items": [
+            outage("Outage B", "2024-05-02", "2024-05-02"),
+            outage("Outage C", "2024-05-10", "2024-05-11"),
+            outage("Outage D", "2024-05-11", "2024-05-11"),
+            outage("Outage E", "2024-05-20", "2024-05-21"),
+            outage("Outage F", "2024-05-01", "2024-05-02", status="cancelled"),
+        ]
+    }
+    results = client.post("/workorders:bulk", json=batch).json()
+    assert [row["result"] for row in results] == [
+        "conflict", "conflict", "conflict", "created", "created"
+    ]
+    assert results[0]["detail"] == f"Work order overlaps scheduled work orders: {stored['id']}"
+    assert results[1]["detail"] == "Work order overlaps batch items: 2"
+    assert results[2]["detail"] == "Work order overlaps batch items: 1"
+    listed = client.get("/workorders", params={"asset_id": asset["id"]}).json()
+    assert sorted(wo["title"] for wo in listed) == ["Outage A", "Outage E", "Outage F"]
+
+    # Under the warn policy the batch is written and the overlaps are reported.
+    monkeypatch.setattr(schedule, "CONFLICT_POLICY", "warn")
+    warned = client.post("/workorders:bulk", json={"items": batch["items"][:1]}).json()
+    assert warned[0]["result"] == "created"
+    assert warned[0]["detail"] == f"Work order overlaps scheduled work orders: {stored['id']}"
+
+
+def test_fleet_conflict_report_lists_each_overlapping_pair(client):
+    busy = _create_asset(client, "Unit S1")
+    quiet = _create_asset(client, "Unit S2")
+    spans = [
+        ("A", "2024-05-01", "2024-05-10"),
+        ("B", "2024-05-03", "2024-05-04"),
+        ("C", "2024-05-09", "2024-05-12"),
+        ("D", "2024-05-13", None),
+    ]
+    ids = {}
+    for title, start, end in spans:
+        payload = _work_order_payload(busy["id"], f"Outage {title}")
+        payload.update(scheduled_start=start, scheduled_end=end)
+        ids[title] = client.post("/workorders", json=payload).json()["id"]
+    client.post("/workorders", json=_work_order_payload(quiet["id"]))
+    cancelled = _work_order_payload(quiet["id"], "Cancelled outage")
+    cancelled["status"] = "cancelled"
+    client.post("/workorders", json=cancelled)
+
+    report = client.get("/workorders/conflicts").json()
+    assert [(row["work_order_id"], row["conflicting_work_order_id"]) for row in report] == [
+        (ids["A"], ids["B"]),
+        (ids["A"], ids["C"]),
+    ]
+    assert report[1]["overlap_start"] == "2024-05-09"
+    assert report[1]["overlap_end"] == "2024-05-10"
+    assert client.get("/workorders/conflicts", params={"asset_id": quiet["id"]}).json() == []
+
+
+def test_transition_completes_selected_work_orders_in_one_update(client):
+    asset = _create_asset(client, "Unit Outage")
+    ids = []
+    for index in range(3):
+        payload = _work_order_payload(asset["id"], f"Outage task {index}")
+        payload["status"] = "in_progress"
+        payload["scheduled_start"] = f"2024-05-0{index + 1}"
+        payload["scheduled_end"] = "2024-05-09"
+        ids.append(client.post("/workorders", json=payload).json()["id"])
+    other = client.post("/workorders", json=_work_order_payload(asset["id"], "Not in outage"))
+    client.get(f"/assets/{asset['id']}")  # cached, and must be invalidated below
+
+    response = client.post(
+        "/workorders:transition",
+        json={
+            "filter": {"asset_id": asset["id"], "status": "in_progress"},
+            "status": "completed",
+            "completed_at": "2024-05-02T12:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    # The third work order starts after completed_at, which WorkOrderBase forbids.
+    assert response.json() == {"updated": ids[:2], "skipped": ids[2:]}
+
+    statuses = {
+        wo["id"]: wo["status"]
+        for wo in client.get("/workorders", params={"asset_id": asset["id"]}).json()
+    }
+    assert statuses == {
+        ids[0]: "completed",
+        ids[1]: "completed",
+        ids[2]: "in_progress",
+        other.json()["id"]: "open",
+    }
+    embedded = client.get(f"/assets/{asset['id']}").json()["work_orders"]
+    assert {wo["id"]: wo["status"] for wo in embedded} == statuses
+    assert client.get("/stats").json()["work_orders"] == {
+        "completed": {"high": 2},
+        "in_progress": {"high": 1},
+        "open": {"high": 1},
+    }
+    history = client.get(f"/workorders/{ids[0]}/history").json()
+    assert history[0]["changes"]["status"] == "completed"
+
+    reopen = client.post(
+        "/workorders:transition", json={"filter": {"ids": ids}, "status": "open"}
+    )
+    assert reopen.status_code == 422